@@ -106,6 +106,25 @@ export interface DashboardStats {
   total_active_count: number;
 }
 
+export interface OrderEvent {
+  seq: number;
+  event_type: "ORDER_CREATED" | "ORDER_COMPLETED" | "PRINTOUT_CREATED" | "PRINTOUT_COMPLETED";
+  order_id: number;
+  created_at: string;
+  data: Order | Printout | null;
+}
+
+export interface ChangeFeed {
+  events: OrderEvent[];
+  last_seq: number;
+  has_more: boolean;
+}
+
+export interface BulkCompleteResult {
+  completed_count: number;
+  results: Array<{ order_id: number; result: "completed" | "not_found" | "already_completed" }>;
+}
+
 export interface Item {
   id: number;
   item: string;
@@ -135,6 +154,12 @@ export const api = {
     return fetchAPI<DashboardStats>("/stationery/admin/dashboard-stats/");
   },
 
+  // without `since`: no events, just the current last_seq to poll from
+  getChanges: async (since?: number): Promise<ChangeFeed> => {
+    const query = since === undefined ? "" : `?since=${since}`;
+    return fetchAPI<ChangeFeed>(`/stationery/admin/changes/${query}`);
+  },
+
   getItems: async (): Promise<Item[]> => {
     return fetchAPI<Item[]>("/stationery/item-list/");
   },
@@ -185,6 +210,20 @@ export const api = {
     });
   },
 
+  bulkCompleteOrders: async (orderIds: number[]): Promise<BulkCompleteResult> => {
+    return fetchAPI("/stationery/admin/orders/bulk-complete/", {
+      method: "POST",
+      body: JSON.stringify({ order_ids: orderIds }),
+    });
+  },
+
+  bulkCompletePrintouts: async (orderIds: number[]): Promise<BulkCompleteResult> => {
+    return fetchAPI("/stationery/admin/printouts/bulk-complete/", {
+      method: "POST",
+      body: JSON.stringify({ order_ids: orderIds }),
+    });
+  },
+
   downloadPrintoutFile: async (orderId: number): Promise<void> => {
     const token = localStorage.getItem("access_token");
     
@@ -258,6 +297,39 @@ export const api = {
     }, 1000);
   },
 
+  downloadPrintoutBundle: async (orderIds: number[]): Promise<void> => {
+    const token = localStorage.getItem("access_token");
+
+    if (!token) {
+      throw new Error("Not authenticated - please log in again");
+    }
+
+    const url = orderIds.length === 1
+      ? `${API_BASE_URL}/stationery/admin/printouts/${orderIds[0]}/bundle/`
+      : `${API_BASE_URL}/stationery/admin/printouts/bundle/?order_ids=${orderIds.join(",")}`;
+
+    const response = await fetch(url, {
+      headers: {
+        Authorization: `Bearer ${token}`,
+      },
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({ error: response.statusText }));
+      throw new Error(errorData.error || `Download failed: ${response.statusText}`);
+    }
+
+    const blob = await response.blob();
+    const blobUrl = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = blobUrl;
+    a.download = orderIds.length === 1 ? `printout-${orderIds[0]}.zip` : `printouts-${orderIds.length}-orders.zip`;
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    window.URL.revokeObjectURL(blobUrl);
+  },
+
   getMyActiveOrders: async (): Promise<Order[]> => {
     return fetchAPI<Order[]>("/stationery/active-orders/");
   },
@@ -3,19 +3,79 @@ import { ShoppingBag, TrendingUp, CheckCircle2 } from "lucide-react";
 import { KPICard } from "@/components/KPICard";
 import { AllOrdersTable } from "@/components/AllOrdersTable";
 import { OrderDetailsSidebar } from "@/components/OrderDetailsSidebar";
-import { api, type Order, type Printout } from "@/lib/api";
+import { api, type DashboardStats, type Order, type OrderEvent, type Printout } from "@/lib/api";
 import { useAuth } from "@/contexts/AuthContext";
 import { useToast } from "@/hooks/use-toast";
 
+// how often the dashboard asks the change feed for new and completed orders
+const CHANGES_POLL_MS = 5000;
+
+type DashboardRow = {
+  id: string;
+  studentName: string;
+  status: "New Order" | "In Progress" | "Pending" | "Completed";
+  timeOfOrder: string;
+};
+
+const formatTime = (orderTime: string) =>
+  new Date(orderTime).toLocaleTimeString('en-US', {
+    hour: '2-digit',
+    minute: '2-digit',
+    hour12: true
+  });
+
+const orderRow = (order: Order): DashboardRow => ({
+  id: `#${order.order_id}`,
+  studentName: order.user_name,
+  status: "New Order", // Backend doesn't have status yet
+  timeOfOrder: formatTime(order.order_time),
+});
+
+const printoutRow = (printout: Printout): DashboardRow => ({
+  id: `#P${printout.order_id}`,
+  studentName: printout.user_name,
+  status: "New Order",
+  timeOfOrder: formatTime(printout.order_time),
+});
+
+// Sort by order ID (most recent first)
+const sortRows = (rows: DashboardRow[]) => [...rows].sort((a, b) => b.id.localeCompare(a.id));
+
+const toStats = (statsData: DashboardStats) => ({
+  newOrdersCount: statsData.new_orders_count,
+  totalRevenue: statsData.total_revenue_today,
+  completedOrdersCount: statsData.completed_orders_count,
+});
+
+// Apply change feed events to the active rows: created orders are added
+// (or replaced, the feed may repeat ones the full load already had),
+// completed ones dropped
+const applyChanges = (rows: DashboardRow[], events: OrderEvent[]) => {
+  const byId = new Map(rows.map((row) => [row.id, row]));
+  for (const event of events) {
+    switch (event.event_type) {
+      case "ORDER_CREATED":
+        // no data once the order is no longer active
+        if (event.data) byId.set(`#${event.order_id}`, orderRow(event.data as Order));
+        break;
+      case "PRINTOUT_CREATED":
+        if (event.data) byId.set(`#P${event.order_id}`, printoutRow(event.data as Printout));
+        break;
+      case "ORDER_COMPLETED":
+        byId.delete(`#${event.order_id}`);
+        break;
+      case "PRINTOUT_COMPLETED":
+        byId.delete(`#P${event.order_id}`);
+        break;
+    }
+  }
+  return sortRows([...byId.values()]);
+};
+
 const Index = () => {
   const [selectedOrderId, setSelectedOrderId] = useState<string | null>(null);
   const [readOrders, setReadOrders] = useState<Set<string>>(new Set());
-  const [allOrders, setAllOrders] = useState<Array<{
-    id: string;
-    studentName: string;
-    status: "New Order" | "In Progress" | "Pending" | "Completed";
-    timeOfOrder: string;
-  }>>([]);
+  const [allOrders, setAllOrders] = useState<DashboardRow[]>([]);
   const [stats, setStats] = useState({
     newOrdersCount: 0,
     totalRevenue: 0,
@@ -27,52 +87,34 @@ const Index = () => {
   const { toast } = useToast();
 
   useEffect(() => {
+    let cancelled = false;
+    let lastSeq: number | null = null;
+    let timer: ReturnType<typeof setTimeout> | undefined;
+
     const fetchData = async () => {
       try {
         setLoading(true);
-        
+
+        // Note the change feed position first, so whatever changes during
+        // the full load still comes through the next poll
+        const { last_seq } = await api.getChanges();
+
         // Fetch dashboard stats and all orders in parallel
         const [statsData, ordersData, printoutsData] = await Promise.all([
           api.getDashboardStats(),
           api.getAllActiveOrders(),
           api.getAllActivePrintouts(),
         ]);
+        if (cancelled) return;
 
-        // Update stats
-        setStats({
-          newOrdersCount: statsData.new_orders_count,
-          totalRevenue: statsData.total_revenue_today,
-          completedOrdersCount: statsData.completed_orders_count,
-        });
+        setStats(toStats(statsData));
 
         // Combine orders and printouts, convert to display format
-        const formattedOrders = [
-          ...ordersData.map((order: Order) => ({
-            id: `#${order.order_id}`,
-            studentName: order.user_name,
-            status: "New Order" as const, // Backend doesn't have status yet
-            timeOfOrder: new Date(order.order_time).toLocaleTimeString('en-US', { 
-              hour: '2-digit', 
-              minute: '2-digit',
-              hour12: true 
-            }),
-          })),
-          ...printoutsData.map((printout: Printout) => ({
-            id: `#P${printout.order_id}`,
-            studentName: printout.user_name,
-            status: "New Order" as const,
-            timeOfOrder: new Date(printout.order_time).toLocaleTimeString('en-US', { 
-              hour: '2-digit', 
-              minute: '2-digit',
-              hour12: true 
-            }),
-          })),
-        ];
-
-        // Sort by order ID (most recent first)
-        formattedOrders.sort((a, b) => b.id.localeCompare(a.id));
-
-        setAllOrders(formattedOrders);
+        setAllOrders(sortRows([
+          ...ordersData.map(orderRow),
+          ...printoutsData.map(printoutRow),
+        ]));
+        lastSeq = last_seq;
       } catch (error) {
         console.error("Failed to fetch dashboard data:", error);
         toast({
@@ -81,11 +123,42 @@ const Index = () => {
           variant: "destructive",
         });
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
+      }
+    };
+
+    // Apply new and completed orders as deltas instead of refetching the queues
+    const pollChanges = async () => {
+      if (lastSeq === null) return;
+      try {
+        const events: OrderEvent[] = [];
+        let hasMore = true;
+        while (hasMore && !cancelled) {
+          const feed = await api.getChanges(lastSeq);
+          events.push(...feed.events);
+          lastSeq = feed.last_seq;
+          hasMore = feed.has_more;
+        }
+        if (events.length && !cancelled) {
+          setAllOrders((rows) => applyChanges(rows, events));
+          const statsData = await api.getDashboardStats();
+          if (!cancelled) setStats(toStats(statsData));
+        }
+      } catch (error) {
+        console.error("Failed to fetch dashboard changes:", error);
+      } finally {
+        if (!cancelled) timer = setTimeout(pollChanges, CHANGES_POLL_MS);
       }
     };
 
-    fetchData();
+    fetchData().then(() => {
+      if (!cancelled) timer = setTimeout(pollChanges, CHANGES_POLL_MS);
+    });
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
   }, [toast]);
 
   const handleViewOrder = (orderId: string) => {
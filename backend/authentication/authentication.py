@@ -0,0 +1,87 @@
+"""
+JWT authentication that doesn't look the user up on every request.
+
+simplejwt's JWTAuthentication loads the user row by email for each request,
+although views only need the role, id and active flag. CachedJWTAuthentication
+keeps those fields in the cache for AUTH_USER_CACHE_TTL and rebuilds the user
+from them; the rest of the row (password, dates) is deferred and loaded only
+if something reads it.
+
+The entry is dropped whenever the user is saved or deleted, along with
+the entry under the email the user was loaded with if the save changed
+it (User.from_db keeps it, so no extra query). LocMemCache
+is per process, so in other worker processes, and for changes that skip
+save() (queryset.update()), the TTL bounds how long an old role or active
+flag is honoured.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+USER_CACHE_KEY = 'authentication:user'
+
+# everything permission checks and views read from request.user; never the password
+CACHED_FIELDS = ('id', 'email', 'name', 'number', 'role', 'is_active', 'is_staff', 'is_superuser')
+
+
+def user_cache_key(user_id):
+    return f'{USER_CACHE_KEY}:{user_id}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # needs the password hash, which is not cached
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = user_cache_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = (
+                self.user_model.objects
+                .filter(**{api_settings.USER_ID_FIELD: user_id})
+                .values(*CACHED_FIELDS)
+                .first()
+            )
+            if values is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            cache.set(key, values, settings.AUTH_USER_CACHE_TTL.total_seconds())
+
+        # a model instance like one loaded with .only(*CACHED_FIELDS), so
+        # save() writes back just these fields
+        fields = [f.attname for f in self.user_model._meta.concrete_fields if f.attname in values]
+        user = self.user_model.from_db(self.user_model.objects.db, fields, [values[name] for name in fields])
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    # the old email's entry too: tokens issued before the change still carry it
+    keys = {user_cache_key(instance.email)}
+    loaded_email = getattr(instance, '_loaded_email', None)
+    if loaded_email is not None:
+        keys.add(user_cache_key(loaded_email))
+    instance._loaded_email = instance.email
+    cache.delete_many(keys)
+    # and again once committed, in case a request cached the old row in between
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def connect_signals():
+    User = get_user_model()
+    post_save.connect(invalidate_cached_user, sender=User, dispatch_uid='invalidate_cached_user_save')
+    post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid='invalidate_cached_user_delete')
@@ -0,0 +1,25 @@
+"""
+PBKDF2 with a configurable work factor.
+
+Logging in costs one password hash, and at the start of a semester most
+of the server's CPU goes into them. PASSWORD_PBKDF2_ITERATIONS sets the
+cost (Django's default when unset). Stored hashes record their own
+iteration count, so existing passwords keep verifying after a change.
+Raising it re-hashes each password at the new cost on its owner's next
+login; lowering it only applies to new passwords, stored hashes are never
+weakened.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    # same algorithm name, so it reads and upgrades existing pbkdf2_sha256 hashes
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS or PBKDF2PasswordHasher.iterations
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return decoded['iterations'] < self.iterations
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from authentication.tokens import prune_expired_tokens, token_table_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired refresh tokens from the JWT blacklist tables, in batches, "
+        "and report the tables' sizes. Meant to run daily, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.1, help="Seconds to wait between batches")
+        parser.add_argument('--stats', action='store_true', help="Only report table sizes")
+
+    def write_stats(self, label, stats):
+        self.stdout.write(
+            f"{label}: {stats['outstanding']} outstanding ({stats['expired_outstanding']} expired), "
+            f"{stats['blacklisted']} blacklisted ({stats['expired_blacklisted']} expired), "
+            f"oldest expiry {stats['oldest_expiry'] or '-'}"
+        )
+
+    def handle(self, *args, **options):
+        self.write_stats("Before" if not options['stats'] else "Tokens", token_table_stats())
+        if options['stats']:
+            return
+
+        outstanding, blacklisted = prune_expired_tokens(options['batch_size'], options['pause'])
+        self.write_stats("After", token_table_stats())
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {outstanding} expired outstanding tokens and {blacklisted} blacklist entries"
+        ))
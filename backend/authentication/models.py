@@ -72,6 +72,13 @@ class User(AbstractUser):
     # for overriding default create_user and create_superuser method because we have extra arguements to be dealt with
     objects = CustomUserManager()  
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        # the email tokens were issued under, see authentication.invalidate_cached_user
+        user._loaded_email = user.__dict__.get('email')
+        return user
+
     def __str__(self):
         return self.name
     
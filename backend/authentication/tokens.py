@@ -0,0 +1,56 @@
+"""
+Housekeeping for simplejwt's token blacklist.
+
+Every login and every refresh (ROTATE_REFRESH_TOKENS) adds an
+OutstandingToken row, and every rotation or logout
+(BLACKLIST_AFTER_ROTATION) a BlacklistedToken row. Once a refresh token has
+expired it is rejected on its expiry alone, so both rows are dead weight.
+prune_expired_tokens() deletes them a batch at a time, so a large backlog
+never holds the database's write lock for long.
+
+Refresh and logout look tokens up by jti (unique) and blacklist entries by
+token (one-to-one), both indexed, so they stay constant-time as the tables
+grow; migration 0002 indexes expires_at for the pruning scan.
+"""
+import time
+
+from django.db.models import Min
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+def token_table_stats(now=None):
+    now = now or timezone.now()
+    expired = OutstandingToken.objects.filter(expires_at__lte=now)
+    return {
+        'outstanding': OutstandingToken.objects.count(),
+        'blacklisted': BlacklistedToken.objects.count(),
+        'expired_outstanding': expired.count(),
+        'expired_blacklisted': BlacklistedToken.objects.filter(token__expires_at__lte=now).count(),
+        'oldest_expiry': OutstandingToken.objects.aggregate(oldest=Min('expires_at'))['oldest'],
+    }
+
+
+def prune_expired_tokens(batch_size=1000, pause=0.0, now=None):
+    """
+    Delete expired outstanding tokens with their blacklist entries, `batch_size`
+    at a time with `pause` seconds between batches.
+    Returns (outstanding deleted, blacklisted deleted).
+    """
+    now = now or timezone.now()
+    outstanding = blacklisted = 0
+    while True:
+        # oldest first, along the expires_at index
+        batch = list(
+            OutstandingToken.objects
+            .filter(expires_at__lte=now)
+            .order_by('expires_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            return outstanding, blacklisted
+        _, deleted = OutstandingToken.objects.filter(pk__in=batch).delete()
+        outstanding += deleted.get(OutstandingToken._meta.label, 0)
+        blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+        if pause:
+            time.sleep(pause)
@@ -3,10 +3,9 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework import status
-from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import UserSerializer
 from . models import User
-from django.contrib.auth import authenticate, login
+from django.contrib.auth import authenticate
 from django.shortcuts import redirect
 
 class UserDetails(APIView):
@@ -18,16 +17,9 @@ class UserDetails(APIView):
     def get(self, request):
 
         user = request.user
-        serializer_data = UserSerializer(user).data
-        # pop password, groups, user_permissions, is_superuser, is_staff, is_active, last_login, date_joined
-        serializer_data.pop('password') 
-        serializer_data.pop('groups') 
-        serializer_data.pop('user_permissions') 
-        serializer_data.pop('is_superuser') 
-        serializer_data.pop('is_staff') 
-        serializer_data.pop('is_active') 
-        serializer_data.pop('last_login') 
-        serializer_data.pop('date_joined') 
+        # only the fields cached by CachedJWTAuthentication, so this needs no query;
+        # serializing the whole user would load password, dates, groups and permissions
+        serializer_data = {field: getattr(user, field) for field in ('id', 'email', 'name', 'number', 'role')}
         return Response(serializer_data, status=status.HTTP_200_OK)
 
 class UserRegister(APIView):
@@ -49,32 +41,25 @@ class UserRegister(APIView):
         else:
             return Response(user_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-class UserLogin(TokenObtainPairView):
-
-    def post(self, request, *args, **kwargs):
-
-        # Get the email and password from the request data
-        email = request.data.get('email')  
-        password = request.data.get('password')  
+class UserLogin(APIView):
+    """
+    Exchange email and password for a token pair.
+    The password is hashed once, and no Django session is created: clients authenticate with the tokens.
+    """
+    authentication_classes = ()
 
-        # Authenticate the user
-        user = authenticate(email=email, password=password)
+    def post(self, request):
 
-        if user is not None:
+        email = request.data.get('email')
+        password = request.data.get('password')
 
-            # Log the user in
-            # (i.e. Associate the user with the current request)
-            login(request, user)
+        user = authenticate(request, email=email, password=password)
+        if user is None:
+            return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
-            # Generate and return the token pair by delegating to parent class's post method
-            token = super().post(request,*args, **kwargs)
-            # super is the parent class (TokenObtainPairView)
-            # so we are calling parent class's post method to generate a token for the user associated with the request
+        refresh = RefreshToken.for_user(user)
+        return Response({'refresh': str(refresh), 'access': str(refresh.access_token)}, status=status.HTTP_200_OK)
 
-            return Response(token.data, status=status.HTTP_200_OK)
-        else:
-            return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
-            
 class UserLogout(APIView):
 
     def post(self, request):
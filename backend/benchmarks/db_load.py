@@ -0,0 +1,159 @@
+"""
+Database profiles under mixed read/write traffic.
+
+--threads students hammer the API through the full middleware stack for
+--seconds each: --write-ratio of requests place an order
+(POST create-order/ with an Idempotency-Key, a read-then-write
+transaction), the rest list their active orders or the item list.
+
+Profiles (see DATABASE_PROFILE in core/settings.py):
+
+  sqlite-legacy  the old settings: rollback journal, deferred transactions,
+                 sqlite3's 5 second timeout
+  sqlite         WAL, synchronous=NORMAL, mmap, IMMEDIATE transactions
+  postgres       the DATABASE_* variables; a test_<DATABASE_NAME> database
+                 is created and dropped
+
+SQLite profiles run on a temporary file. Each profile runs in its own
+process, so each gets fresh settings:
+
+    python benchmarks/db_load.py [--profiles sqlite-legacy sqlite] [--threads 8] [--seconds 20]
+    DATABASE_NAME=... DATABASE_USER=... python benchmarks/db_load.py --profiles sqlite postgres
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+
+def child(args):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    root = tempfile.mkdtemp(prefix='db-load-bench-')
+    os.environ['DATABASE_PROFILE'] = 'postgres' if args.child == 'postgres' else 'sqlite'
+    os.environ['SQLITE_PATH'] = os.path.join(root, 'db.sqlite3')
+
+    import django
+    from django.conf import settings
+
+    if args.child == 'sqlite-legacy':
+        settings.DATABASES['default'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ['SQLITE_PATH'],
+        }
+    settings.MEDIA_ROOT = os.path.join(root, 'media')
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import close_old_connections, connection
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from stationery.models import Items
+
+    if args.child == 'postgres':
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    else:
+        call_command('migrate', verbosity=0)
+
+    try:
+        items = ['PEN', 'PENCIL', 'RING_FILE', 'A4_SHEETS']
+        Items.objects.bulk_create(Items(item=item, price=10) for item in items)
+        User = get_user_model()
+        tokens = []
+        for i in range(args.threads):
+            user = User.objects.create_user(email=f'student{i}@example.com', password='x', name=f'S{i}', number=str(i),
+                                            role=User.Role.STUDENT)
+            tokens.append(str(RefreshToken.for_user(user).access_token))
+        connection.close()
+
+        results = {'read': [], 'write': [], 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + args.seconds
+
+        def student(token, seed):
+            rng = random.Random(seed)
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {token}', raise_request_exception=False)
+            latencies = {'read': [], 'write': []}
+            errors = 0
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                if rng.random() < args.write_ratio:
+                    kind = 'write'
+                    quantity = rng.randint(1, 3)
+                    order = {'orders': [{'item': rng.choice(items), 'quantity': quantity, 'cost': 10 * quantity}]}
+                    response = client.post('/stationery/create-order/', order, content_type='application/json',
+                                           HTTP_IDEMPOTENCY_KEY=str(uuid.uuid4()))
+                else:
+                    kind = 'read'
+                    response = client.get(rng.choice(('/stationery/active-orders/', '/stationery/item-list/')))
+                latencies[kind].append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+            close_old_connections()
+            with lock:
+                results['read'] += latencies['read']
+                results['write'] += latencies['write']
+                results['errors'] += errors
+
+        threads = [threading.Thread(target=student, args=(token, i)) for i, token in enumerate(tokens)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        report = {'profile': args.child, 'errors': results['errors']}
+        for kind in ('read', 'write'):
+            latencies = sorted(results[kind])
+            report[f'{kind}_per_s'] = len(latencies) / elapsed
+            report[f'{kind}_p50'] = statistics.median(latencies) * 1000 if latencies else 0
+            report[f'{kind}_p95'] = latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000 if latencies else 0
+        print(json.dumps(report))
+    finally:
+        if args.child == 'postgres':
+            connection.creation.destroy_test_db(settings.DATABASES['default']['NAME'], verbosity=0)
+        shutil.rmtree(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=['sqlite-legacy', 'sqlite'],
+                        choices=['sqlite-legacy', 'sqlite', 'postgres'])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args)
+
+    print(f"{args.threads} clients for {args.seconds:g}s, {args.write_ratio:.0%} writes")
+    print(f"{'profile':<14} {'reads/s':>8} {'read p50':>9} {'read p95':>9} {'writes/s':>9} {'write p50':>10} "
+          f"{'write p95':>10} {'errors':>7}")
+    for profile in args.profiles:
+        command = [sys.executable, os.path.abspath(__file__), '--child', profile, '--threads', str(args.threads),
+                   '--seconds', str(args.seconds), '--write-ratio', str(args.write_ratio)]
+        output = subprocess.run(command, capture_output=True, text=True)
+        lines = output.stdout.strip().splitlines()
+        if output.returncode or not lines:
+            print(f"{profile:<14} failed: {output.stderr.strip().splitlines()[-1] if output.stderr.strip() else output.returncode}")
+            continue
+        r = json.loads(lines[-1])
+        print(f"{profile:<14} {r['read_per_s']:>8.0f} {r['read_p50']:>9.1f} {r['read_p95']:>9.1f} {r['write_per_s']:>9.0f} "
+              f"{r['write_p50']:>10.1f} {r['write_p95']:>10.1f} {r['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
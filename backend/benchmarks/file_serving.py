@@ -0,0 +1,229 @@
+"""
+App worker occupancy during concurrent large downloads, per FILE_SERVING_MODE.
+
+Serves a 100 MB file through stationery.file_serving.serve_file from a real
+Django WSGI application on a server with a fixed pool of worker threads.
+The WSGI server uses os.sendfile for file responses, as gunicorn does.
+Clients download concurrently at a capped rate, like phones on campus
+Wi-Fi, while a probe requests a tiny endpoint to see whether any worker
+is left to answer it.
+
+In the offloaded modes the client stops after the headers, because the
+front web server would send the body. The point is how long an app worker
+is held.
+
+    python benchmarks/file_serving.py [--workers 4] [--clients 8] [--size-mb 100] [--rate-mb 50]
+"""
+import argparse
+import http.client
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, ServerHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import path
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='file-serving-bench-')
+BIG_FILE = os.path.join(MEDIA_ROOT, 'stationery', 'blobs', 'thesis.pdf')
+
+settings.configure(
+    DEBUG=False,
+    SECRET_KEY='benchmark',
+    ALLOWED_HOSTS=['*'],
+    ROOT_URLCONF=__name__,
+    MIDDLEWARE=[],
+    MEDIA_ROOT=MEDIA_ROOT,
+    FILE_SERVING_MODE='django',
+    FILE_SERVING_ACCEL_PREFIX='/protected-media/',
+)
+django.setup()
+
+from django.core.wsgi import get_wsgi_application
+
+from stationery.file_serving import serve_file
+
+
+def download(request):
+    return serve_file(request, BIG_FILE, 'thesis.pdf')
+
+
+def ping(request):
+    return HttpResponse('ok')
+
+
+urlpatterns = [
+    path('download/', download),
+    path('ping/', ping),
+]
+
+
+class SendfileServerHandler(ServerHandler):
+    """Sends wsgi.file_wrapper results with os.sendfile, like gunicorn's workers"""
+
+    def sendfile(self):
+        filelike = self.result.filelike
+        if not hasattr(filelike, 'fileno'):
+            return False
+        if not self.headers_sent:
+            self.send_headers()
+        self._flush()
+
+        in_fd = filelike.fileno()
+        out_fd = self.stdout.fileno()
+        offset = filelike.tell()
+        size = os.fstat(in_fd).st_size
+        while offset < size:
+            sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+            if not sent:
+                break
+            offset += sent
+        return True
+
+
+class TimedRequestHandler(WSGIRequestHandler):
+
+    def handle(self):
+        self.raw_requestline = self.rfile.readline(65537)
+        if not self.parse_request():
+            return
+        started = time.perf_counter()
+        handler = SendfileServerHandler(self.rfile, self.wfile, self.get_stderr(), self.get_environ(), multithread=True)
+        handler.request_handler = self
+        try:
+            handler.run(self.server.get_app())
+        finally:
+            self.server.record(self.path, time.perf_counter() - started)
+
+    def log_message(self, *args):
+        pass
+
+
+class PooledWSGIServer(WSGIServer):
+    """Handles each connection on one of a fixed number of worker threads"""
+
+    def __init__(self, address, workers):
+        super().__init__(address, TimedRequestHandler)
+        self.pool = ThreadPoolExecutor(workers)
+        self.busy = []
+        self.lock = threading.Lock()
+
+    def record(self, request_path, seconds):
+        with self.lock:
+            self.busy.append((request_path, seconds))
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+
+def client(port, rate):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+    connection.request('GET', '/download/')
+    response = connection.getresponse()
+    if response.getheader('X-Accel-Redirect') or response.getheader('X-Sendfile'):
+        connection.close()
+        return 0
+
+    received = 0
+    started = time.perf_counter()
+    while True:
+        chunk = response.read(1024 * 1024)
+        if not chunk:
+            break
+        received += len(chunk)
+        # cap the download speed like a slow client would
+        ahead = received / rate - (time.perf_counter() - started)
+        if ahead > 0:
+            time.sleep(ahead)
+    connection.close()
+    return received
+
+
+def probe(port, stop, latencies):
+    while not stop.is_set():
+        started = time.perf_counter()
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+        connection.request('GET', '/ping/')
+        connection.getresponse().read()
+        connection.close()
+        latencies.append(time.perf_counter() - started)
+        stop.wait(0.1)
+
+
+def run(mode, args):
+    settings.FILE_SERVING_MODE = mode
+    server = PooledWSGIServer(('127.0.0.1', 0), args.workers)
+    server.set_app(get_wsgi_application())
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    stop = threading.Event()
+    latencies = []
+    prober = threading.Thread(target=probe, args=(port, stop, latencies))
+    prober.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as clients:
+        received = sum(clients.map(lambda _: client(port, args.rate_mb * 1024 * 1024), range(args.clients)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    prober.join()
+    server.shutdown()
+    server.pool.shutdown()
+    server.server_close()
+
+    downloads = [seconds for request_path, seconds in server.busy if request_path == '/download/']
+    return {
+        'mode': mode,
+        'wall': elapsed,
+        'app_mb': received / 1024 / 1024,
+        'worker_s': sum(downloads),
+        'per_download_ms': statistics.mean(downloads) * 1000,
+        'ping_p50_ms': statistics.median(latencies) * 1000,
+        'ping_max_ms': max(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--size-mb', type=int, default=100)
+    parser.add_argument('--rate-mb', type=float, default=50, help="Per-client download speed cap, MB/s")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(BIG_FILE))
+    with open(BIG_FILE, 'wb') as f:
+        f.truncate(args.size_mb * 1024 * 1024)
+
+    print(f"{args.clients} concurrent {args.size_mb} MB downloads at {args.rate_mb:g} MB/s each, {args.workers} app workers")
+    print(f"{'mode':<17} {'wall s':>7} {'MB via app':>10} {'worker s':>9} {'ms/download':>12} {'ping p50 ms':>12} {'ping max ms':>12}")
+    try:
+        for mode in ('django', 'x-accel-redirect', 'x-sendfile'):
+            r = run(mode, args)
+            print(f"{r['mode']:<17} {r['wall']:>7.2f} {r['app_mb']:>10.0f} {r['worker_s']:>9.2f} "
+                  f"{r['per_download_ms']:>12.1f} {r['ping_p50_ms']:>12.1f} {r['ping_max_ms']:>12.1f}")
+    finally:
+        shutil.rmtree(MEDIA_ROOT)
+
+
+if __name__ == '__main__':
+    main()
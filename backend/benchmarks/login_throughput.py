@@ -0,0 +1,151 @@
+"""
+Login throughput during a semester-start rush.
+
+Fires --logins logins from --threads concurrent clients through the full
+middleware stack, against two login views:
+
+  legacy   authenticate(), login() (a Django session row), then
+           TokenObtainPairView.post, which checks the password again
+  current  authentication.views.UserLogin: one check, tokens issued directly
+
+each at several PBKDF2 costs (--iterations, settings.PASSWORD_PBKDF2_ITERATIONS).
+Users' passwords are hashed at the cost being measured, as they would be
+after each user's first login under that policy.
+
+Uses the project settings (DJANGO_SETTINGS_MODULE, default core.settings)
+with the database swapped for a temporary SQLite one:
+
+    python benchmarks/login_throughput.py [--logins 200] [--threads 8] [--iterations 720000 260000 100000]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django
+from django.conf import settings
+
+ROOT = tempfile.mkdtemp(prefix='login-bench-')
+settings.DATABASES['default'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.path.join(ROOT, 'db.sqlite3'),
+    'OPTIONS': {'timeout': 60},
+}
+settings.ROOT_URLCONF = __name__
+django.setup()
+
+from django.contrib.auth import authenticate, get_user_model, login
+from django.contrib.auth.hashers import make_password
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import close_old_connections
+from django.test import Client
+from django.urls import path
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from authentication.views import UserLogin
+
+
+class LegacyUserLogin(TokenObtainPairView):
+    """UserLogin before the fast path"""
+
+    def post(self, request, *args, **kwargs):
+        user = authenticate(email=request.data.get('email'), password=request.data.get('password'))
+        if user is None:
+            return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+        login(request, user)
+        token = super().post(request, *args, **kwargs)
+        return Response(token.data, status=status.HTTP_200_OK)
+
+
+urlpatterns = [
+    path('legacy/', LegacyUserLogin.as_view()),
+    path('current/', UserLogin.as_view()),
+]
+
+PASSWORD = 'semester-start'
+
+
+def make_users(count, iterations):
+    settings.PASSWORD_PBKDF2_ITERATIONS = iterations
+    User = get_user_model()
+    User.objects.all().delete()
+    # one hash for all users: hashing each at full cost would dominate the run
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        User(email=f'student{i}@example.com', name=f'Student {i}', number=str(i), role=User.Role.STUDENT, password=password)
+        for i in range(count)
+    )
+
+
+def client_thread(url, emails, latencies, failures):
+    client = Client()
+    for email in emails:
+        started = time.perf_counter()
+        response = client.post(url, {'email': email, 'password': PASSWORD}, content_type='application/json')
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            failures.append(response.status_code)
+    close_old_connections()
+
+
+def run(view, args):
+    emails = [f'student{i % args.users}@example.com' for i in range(args.logins)]
+    latencies = []
+    failures = []
+    threads = [
+        threading.Thread(target=client_thread, args=(f'/{view}/', emails[i::args.threads], latencies, failures))
+        for i in range(args.threads)
+    ]
+    Session.objects.all().delete()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'logins_per_s': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000,
+        'sessions': Session.objects.count(),
+        'failures': len(failures),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--iterations', type=int, nargs='+', default=[720000, 260000, 100000],
+                        help="PBKDF2 iterations to compare (Django 5.0 default: 720000)")
+    args = parser.parse_args()
+
+    try:
+        call_command('migrate', verbosity=0)
+        print(f"{args.logins} logins from {args.threads} clients")
+        print(f"{'iterations':>10} {'view':<8} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'sessions':>9} {'failed':>7}")
+        for iterations in args.iterations:
+            make_users(args.users, iterations)
+            for view in ('legacy', 'current'):
+                r = run(view, args)
+                print(f"{iterations:>10} {view:<8} {r['logins_per_s']:>9.1f} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+                      f"{r['sessions']:>9} {r['failures']:>7}")
+    finally:
+        shutil.rmtree(ROOT)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Printer time and order turnaround with and without print batching.
+
+Replays printout orders through two ways of running the shop's printers:
+
+  fifo     one job per order part, in arrival order
+  batched  stationery.print_batches.plan_batch each time a printer is free
+
+Each printer (colour, mono) is simulated on its own. Sending a job costs
+--job-seconds of staff handling, changing the sides setting costs
+--switch-seconds, and sheets print at the printer's pages per minute.
+
+Orders are read from the database configured by DJANGO_SETTINGS_MODULE
+(sheets counted from each PrintoutFile's page ranges, laid out like
+stationery.print_jobs), or generated with --synthetic:
+
+    python benchmarks/print_batching.py [--days 90]
+    python benchmarks/print_batching.py --synthetic 600 [--seed 1]
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.utils import timezone
+
+from stationery.models import PrintOut
+from stationery.print_batches import Pending, plan_batch
+from stationery.utils import count_pages_in_range
+
+
+PRINTERS = {
+    # part: pages per minute
+    'COLOUR': 20,
+    'MONO': 40,
+}
+
+
+def part_sheets(files):
+    """{part: (sheets, duplex)} for an order, given (colour pages, mono pages, two-sided) per file"""
+    parts = {}
+    for part, index in (('COLOUR', 0), ('MONO', 1)):
+        sections = [(f[index], f[2]) for f in files if f[index]]
+        if not sections:
+            continue
+        duplex = any(two_sided for _, two_sided in sections)
+        # separator sheet, then each file; see print_jobs.render_part
+        pages = 2 if duplex else 1
+        for count, two_sided in sections:
+            if not duplex:
+                pages += count
+            elif two_sided:
+                pages += count + count % 2
+            else:
+                pages += 2 * count
+        parts[part] = (math.ceil(pages / 2) if duplex else pages, duplex)
+    return parts
+
+
+def orders_from_database(days):
+    since = timezone.now() - timedelta(days=days)
+    orders = []
+    for printout in PrintOut.objects.filter(order_time__gte=since).prefetch_related('files').order_by('order_time'):
+        files = [
+            (count_pages_in_range(f.coloured_pages), count_pages_in_range(f.black_and_white_pages), f.print_on_one_side is False)
+            for f in printout.files.all()
+        ]
+        orders.append((printout.order_time, part_sheets(files)))
+    return orders
+
+
+def synthetic_orders(count, seed):
+    """A term-time day: orders between 9:00 and 17:00, busiest around lab deadlines at 11 and 15"""
+    rng = random.Random(seed)
+    day = datetime(2026, 3, 2, 9, tzinfo=dt_timezone.utc)
+    orders = []
+    for _ in range(count):
+        peak = rng.choice((2, 6))
+        hours = min(max(rng.gauss(peak, 1.5), 0), 8)
+        files = []
+        for _ in range(rng.choice((1, 1, 1, 2, 2, 3))):
+            pages = max(1, int(rng.lognormvariate(2.3, 0.9)))
+            colour = rng.randint(1, min(pages, 4)) if rng.random() < 0.15 else 0
+            files.append((colour, pages - colour, rng.random() < 0.35))
+        orders.append((day + timedelta(hours=hours), part_sheets(files)))
+    return sorted(orders, key=lambda order: order[0])
+
+
+def simulate(jobs, policy, ppm, args):
+    """jobs: [(arrival, sheets, duplex)] for one printer, by arrival"""
+    max_wait = timedelta(minutes=args.max_wait_minutes)
+    pending = []
+    waits = []
+    sent = switches = sheets_printed = 0
+    busy = 0.0
+    mode = None
+    clock = jobs[0][0]
+    i = 0
+
+    while i < len(jobs) or pending:
+        while i < len(jobs) and jobs[i][0] <= clock:
+            pending.append(i)
+            i += 1
+        if not pending:
+            clock = jobs[i][0]
+            continue
+
+        if policy == 'fifo':
+            batch = [pending[0]]
+            duplex = jobs[batch[0]][2]
+        else:
+            queues = {False: [], True: []}
+            for index in pending:
+                queues[jobs[index][2]].append(Pending(index, jobs[index][1], jobs[index][0]))
+            duplex, items = plan_batch(queues, mode, clock, args.max_sheets, max_wait)
+            batch = [item.key for item in items]
+
+        sheets = sum(jobs[index][1] for index in batch)
+        seconds = args.job_seconds + sheets * (2 if duplex else 1) * 60 / ppm
+        if mode is not None and duplex != mode:
+            seconds += args.switch_seconds
+            switches += 1
+        mode = duplex
+        sent += 1
+        sheets_printed += sheets
+        busy += seconds
+        clock += timedelta(seconds=seconds)
+
+        for index in batch:
+            waits.append((clock - jobs[index][0]).total_seconds() / 60)
+        taken = set(batch)
+        pending = [index for index in pending if index not in taken]
+
+    waits.sort()
+    return {
+        'jobs': sent,
+        'switches': switches,
+        'busy_h': busy / 3600,
+        'sheets_per_h': sheets_printed / (busy / 3600) if busy else 0,
+        'wait_p50': statistics.median(waits),
+        'wait_p95': waits[int(len(waits) * 0.95) - 1] if len(waits) > 1 else waits[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=90, help="How far back to read orders from the database")
+    parser.add_argument('--synthetic', type=int, metavar='ORDERS', help="Generate this many orders instead")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--job-seconds', type=float, default=40, help="Staff time to open and send one job")
+    parser.add_argument('--switch-seconds', type=float, default=30, help="Extra time to change the sides setting")
+    parser.add_argument('--max-sheets', type=int, default=settings.PRINT_BATCH_MAX_SHEETS)
+    parser.add_argument('--max-wait-minutes', type=float, default=settings.PRINT_BATCH_MAX_WAIT.total_seconds() / 60)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        orders = synthetic_orders(args.synthetic, args.seed)
+        source = f"{args.synthetic} synthetic orders"
+    else:
+        orders = orders_from_database(args.days)
+        source = f"{len(orders)} orders from the last {args.days} days"
+    print(source)
+
+    print(f"{'printer':<7} {'policy':<8} {'jobs':>6} {'switches':>9} {'busy h':>7} {'sheets/h':>9} {'wait p50 min':>13} {'wait p95 min':>13}")
+    for part, ppm in PRINTERS.items():
+        jobs = [(arrival, parts[part][0], parts[part][1]) for arrival, parts in orders if part in parts]
+        if not jobs:
+            continue
+        for policy in ('fifo', 'batched'):
+            r = simulate(jobs, policy, ppm, args)
+            print(f"{part:<7} {policy:<8} {r['jobs']:>6} {r['switches']:>9} {r['busy_h']:>7.2f} {r['sheets_per_h']:>9.0f} "
+                  f"{r['wait_p50']:>13.1f} {r['wait_p95']:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+End-to-end print worker throughput against fake printers.
+
+Places printout orders at a steady rate into a throwaway SQLite database,
+builds their print jobs as the app does after each order, and runs the
+print worker (stationery.print_spool.poll) against FakePrinters sped up by
+--speedup. Each run is repeated with one order per batch
+(PRINT_BATCH_MAX_SHEETS=1) and with the configured batching.
+
+Times are simulated: one real second is --speedup simulated seconds.
+Reports sheets printed per simulated hour, queue depth (sheets in jobs not
+yet sent) and order time-to-print, from order placed to batch printed.
+
+Uses the project settings (DJANGO_SETTINGS_MODULE, default core.settings)
+with the database and MEDIA_ROOT swapped for temporary ones:
+
+    python benchmarks/print_spool.py [--orders 120] [--rate 120] [--speedup 240]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django
+from django.conf import settings
+
+ROOT = tempfile.mkdtemp(prefix='print-spool-bench-')
+settings.DATABASES['default'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.path.join(ROOT, 'db.sqlite3'),
+    'OPTIONS': {'timeout': 60},
+}
+settings.MEDIA_ROOT = os.path.join(ROOT, 'media')
+django.setup()
+
+import fitz
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import close_old_connections
+from django.db.models import Sum
+
+from stationery import print_spool
+from stationery.models import PrintBatch, PrintJob, PrintOut, PrintoutFile
+from stationery.print_jobs import build_print_jobs
+
+
+def make_pdf(pages):
+    document = fitz.open()
+    for page in range(pages):
+        document.new_page().insert_text((72, 72), f"page {page + 1}")
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+def place_order(user, rng):
+    printout = PrintOut.objects.create(user=user, cost=0)
+    for _ in range(rng.choice((1, 1, 2))):
+        pages = max(1, min(int(rng.lognormvariate(2.2, 0.8)), 80))
+        colour = rng.randint(1, min(pages, 3)) if rng.random() < 0.15 else 0
+        printout_file = PrintoutFile(
+            printout=printout,
+            file_name='notes.pdf',
+            coloured_pages=f'1-{colour}' if colour else '',
+            black_and_white_pages=f'{colour + 1}-{pages}' if colour < pages else '',
+            print_on_one_side=rng.random() >= 0.35,
+        )
+        printout_file.file.save('notes.pdf', ContentFile(make_pdf(pages)), save=False)
+        printout_file.save()
+    printout.file = printout_file.file.name
+    printout.save(update_fields=['file'])
+    build_print_jobs(printout)
+
+
+# SQLite has one writer at a time and gives up at once when a read
+# transaction has to become a write; the threads take turns instead
+db_lock = threading.Lock()
+
+
+def worker(printers, stop, depth):
+    while not stop.is_set():
+        with db_lock:
+            print_spool.poll(printers)
+            waiting = PrintJob.objects.filter(batch__isnull=True).aggregate(sheets=Sum('sheet_count'))['sheets'] or 0
+        depth.append(waiting)
+        stop.wait(0.02)
+    close_old_connections()
+
+
+def run(label, max_sheets, user, args):
+    settings.PRINT_BATCH_MAX_SHEETS = max_sheets
+    PrintOut.objects.all().delete()
+    PrintBatch.objects.all().delete()
+
+    printers = {
+        'COLOUR': f'fake://colour-{label}?ppm=20&warmup={args.warmup}&speedup={args.speedup}',
+        'MONO': f'fake://mono-{label}?ppm=40&warmup={args.warmup}&speedup={args.speedup}',
+    }
+    rng = random.Random(args.seed)
+    stop = threading.Event()
+    depth = []
+    thread = threading.Thread(target=worker, args=(printers, stop, depth))
+    thread.start()
+
+    interval = 3600 / args.rate / args.speedup
+    started = time.monotonic()
+    for i in range(args.orders):
+        delay = started + i * interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        with db_lock:
+            place_order(user, rng)
+
+    try:
+        while thread.is_alive() and (PrintJob.objects.filter(batch__isnull=True).exists()
+                                     or PrintBatch.objects.exclude(status=PrintBatch.Status.PRINTED).exists()):
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        thread.join()
+
+    printed = PrintBatch.objects.filter(status=PrintBatch.Status.PRINTED)
+    sheets = printed.aggregate(sheets=Sum('sheet_count'))['sheets'] or 0
+    first_order = PrintOut.objects.order_by('order_time').values_list('order_time', flat=True).first()
+    last_printed = printed.order_by('-printed_at').values_list('printed_at', flat=True).first()
+    span_h = (last_printed - first_order).total_seconds() * args.speedup / 3600
+    minutes = sorted(
+        (printed_at - order_time).total_seconds() * args.speedup / 60
+        for printed_at, order_time in PrintJob.objects.values_list('batch__printed_at', 'printout__order_time')
+    )
+    return {
+        'label': label,
+        'batches': printed.count(),
+        'sheets': sheets,
+        'sheets_per_h': sheets / span_h,
+        'depth_mean': statistics.mean(depth) if depth else 0,
+        'depth_max': max(depth) if depth else 0,
+        'ttp_p50': statistics.median(minutes),
+        'ttp_p95': minutes[max(int(len(minutes) * 0.95) - 1, 0)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=120)
+    parser.add_argument('--rate', type=float, default=120, help="Orders per simulated hour")
+    parser.add_argument('--speedup', type=float, default=240)
+    parser.add_argument('--warmup', type=float, default=8, help="Simulated seconds each printer job takes to start")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    try:
+        call_command('migrate', verbosity=0)
+        user = get_user_model().objects.create_user(email='bench@example.com', password='x', name='Bench', number='0')
+
+        print(f"{args.orders} orders at {args.rate:g}/h, fake printers at {args.speedup:g}x")
+        print(f"{'batching':<10} {'batches':>8} {'sheets':>7} {'sheets/h':>9} {'queue mean':>11} {'queue max':>10} "
+              f"{'ttp p50 min':>12} {'ttp p95 min':>12}")
+        for label, max_sheets in (('per-order', 1), ('batched', settings.PRINT_BATCH_MAX_SHEETS)):
+            r = run(label, max_sheets, user, args)
+            print(f"{r['label']:<10} {r['batches']:>8} {r['sheets']:>7} {r['sheets_per_h']:>9.0f} {r['depth_mean']:>11.0f} "
+                  f"{r['depth_max']:>10} {r['ttp_p50']:>12.1f} {r['ttp_p95']:>12.1f}")
+    finally:
+        shutil.rmtree(ROOT)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Save latency of a printout's file as the print-outs directory grows.
+
+Compares the old printout_rename, which listed the whole directory on
+every save, with the current printout_rename + ReplacingFileSystemStorage.
+Runs against a throwaway MEDIA_ROOT and needs no database:
+
+    python benchmarks/printout_storage.py [--sizes 0 1000 10000 100000] [--saves 200]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from django.conf import settings
+
+settings.configure(MEDIA_ROOT='', MEDIA_URL='/media/')
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+from stationery.utils import printout_rename, ReplacingFileSystemStorage
+
+
+def legacy_printout_rename(instance, filename):
+    """printout_rename as it was, relative to the CWD"""
+    ext = filename.split('.')[-1]
+    new_name = '{}.{}'.format(instance.order_id, ext)
+    for each_file in os.listdir(os.path.join('media/stationery/print-outs')):
+        if each_file == new_name:
+            os.remove(os.path.join('media/stationery/print-outs', new_name))
+    return os.path.join('stationery/print-outs', new_name)
+
+
+def fill(directory, count):
+    existing = len(os.listdir(directory))
+    for i in range(existing, count):
+        open(os.path.join(directory, f'filler-{i}.pdf'), 'wb').close()
+
+
+def time_saves(rename, storage, saves, first_pk):
+    content = ContentFile(b'%PDF-1.4 benchmark\n' * 64)
+    timings = []
+    for pk in range(first_pk, first_pk + saves):
+        instance = SimpleNamespace(pk=pk, order_id=pk, order_time=datetime(2026, 1, 1))
+        started = time.perf_counter()
+        storage.save(rename(instance, 'upload.pdf'), content)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[0, 1000, 10000, 100000])
+    parser.add_argument('--saves', type=int, default=200)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='printout-storage-bench-')
+    media_root = os.path.join(root, 'media')
+    directory = os.path.join(media_root, 'stationery', 'print-outs')
+    os.makedirs(directory)
+    os.chdir(root)
+
+    implementations = (
+        ('listdir (old)', legacy_printout_rename, FileSystemStorage(location=media_root)),
+        ('replace (new)', printout_rename, ReplacingFileSystemStorage(location=media_root)),
+    )
+
+    print(f"{'files in dir':>12}  {'implementation':<14}  {'median ms':>9}  {'p95 ms':>7}")
+    try:
+        next_pk = 10_000_000
+        for size in sorted(args.sizes):
+            fill(directory, size)
+            for label, rename, storage in implementations:
+                # each pk saved twice: a new file, then replacing it
+                timings = sorted(
+                    time_saves(rename, storage, args.saves, next_pk)
+                    + time_saves(rename, storage, args.saves, next_pk)
+                )
+                median = statistics.median(timings) * 1000
+                p95 = timings[int(len(timings) * 0.95) - 1] * 1000
+                print(f"{size:>12}  {label:<14}  {median:>9.3f}  {p95:>7.3f}")
+                next_pk += args.saves
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,24 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The API is served by the WSGI app (core/wsgi.py). This app only serves the
+server-sent event stream, which holds its connection open, and runs as a
+process of its own next to the WSGI workers:
+
+    gunicorn core.wsgi:application
+    uvicorn core.asgi:application --port 8001
+
+with the web server sending /stationery/events/ to the ASGI process, e.g.
+
+    location /stationery/events/ {
+        proxy_pass http://127.0.0.1:8001;
+        proxy_buffering off;
+        proxy_read_timeout 1h;
+    }
+
+Every other path gets a 404 here: under ASGI Django buffers synchronous
+streaming and file responses (exports, downloads) in memory.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 """
@@ -12,5 +30,23 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# Under ASGI each request's sync code runs in a thread of its own, so a
+# persistent connection would be left open in every one of them; the
+# broker's poller keeps its own connection (see stationery/broker.py)
+os.environ['DATABASE_CONN_MAX_AGE'] = '0'
+
+django_application = get_asgi_application()
+
+EVENT_STREAM_PREFIX = '/stationery/events/'
+
 
-application = get_asgi_application()
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and not scope['path'].startswith(EVENT_STREAM_PREFIX):
+        await send({
+            'type': 'http.response.start',
+            'status': 404,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({'type': 'http.response.body', 'body': b'{"error": "Served by the WSGI app"}'})
+        return
+    await django_application(scope, receive, send)
@@ -0,0 +1,49 @@
+"""
+SQLite backend with the connection options Django 5.1 adds:
+
+  init_command      SQL run on every new connection, e.g. PRAGMAs, separated by ';'
+  transaction_mode  DEFERRED (SQLite's default), IMMEDIATE or EXCLUSIVE
+
+With the default DEFERRED mode a transaction that reads and then writes,
+such as cart.create_orders, fails at once with "database is locked" when
+another connection wrote in between; busy_timeout can't help because
+waiting would not make its snapshot current. IMMEDIATE takes the write
+lock at BEGIN, so such transactions queue on the timeout instead.
+
+Once the project is on Django 5.1 the settings can point at
+django.db.backends.sqlite3 unchanged and this module can go.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # not sqlite3.connect() arguments
+        kwargs.pop('init_command', None)
+        kwargs.pop('transaction_mode', None)
+        return kwargs
+
+    @property
+    def transaction_mode(self):
+        mode = (self.settings_dict['OPTIONS'].get('transaction_mode') or 'DEFERRED').upper()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}, not {mode!r}")
+        return mode
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        init_command = self.settings_dict['OPTIONS'].get('init_command')
+        if init_command:
+            for statement in init_command.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -5,6 +5,8 @@ import os
 
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Initialise environment variables
 env = environ.Env()
 environ.Env.read_env()
@@ -49,11 +51,16 @@ INSTALLED_APPS = [
 # Telling Django to use the JWT method for authentication
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.CachedJWTAuthentication',
     ),
 }
 
 
+# How long an authenticated user's id, role and active flag are cached
+# between requests (see authentication.authentication)
+AUTH_USER_CACHE_TTL = timedelta(seconds=env.int('AUTH_USER_CACHE_TTL', default=60))
+
+
 # JWT settings : https://django-rest-framework-simplejwt.readthedocs.io/en/latest/settings.html
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=30),
@@ -124,25 +131,81 @@ TEMPLATES = [
     },
 ]
 
+# The API runs under WSGI; the ASGI app serves only the live event stream
+# (see core/asgi.py)
 WSGI_APPLICATION = 'core.wsgi.application'
+ASGI_APPLICATION = 'core.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
-DATABASES = {
-    # 'default': {
-    #     'ENGINE': env('DATABASE_ENGINE'),
-    #     'NAME': env('DATABASE_NAME'),
-    #     'USER': env('DATABASE_USER'),
-    #     'PASSWORD': env('DATABASE_PASSWORD'),
-    #     'HOST': env('DATABASE_HOST'),
-    #     'PORT': env('DATABASE_PORT'),
-    #     'OPTIONS': {'init_command': "SET sql_mode='STRICT_TRANS_TABLES'"},
-    # },
+# DATABASE_PROFILE picks the database:
+#
+#   sqlite    (default) a file at SQLITE_PATH in WAL mode, so reads don't block
+#             behind a writer; transactions take the write lock at BEGIN and
+#             wait up to SQLITE_TIMEOUT seconds for it (see core/backends/sqlite3)
+#   postgres  DATABASE_NAME/USER/PASSWORD/HOST/PORT, connections kept for
+#             DATABASE_CONN_MAX_AGE seconds. Set DATABASE_PGBOUNCER when HOST is
+#             a PgBouncer in transaction pooling mode.
+#
+# DATABASE_CONN_MAX_AGE applies to the WSGI workers. The ASGI process that
+# serves the event stream always runs with 0 (core/asgi.py sets it): persistent
+# connections are per thread, and under ASGI every request gets a new thread.
+#
+# benchmarks/db_load.py compares the profiles under mixed traffic.
+DATABASE_PROFILE = env('DATABASE_PROFILE', default='sqlite')
+
+if DATABASE_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': env('DATABASE_NAME'),
+            'USER': env('DATABASE_USER'),
+            'PASSWORD': env('DATABASE_PASSWORD'),
+            'HOST': env('DATABASE_HOST', default='localhost'),
+            'PORT': env('DATABASE_PORT', default='5432'),
+            'CONN_MAX_AGE': env.int('DATABASE_CONN_MAX_AGE', default=60),
+            'CONN_HEALTH_CHECKS': True,
+            # the pooler hands each transaction to any server connection, so
+            # cursors can't outlive one
+            'DISABLE_SERVER_SIDE_CURSORS': env.bool('DATABASE_PGBOUNCER', default=False),
+            'OPTIONS': {'connect_timeout': 5},
+        }
+    }
+elif DATABASE_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.backends.sqlite3',
+            'NAME': env('SQLITE_PATH', default=str(BASE_DIR / "aman.sqlite3")),
+            # keeps the per-connection PRAGMAs and page cache across requests
+            'CONN_MAX_AGE': env.int('DATABASE_CONN_MAX_AGE', default=60),
+            'OPTIONS': {
+                # seconds to wait for another connection's write lock
+                'timeout': env.float('SQLITE_TIMEOUT', default=20),
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    'PRAGMA journal_mode = WAL;'
+                    # WAL keeps the database consistent at NORMAL; a power cut
+                    # can lose only the last transactions
+                    'PRAGMA synchronous = NORMAL;'
+                    f"PRAGMA mmap_size = {env.int('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024)};"
+                    'PRAGMA cache_size = -20000;'
+                    'PRAGMA temp_store = MEMORY'
+                ),
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"DATABASE_PROFILE must be 'sqlite' or 'postgres', not {DATABASE_PROFILE!r}")
+
+
+# Cache (per-process; used for short-lived data such as dashboard stats)
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / "aman.sqlite3",
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -168,6 +231,19 @@ AUTH_PASSWORD_VALIDATORS = [
 # Telling Django to use our User model for authentication 
 AUTH_USER_MODEL = 'authentication.User'
 
+# Password hashing: PBKDF2 iterations per hash, None for Django's default.
+# Lower it to trade brute-force resistance for login throughput; see
+# authentication/hashers.py and benchmarks/login_throughput.py
+PASSWORD_PBKDF2_ITERATIONS = env.int('PASSWORD_PBKDF2_ITERATIONS', default=None)
+
+PASSWORD_HASHERS = [
+    'authentication.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.1/topics/i18n/
 
@@ -188,6 +264,22 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = 'media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+STORAGES = {
+    # removes the date/hash shard directories (stationery.utils.shard_path) that deletes leave empty
+    'default': {'BACKEND': 'stationery.utils.ShardedFileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Generated report artifacts (kept out of MEDIA_ROOT, served only to staff)
+REPORTS_ROOT = os.path.join(BASE_DIR, 'reports')
+
+# Who sends protected downloads once Django has checked permissions:
+# 'django' (the app itself), 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache/lighttpd).
+# See stationery/file_serving.py for the matching web server config.
+FILE_SERVING_MODE = env('FILE_SERVING_MODE', default='django')
+# nginx `internal` location aliased to MEDIA_ROOT, for 'x-accel-redirect'
+FILE_SERVING_ACCEL_PREFIX = env('FILE_SERVING_ACCEL_PREFIX', default='/protected-media/')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -221,3 +313,32 @@ LOGGING = {
         },
     },
 }
+
+# How long a stored Idempotency-Key response is replayed for
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+# How long a key stays claimed by a request that never answered (its worker
+# was killed or timed out) before a retry with the same key may take it over
+IDEMPOTENCY_KEY_LEASE = timedelta(minutes=2)
+
+# Chunked printout uploads: largest file, largest single chunk, and how
+# long an unfinished upload is kept before `prune_upload_sessions` removes it
+CHUNKED_UPLOAD_MAX_FILE_SIZE = 1024 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+CHUNKED_UPLOAD_TTL = timedelta(days=2)
+
+# A background report job still RUNNING after this long is assumed to have
+# lost its worker and is run again (`run_report_jobs`, or its status page)
+REPORT_JOB_TIMEOUT = timedelta(minutes=30)
+
+# Print batching: most sheets in one batch (about a paper tray), and how long
+# an order may wait before its group is printed next regardless of size
+PRINT_BATCH_MAX_SHEETS = 500
+PRINT_BATCH_MAX_WAIT = timedelta(minutes=30)
+
+# Print worker (`manage.py run_print_worker`): the printer for each part of a
+# print job, as an IPP URI (ipp://cups-host:631/printers/<name>, ipps://...)
+# or fake://<name>?ppm=40 for a simulated printer
+PRINT_SPOOL_PRINTERS = {
+    'COLOUR': env('PRINTER_COLOUR_URI', default='fake://colour?ppm=20'),
+    'MONO': env('PRINTER_MONO_URI', default='fake://mono?ppm=40'),
+}
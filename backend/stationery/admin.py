@@ -95,13 +95,12 @@ class PastPrintoutsAdmin(admin.ModelAdmin):
 class PrintoutFileAdmin(admin.ModelAdmin):
     list_display = ['id', 'get_printout_id', 'file_name', 'file_size_kb', 'black_and_white_pages', 'coloured_pages', 'print_on_one_side', 'uploaded_at', 'FILE']
     list_filter = ['uploaded_at', 'print_on_one_side']
-    search_fields = ['file_name', 'printout_active__order_id', 'printout_past__order_id']
+    search_fields = ['file_name', 'printout__order_id']
+    list_select_related = ['printout']
     
     def get_printout_id(self, obj):
-        if obj.printout_active:
-            return f"Active #{obj.printout_active.order_id}"
-        elif obj.printout_past:
-            return f"Past #{obj.printout_past.order_id}"
+        if obj.printout:
+            return f"{obj.printout.get_status_display()} #{obj.printout.order_id}"
         return "N/A"
     get_printout_id.short_description = "Printout"
     
@@ -1,6 +1,11 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
+from django.http import FileResponse, Http404, HttpResponseBadRequest
 from django.contrib.admin.views.decorators import staff_member_required
-from . models import ActiveOrders, PastOrders, ActivePrintOuts, PastPrintOuts
+from . models import PastOrders, PastPrintOuts, ReportJob
+from .completion import complete_orders, complete_printouts
+from . import rollups
+from .report_export import export_response, ORDER_COLUMNS, PRINTOUT_COLUMNS
+from . import report_jobs
 
 from django.utils import timezone
 from datetime import timedelta, datetime
@@ -11,50 +16,13 @@ import calendar
 # @staff_member_required ensures only Django admin users can access this
 @staff_member_required
 def delete_active_order(request, order_id):
-    
-    active_order = ActiveOrders.objects.get(order_id=order_id)
-
-    new_past_order = PastOrders(order_id=order_id, user=active_order.user, item=active_order.item,
-                                quantity=active_order.quantity, cost=active_order.cost,
-                                custom_message=active_order.custom_message, order_time=active_order.order_time)
-
-    new_past_order.save()
-    active_order.delete()
-    
+    complete_orders([order_id])
     return redirect('/admin/stationery/activeorders/')
 
 # For marking an active printout as completed (past)
 @staff_member_required
 def delete_active_printout(request, order_id):
-    from .models import PrintoutFile
-    
-    active_printout = ActivePrintOuts.objects.get(order_id=order_id)
-
-    # Create the past printout without parent-level print specs
-    new_past_printout = PastPrintOuts(
-        order_id=order_id, 
-        user=active_printout.user, 
-        cost=active_printout.cost,
-        custom_message=active_printout.custom_message, 
-        order_time=active_printout.order_time,
-        file=active_printout.file
-    )
-    new_past_printout.save()
-    
-    # Move all associated PrintoutFile objects to the past printout
-    for file_obj in active_printout.files.all():
-        PrintoutFile.objects.create(
-            printout_past=new_past_printout,
-            file=file_obj.file,
-            file_name=file_obj.file_name,
-            file_size=file_obj.file_size,
-            coloured_pages=file_obj.coloured_pages,
-            black_and_white_pages=file_obj.black_and_white_pages,
-            print_on_one_side=file_obj.print_on_one_side,
-        )
-    
-    active_printout.delete()
-    
+    complete_printouts([order_id])
     return redirect('/admin/stationery/activeprintouts/')
 
 
@@ -79,11 +47,18 @@ def generate_order_report(request, duration):
         return redirect('/admin/')
 
     # gte means greater than or equal to
-    all_records = PastOrders.objects.filter(order_time__gte=start_date)
+    all_records = PastOrders.objects.filter(order_time__gte=start_date).select_related('user', 'item')
+
+    # ?export=csv / ?export=xlsx streams the rows as a spreadsheet instead of the HTML report
+    export = export_response(request.GET.get('export'), all_records, ORDER_COLUMNS, f'orders-{duration}-{start_date}')
+    if export:
+        return export
 
     context = {
         'all_records': all_records,
+        'summary': rollups.summarise(rollups.Kind.ORDER, start_date, end_date),
         'report_type': report_type,
+        'export_links': True,
         'start_date': start_date,
         'end_date': end_date,
     }
@@ -109,7 +84,20 @@ def generate_custom_order_report(request):
         start_date_time = timezone.make_aware(start_date_time_naive, timezone=server_timezone)
         end_date_time = timezone.make_aware(end_date_time_naive, timezone=server_timezone)
 
-        all_records = PastOrders.objects.filter(order_time__gte=start_date_time, order_time__lte=end_date_time)
+        export_format = request.POST.get('export') or ReportJob.Format.HTML
+        if export_format not in ReportJob.Format.values:
+            return HttpResponseBadRequest(f"export must be one of {', '.join(ReportJob.Format.values)}")
+
+        # Generate off-thread into a stored (and, for closed periods, reused) artifact
+        if request.POST.get('background'):
+            job = report_jobs.submit(ReportJob.Kind.ORDER, start_date_time, end_date_time, export_format, request.user)
+            return redirect(f'/stationery/report-jobs/{job.pk}/')
+
+        all_records = PastOrders.objects.filter(order_time__gte=start_date_time, order_time__lte=end_date_time).select_related('user', 'item')
+
+        export = export_response(request.POST.get('export'), all_records, ORDER_COLUMNS, f'orders-custom-{start_date_time:%Y%m%d%H%M}-{end_date_time:%Y%m%d%H%M}')
+        if export:
+            return export
         
         context = {
             'all_records': all_records,
@@ -145,11 +133,18 @@ def generate_printout_report(request, duration):
         return redirect('/admin/')
 
     # gte means greater than or equal to
-    all_records = PastPrintOuts.objects.filter(order_time__gte=start_date)
+    all_records = PastPrintOuts.objects.filter(order_time__gte=start_date).select_related('user')
+
+    # ?export=csv / ?export=xlsx streams the rows as a spreadsheet instead of the HTML report
+    export = export_response(request.GET.get('export'), all_records, PRINTOUT_COLUMNS, f'printouts-{duration}-{start_date}')
+    if export:
+        return export
 
     context = {
         'all_records': all_records,
+        'summary': rollups.summarise(rollups.Kind.PRINTOUT, start_date, end_date),
         'report_type': report_type,
+        'export_links': True,
         'start_date': start_date,
         'end_date': end_date,
     }
@@ -175,7 +170,20 @@ def generate_custom_printout_report(request):
         start_date_time = timezone.make_aware(start_date_time_naive, timezone=server_timezone)
         end_date_time = timezone.make_aware(end_date_time_naive, timezone=server_timezone)
 
-        all_records = PastPrintOuts.objects.filter(order_time__gte=start_date_time, order_time__lte=end_date_time)
+        export_format = request.POST.get('export') or ReportJob.Format.HTML
+        if export_format not in ReportJob.Format.values:
+            return HttpResponseBadRequest(f"export must be one of {', '.join(ReportJob.Format.values)}")
+
+        # Generate off-thread into a stored (and, for closed periods, reused) artifact
+        if request.POST.get('background'):
+            job = report_jobs.submit(ReportJob.Kind.PRINTOUT, start_date_time, end_date_time, export_format, request.user)
+            return redirect(f'/stationery/report-jobs/{job.pk}/')
+
+        all_records = PastPrintOuts.objects.filter(order_time__gte=start_date_time, order_time__lte=end_date_time).select_related('user')
+
+        export = export_response(request.POST.get('export'), all_records, PRINTOUT_COLUMNS, f'printouts-custom-{start_date_time:%Y%m%d%H%M}-{end_date_time:%Y%m%d%H%M}')
+        if export:
+            return export
         
         context = {
             'all_records': all_records,
@@ -188,4 +196,18 @@ def generate_custom_printout_report(request):
     # GET REQUEST
     else:
         return render(request, 'stationery/printouts/custom_report.html')
-        
+
+
+# Status page for a background report job, refreshes itself until the artifact is ready
+@staff_member_required
+def report_job_status(request, job_id):
+    job = get_object_or_404(ReportJob, pk=job_id)
+    report_jobs.resubmit_if_stale(job)
+    return render(request, 'stationery/report_job.html', {'job': job})
+
+@staff_member_required
+def download_report_job(request, job_id):
+    job = get_object_or_404(ReportJob, pk=job_id, status=ReportJob.Status.DONE)
+    if not job.artifact:
+        raise Http404
+    return FileResponse(job.artifact.open('rb'), as_attachment=True, filename=job.artifact.name.split('/')[-1])
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class StationeryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'stationery'
+
+    def ready(self):
+        # connect the post_delete handlers that release blobs and remove print job files
+        from . import blobs, print_jobs  # noqa: F401
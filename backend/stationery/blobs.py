@@ -0,0 +1,216 @@
+"""
+Content-addressed, deduplicated storage for printout files.
+
+An upload is hashed while it is copied to a temporary file beside the blob
+tree (stage_upload), outside any transaction. Inside the order transaction
+store_blob() either bumps the ref_count of the blob that already has that
+SHA-256 or hard-links the temporary file into place as a new blob, so the
+same lab manual uploaded by 300 students is stored once. Blobs live at
+stationery/blobs/<2 hex>/<2 hex>/<sha256>.<ext>.
+
+ref_count drops when a PrintoutFile is deleted; collect_garbage() removes
+blobs that nothing references any more, plus files left in the tree by
+transactions that rolled back.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from collections import namedtuple
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import FileBlob, PrintOut, PrintoutFile
+
+
+BLOB_DIR = 'stationery/blobs'
+TEMP_DIR = os.path.join(BLOB_DIR, 'tmp')
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# `owned` temp files are removed by discard(); other sources belong to the caller
+StagedFile = namedtuple('StagedFile', 'path sha256 size file_name owned')
+
+
+def blob_name(sha256, file_name):
+    ext = os.path.splitext(file_name)[1].lower()
+    return os.path.join(BLOB_DIR, sha256[:2], sha256[2:4], f'{sha256}{ext}')
+
+
+def sha256_from_name(name):
+    """The content hash of a stored file when `name` is a blob path, else None"""
+    if name and name.startswith(BLOB_DIR + '/'):
+        return os.path.splitext(os.path.basename(name))[0]
+    return None
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+def stage_upload(uploaded_file):
+    """Copy an uploaded file next to the blob tree, hashing it on the way"""
+    temp_dir = default_storage.path(TEMP_DIR)
+    os.makedirs(temp_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=temp_dir, prefix='upload-', delete=False) as temp:
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+            temp.write(chunk)
+            size += len(chunk)
+
+    return StagedFile(temp.name, digest.hexdigest(), size, uploaded_file.name, owned=True)
+
+
+def stage_path(path, file_name, sha256=None):
+    """Stage a file already on disk (e.g. a finalized chunked upload); it is not removed afterwards"""
+    if sha256:
+        size = os.path.getsize(path)
+    else:
+        sha256, size = _hash_file(path)
+    return StagedFile(path, sha256, size, file_name, owned=False)
+
+
+def discard(staged):
+    if staged.owned:
+        try:
+            os.remove(staged.path)
+        except FileNotFoundError:
+            pass
+
+
+def _place(source, name):
+    destination = default_storage.path(name)
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    try:
+        os.link(source, destination)
+    except FileExistsError:
+        # same name means same contents
+        pass
+    except OSError:
+        # no hard links here (e.g. another filesystem), fall back to a copy
+        shutil.copyfile(source, destination)
+
+
+def store_blob(staged):
+    """
+    Return the blob for the staged file with its ref_count already bumped for
+    the caller's new reference. Call inside the transaction that creates it.
+    """
+    if FileBlob.objects.filter(pk=staged.sha256).update(ref_count=F('ref_count') + 1):
+        return FileBlob.objects.get(pk=staged.sha256)
+
+    name = blob_name(staged.sha256, staged.file_name)
+    _place(staged.path, name)
+    try:
+        with transaction.atomic():
+            return FileBlob.objects.create(sha256=staged.sha256, file=name, size=staged.size, ref_count=1)
+    except IntegrityError:
+        # stored concurrently by another request
+        FileBlob.objects.filter(pk=staged.sha256).update(ref_count=F('ref_count') + 1)
+        return FileBlob.objects.get(pk=staged.sha256)
+
+
+@receiver(post_delete, sender=PrintoutFile)
+def release_blob(sender, instance, **kwargs):
+    if instance.blob_id:
+        FileBlob.objects.filter(pk=instance.blob_id, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+
+
+def _is_referenced(blob):
+    return blob.printout_files.exists() or PrintOut.objects.filter(file=blob.file.name).exists()
+
+
+def collect_garbage(grace, dry_run=False):
+    """
+    Delete unreferenced blobs and stray files in the blob tree older than
+    `grace` (a timedelta, so in-flight uploads are left alone).
+    Returns (blobs deleted, stray files deleted).
+    """
+    cutoff = timezone.now() - grace
+
+    blobs_deleted = 0
+    candidates = FileBlob.objects.filter(ref_count=0, created_at__lt=cutoff).values_list('pk', flat=True)
+    for sha256 in list(candidates):
+        with transaction.atomic():
+            # the row lock makes a concurrent store_blob wait, then recreate the blob
+            blob = FileBlob.objects.select_for_update().filter(pk=sha256, ref_count=0).first()
+            if blob is None or _is_referenced(blob):
+                continue
+            if not dry_run:
+                blob.file.delete(save=False)
+                blob.delete()
+            blobs_deleted += 1
+
+    files_deleted = 0
+    root = default_storage.path(BLOB_DIR)
+    oldest_mtime = time.time() - grace.total_seconds()
+    for directory, _, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(directory, file_name)
+            if os.path.getmtime(path) >= oldest_mtime:
+                continue
+            name = os.path.relpath(path, default_storage.path('')).replace(os.sep, '/')
+            if FileBlob.objects.filter(file=name).exists():
+                continue
+            if not dry_run:
+                os.remove(path)
+            files_deleted += 1
+
+    return blobs_deleted, files_deleted
+
+
+def legacy_files():
+    """PrintoutFiles stored before deduplication, which import_existing_files() moves"""
+    return PrintoutFile.objects.filter(blob__isnull=True).exclude(file='')
+
+
+def import_existing_files():
+    """
+    Move printout files stored before deduplication into the blob tree, one
+    transaction per file. The old files are deleted once nothing points at
+    them. Run by collect_file_blobs; safe to run again.
+    """
+    replaced = set()
+
+    for printout_file in legacy_files().iterator():
+        old_name = printout_file.file.name
+        if not default_storage.exists(old_name):
+            continue
+        staged = stage_path(default_storage.path(old_name), printout_file.file_name or old_name)
+        with transaction.atomic():
+            blob = store_blob(staged)
+            printout_file.file = blob.file.name
+            printout_file.blob = blob
+            printout_file.save(update_fields=['file', 'blob'])
+        replaced.add(old_name)
+
+    # the parent printout kept its own copy of the first file
+    for printout in PrintOut.objects.exclude(file='').exclude(file__startswith=BLOB_DIR).iterator():
+        old_name = printout.file.name
+        if not default_storage.exists(old_name):
+            continue
+        sha256, _ = _hash_file(default_storage.path(old_name))
+        blob = FileBlob.objects.filter(pk=sha256).first()
+        if blob is not None:
+            printout.file = blob.file.name
+            printout.save(update_fields=['file'])
+            replaced.add(old_name)
+
+    for old_name in replaced:
+        if not (PrintoutFile.objects.filter(file=old_name).exists() or PrintOut.objects.filter(file=old_name).exists()):
+            default_storage.delete(old_name)
+    return len(replaced)
@@ -0,0 +1,117 @@
+"""
+Fan-out of OrderEvent rows to the server-sent event streams.
+
+Events are recorded by the WSGI workers, run_print_worker and report jobs,
+none of them the ASGI process that serves the streams (see core/asgi.py),
+so the broker reads them back from the table: while anyone is subscribed,
+one task per process fetches the events after the last seq it has seen
+every POLL_SECONDS and hands them to every subscriber, in seq order.
+Paging by seq misses nothing because events become visible in seq order
+(see events.py).
+
+Subscribers are asyncio queues owned by the ASGI event loop. A client that
+falls too far behind is dropped; it reconnects with Last-Event-ID and
+replays the gap from the OrderEvent table.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import DatabaseError, connection
+
+from .events import event_payload
+from .models import OrderEvent
+
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+POLL_SECONDS = 1
+POLL_PAGE_SIZE = 500
+
+
+def latest_seq():
+    return OrderEvent.objects.order_by('-seq').values_list('seq', flat=True).first() or 0
+
+
+def _events_after(seq):
+    try:
+        events = OrderEvent.objects.filter(seq__gt=seq).order_by('seq')[:POLL_PAGE_SIZE]
+        return [event_payload(event) for event in events]
+    except DatabaseError:
+        # reconnect on the next poll
+        connection.close()
+        raise
+
+
+class Subscription:
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def _deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broker:
+
+    def __init__(self):
+        self._subscribers = set()
+        self._poller = None
+        self._starting = None
+        # the poller's queries run on one thread of their own, which keeps
+        # its database connection between polls
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='event-broker')
+        self.last_seq = 0
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def subscribe(self):
+        """
+        A new subscription, which gets every event after the ones already
+        committed when this returns.
+        """
+        if self._poller is None:
+            if self._starting is None:
+                self._starting = asyncio.ensure_future(self._start())
+            await asyncio.shield(self._starting)
+        subscription = Subscription()
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscribers.discard(subscription)
+
+    async def _start(self):
+        try:
+            self.last_seq = await self._run(latest_seq)
+            self._poller = asyncio.get_running_loop().create_task(self._poll())
+        finally:
+            self._starting = None
+
+    async def _poll(self):
+        try:
+            while True:
+                await asyncio.sleep(POLL_SECONDS)
+                if not self._subscribers:
+                    return
+                try:
+                    events = await self._run(_events_after, self.last_seq)
+                    while events:
+                        for event in events:
+                            for subscription in list(self._subscribers):
+                                subscription._deliver(event)
+                        self.last_seq = events[-1]['seq']
+                        events = await self._run(_events_after, self.last_seq) if len(events) == POLL_PAGE_SIZE else []
+                except DatabaseError:
+                    logger.exception("Couldn't poll for order events")
+        finally:
+            self._poller = None
+
+
+broker = Broker()
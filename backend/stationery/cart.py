@@ -0,0 +1,116 @@
+"""
+Cart submission: turns the lines of a CreateOrder request into Order rows.
+
+All item names are resolved with one IN query, every line is validated
+against the item's stock flag and price, and the orders are inserted with
+a single bulk INSERT in one transaction, so a cart is stored completely or
+not at all, with a fixed number of queries regardless of its size.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+
+from .events import record_events, EventType
+from .models import ActiveOrders, Items
+
+
+MAX_CART_LINES = 100
+
+
+class CartError(Exception):
+    """Raised with a list of per-line error messages when a cart is rejected"""
+
+    def __init__(self, errors):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def _parse_line(index, line):
+    try:
+        quantity = int(line['quantity'])
+    except (KeyError, TypeError, ValueError):
+        raise CartError([f'Line {index}: quantity must be an integer'])
+    if quantity < 1:
+        raise CartError([f'Line {index}: quantity must be at least 1'])
+
+    try:
+        cost = Decimal(str(line['cost'])) if line.get('cost') is not None else None
+    except InvalidOperation:
+        raise CartError([f'Line {index}: cost must be a number'])
+
+    return quantity, cost
+
+
+def build_orders(user, lines):
+    """Validate the cart lines and return unsaved ActiveOrders, raising CartError on any bad line"""
+    if not isinstance(lines, list) or not lines:
+        raise CartError(['orders must be a non-empty list'])
+    if len(lines) > MAX_CART_LINES:
+        raise CartError([f'At most {MAX_CART_LINES} lines per order'])
+    if not all(isinstance(line, dict) for line in lines):
+        raise CartError(['Each order line must be an object'])
+
+    # item names are looked up as a set, so they must be strings
+    bad_names = [
+        f'Line {index}: item must be a string'
+        for index, line in enumerate(lines) if not isinstance(line.get('item'), str)
+    ]
+    if bad_names:
+        raise CartError(bad_names)
+
+    names = {line['item'] for line in lines}
+    # item names aren't unique, keep the first match like the old .first() lookup did
+    items = {}
+    for item in Items.objects.filter(item__in=names).order_by('-pk'):
+        items[item.item] = item
+
+    orders = []
+    errors = []
+    for index, line in enumerate(lines):
+        item = items.get(line.get('item'))
+        if item is None:
+            errors.append(f"Line {index}: unknown item {line.get('item')!r}")
+            continue
+        if not item.in_stock:
+            errors.append(f'Line {index}: {item.item} is out of stock')
+            continue
+
+        try:
+            quantity, cost = _parse_line(index, line)
+        except CartError as e:
+            errors.extend(e.errors)
+            continue
+
+        # the price is the server's; a client total that doesn't match means a stale cart
+        expected_cost = item.price * quantity
+        if cost is not None and cost != expected_cost:
+            errors.append(f'Line {index}: cost {cost} does not match {expected_cost} for {quantity} x {item.item}')
+            continue
+
+        orders.append(ActiveOrders(
+            user=user,
+            item=item,
+            quantity=quantity,
+            cost=expected_cost,
+            custom_message=line.get('custom_message') or '',
+        ))
+
+    if errors:
+        raise CartError(errors)
+    return orders
+
+
+@transaction.atomic
+def create_orders(user, lines):
+    """Create every line of the cart or none of them, returning the new order IDs"""
+    orders = build_orders(user, lines)
+
+    if connection.features.can_return_rows_from_bulk_insert:
+        orders = ActiveOrders.objects.bulk_create(orders)
+    else:
+        # the order IDs are returned to the client
+        for order in orders:
+            order.save()
+
+    record_events(EventType.ORDER_CREATED, [(order.order_id, user.pk) for order in orders])
+    return [order.order_id for order in orders]
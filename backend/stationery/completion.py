@@ -0,0 +1,77 @@
+"""
+Completion of active orders and printouts.
+
+Orders and printouts carry a status column, so completing them is a
+single UPDATE of the active rows among the given IDs, run in one
+transaction together with the event and rollup bookkeeping. The number
+of queries does not depend on how many IDs are passed.
+
+Both functions return a {order_id: result} dict where result is one of
+COMPLETED, NOT_FOUND or ALREADY_COMPLETED.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .events import record_events, EventType
+from .models import Order, PrintOut, OrderStatus, PrintoutFile
+from . import rollups
+
+
+COMPLETED = 'completed'
+NOT_FOUND = 'not_found'
+ALREADY_COMPLETED = 'already_completed'
+
+
+def _complete(queryset, order_ids):
+    """Lock the rows, flip the active ones to COMPLETED and return (results, completed rows)"""
+    order_ids = list(dict.fromkeys(int(order_id) for order_id in order_ids))
+
+    rows = {row.order_id: row for row in queryset.select_for_update(of=('self',)).filter(order_id__in=order_ids)}
+
+    results = {}
+    completed = []
+    for order_id in order_ids:
+        row = rows.get(order_id)
+        if row is None:
+            results[order_id] = NOT_FOUND
+        elif row.status == OrderStatus.COMPLETED:
+            results[order_id] = ALREADY_COMPLETED
+        else:
+            results[order_id] = COMPLETED
+            completed.append(row)
+
+    if completed:
+        completed_at = timezone.now()
+        queryset.model.objects.filter(
+            order_id__in=[row.order_id for row in completed],
+            status=OrderStatus.ACTIVE,
+        ).update(status=OrderStatus.COMPLETED, completed_at=completed_at)
+        for row in completed:
+            row.status = OrderStatus.COMPLETED
+            row.completed_at = completed_at
+
+    return results, completed
+
+
+@transaction.atomic
+def complete_orders(order_ids):
+    results, completed = _complete(Order.objects.select_related('item'), order_ids)
+    if completed:
+        rollups.add_orders(completed)
+        record_events(EventType.ORDER_COMPLETED, [(order.order_id, order.user_id) for order in completed])
+    return results
+
+
+@transaction.atomic
+def complete_printouts(order_ids):
+    results, completed = _complete(PrintOut.objects.all(), order_ids)
+    if completed:
+        files_by_printout = defaultdict(list)
+        for f in PrintoutFile.objects.filter(printout_id__in=[printout.order_id for printout in completed]):
+            files_by_printout[f.printout_id].append(f)
+
+        rollups.add_printouts(completed, files_by_printout)
+        record_events(EventType.PRINTOUT_COMPLETED, [(printout.order_id, printout.user_id) for printout in completed])
+    return results
@@ -0,0 +1,77 @@
+"""
+Recording of order lifecycle events for the admin change feed and the
+live event stream.
+
+Call record_event() / record_events() inside the same transaction.atomic()
+block as the order change itself, so an event exists if and only if the
+change committed.
+The dashboard stats cache is only invalidated once that transaction
+commits; the live event stream reads new events from the table (see
+broker.py).
+
+Readers page through events by seq (`seq > last seen`), which is only safe
+if events become visible in seq order. On PostgreSQL a transaction could
+take seq N, commit after N+1 is already visible, and be skipped by a
+reader that moved past N+1, so every event insert first takes a
+transaction-level advisory lock held until commit: the next seq is only
+handed out once the previous event's transaction has finished. SQLite
+runs one write transaction at a time, which gives the same order.
+
+The lock can't be released before commit, so record events as the last
+statement of the transaction: then event writers only queue for each
+other's commits, not for whatever work follows the insert.
+"""
+from django.db import connection, transaction
+
+from .models import OrderEvent
+from .stats import invalidate_dashboard_stats
+
+
+EventType = OrderEvent.EventType
+
+
+def event_payload(event):
+    return {
+        'seq': event.seq,
+        'event_type': event.event_type,
+        'order_id': event.order_id,
+        'user_id': event.user_id,
+        'created_at': event.created_at.isoformat(),
+    }
+
+
+# pg_advisory_xact_lock key serialising OrderEvent inserts
+EVENT_SEQ_LOCK = 0x5e9_0001
+
+
+def _lock_event_seq():
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [EVENT_SEQ_LOCK])
+
+
+def record_event(event_type, order_id, user=None):
+    # atomic, so the lock covers the insert even if the caller didn't open a transaction
+    with transaction.atomic():
+        _lock_event_seq()
+        event = OrderEvent.objects.create(
+            event_type=event_type,
+            order_id=order_id,
+            user=user,
+        )
+    transaction.on_commit(invalidate_dashboard_stats)
+    return event
+
+
+def record_events(event_type, orders):
+    """Bulk version of record_event for (order_id, user_id) pairs, one INSERT for all of them"""
+    events = [OrderEvent(event_type=event_type, order_id=order_id, user_id=user_id) for order_id, user_id in orders]
+    if not events:
+        return []
+
+    with transaction.atomic():
+        _lock_event_seq()
+        events = OrderEvent.objects.bulk_create(events)
+
+    transaction.on_commit(invalidate_dashboard_stats)
+    return events
@@ -0,0 +1,144 @@
+"""
+Shared helpers for the admin order feeds: filters, keyset pagination,
+sparse field selection and streaming JSON export.
+"""
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.response import Response
+from rest_framework import status
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Rows pulled from the server-side cursor per round trip in streaming mode
+STREAM_CHUNK_SIZE = 500
+
+
+def _parse_date(value, param):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"'{param}' must be a date in YYYY-MM-DD format")
+
+
+def _parse_int(value, param):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{param}' must be an integer")
+
+
+def apply_filters(queryset, params, item_filter=True):
+    """
+    Narrow a feed queryset using the query params:
+    - from / to : order date range (YYYY-MM-DD, both inclusive)
+    - user      : user id
+    - item      : item id or item name (orders only)
+    """
+    if params.get('from'):
+        queryset = queryset.filter(order_time__date__gte=_parse_date(params['from'], 'from'))
+    if params.get('to'):
+        queryset = queryset.filter(order_time__date__lte=_parse_date(params['to'], 'to'))
+    if params.get('user'):
+        queryset = queryset.filter(user_id=_parse_int(params['user'], 'user'))
+
+    item = params.get('item')
+    if item:
+        if not item_filter:
+            raise ValueError("'item' filter is not supported for this feed")
+        if item.isdigit():
+            queryset = queryset.filter(item_id=int(item))
+        else:
+            queryset = queryset.filter(item__item=item)
+
+    return queryset
+
+
+def parse_fields(params, allowed_fields):
+    """Return the requested subset of fields (?fields=a,b,c) or None for all of them"""
+    raw = params.get('fields')
+    if not raw:
+        return None
+
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def pick_fields(row, fields):
+    if fields is None:
+        return row
+    return {f: row[f] for f in fields}
+
+
+def paginate(queryset, params):
+    """
+    Keyset pagination on the primary key, newest first.
+    ?cursor=<pk> returns rows strictly older than that key, so every page
+    is a single indexed range scan no matter how deep the client goes.
+    """
+    limit = _parse_int(params.get('limit', DEFAULT_PAGE_SIZE), 'limit')
+    if limit < 1:
+        raise ValueError("'limit' must be positive")
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    queryset = queryset.order_by('-pk')
+    if params.get('cursor'):
+        queryset = queryset.filter(pk__lt=_parse_int(params['cursor'], 'cursor'))
+
+    page = list(queryset[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    next_cursor = page[-1].pk if has_more else None
+
+    return page, next_cursor
+
+
+def stream_json(queryset, build_row, fields):
+    """Stream the queryset as a JSON array without materialising it in memory"""
+    def generate():
+        yield '['
+        first = True
+        for obj in queryset.order_by('-pk').iterator(chunk_size=STREAM_CHUNK_SIZE):
+            row = json.dumps(pick_fields(build_row(obj), fields), cls=DjangoJSONEncoder)
+            yield row if first else ',' + row
+            first = False
+        yield ']'
+
+    return StreamingHttpResponse(generate(), content_type='application/json')
+
+
+def feed_response(request, queryset, build_row, allowed_fields, item_filter=True):
+    """
+    Build the response for an admin feed.
+
+    - ?stream=true          : full export streamed as a JSON array
+    - ?limit= / ?cursor=    : one keyset page as {'results': [...], 'next_cursor': ...}
+    - neither               : plain list of every matching row (legacy behaviour)
+    """
+    params = request.query_params
+
+    try:
+        queryset = apply_filters(queryset, params, item_filter=item_filter)
+        fields = parse_fields(params, allowed_fields)
+
+        if params.get('stream') in ('1', 'true'):
+            return stream_json(queryset, build_row, fields)
+
+        if 'limit' in params or 'cursor' in params:
+            page, next_cursor = paginate(queryset, params)
+            return Response({
+                'results': [pick_fields(build_row(obj), fields) for obj in page],
+                'next_cursor': next_cursor,
+            }, status=status.HTTP_200_OK)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = [pick_fields(build_row(obj), fields) for obj in queryset]
+    return Response(data, status=status.HTTP_200_OK)
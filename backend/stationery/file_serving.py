@@ -0,0 +1,153 @@
+"""
+Sending protected media files once a view has checked permissions.
+
+settings.FILE_SERVING_MODE picks who moves the bytes:
+
+  'django'            The app sends the file itself: a FileResponse, which
+                      the WSGI server's wsgi.file_wrapper may hand to
+                      os.sendfile (gunicorn's sync workers do; runserver
+                      reads it in blocks), or for byte ranges a stream of
+                      64 KiB reads. Either way the worker is held for the
+                      whole transfer. The default, for development.
+  'x-accel-redirect'  nginx sends the file; the app only returns headers.
+                      Needs an internal location aliased to MEDIA_ROOT:
+
+                          location /protected-media/ {
+                              internal;
+                              alias /path/to/backend/media/;
+                          }
+
+  'x-sendfile'        Apache mod_xsendfile / lighttpd send the file from
+                      its absolute path.
+
+Every mode answers If-None-Match / If-Modified-Since with a 304 from
+Django, so a repeat fetch never touches the file. Byte ranges (for resumed
+downloads) are served by Django in 'django' mode and by the web server in
+the offloaded modes.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+
+DJANGO = 'django'
+X_ACCEL_REDIRECT = 'x-accel-redirect'
+X_SENDFILE = 'x-sendfile'
+
+RANGE_BLOCK_SIZE = 64 * 1024
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _offloaded_response(filename):
+    content_type, encoding = mimetypes.guess_type(filename)
+    response = HttpResponse(content_type=content_type or 'application/octet-stream')
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
+
+
+def _validators(path, etag):
+    stat = os.stat(path)
+    # a content hash when the caller has one, otherwise mtime + size
+    etag = f'"{etag}"' if etag else f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    return stat.st_size, etag, int(stat.st_mtime)
+
+
+def _requested_range(request, size, etag, last_modified):
+    """
+    (start, end) inclusive for a satisfiable single-range request, None to send
+    the whole file, or False when the range can't be satisfied.
+    Multiple ranges aren't supported and get the whole file.
+    """
+    match = RANGE_PATTERN.match(request.META.get('HTTP_RANGE', '').strip())
+    if not match:
+        return None
+
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+        # the client's partial copy is of another version
+        return None
+
+    first, last = match.groups()
+    if not first:
+        if not last or int(last) == 0:
+            return False
+        # suffix range: the last N bytes
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining:
+            block = f.read(min(RANGE_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def serve_file(request, path, filename, etag=None):
+    """
+    Response that sends the file at `path` (under MEDIA_ROOT) as an attachment
+    called `filename`. Pass the file's content hash as `etag` when known.
+    """
+    size, etag, last_modified = _validators(path, etag)
+    validators = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Accept-Ranges': 'bytes',
+        # protected files: browsers may keep them, shared caches may not, always revalidate
+        'Cache-Control': 'private, no-cache',
+    }
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        if conditional.status_code == 304:
+            for header, value in validators.items():
+                conditional[header] = value
+        return conditional
+
+    mode = settings.FILE_SERVING_MODE
+
+    if mode == X_ACCEL_REDIRECT:
+        response = _offloaded_response(filename)
+        relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        response['X-Accel-Redirect'] = quote(settings.FILE_SERVING_ACCEL_PREFIX.rstrip('/') + '/' + relative)
+    elif mode == X_SENDFILE:
+        response = _offloaded_response(filename)
+        response['X-Sendfile'] = os.path.abspath(path)
+    else:
+        byte_range = _requested_range(request, size, etag, last_modified)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range:
+            start, end = byte_range
+            content_type, _ = mimetypes.guess_type(filename)
+            response = StreamingHttpResponse(_read_range(path, start, end), status=206,
+                                             content_type=content_type or 'application/octet-stream')
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = end - start + 1
+            response['Content-Disposition'] = content_disposition_header(True, filename)
+        else:
+            response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
+
+    for header, value in validators.items():
+        response[header] = value
+    return response
@@ -0,0 +1,106 @@
+"""
+Idempotency-Key support for the submission endpoints.
+
+A client that retries a POST with the same Idempotency-Key header gets
+the stored response of the first attempt back. The key is looked up
+(one indexed query) before the request body is parsed, so a replayed
+multipart upload is never read into temporary files or stored again.
+
+Only successful responses are kept; a failed attempt releases its key
+so the client can retry it. A key whose request never finished (the
+worker was killed or timed out) is held for IDEMPOTENCY_KEY_LEASE from
+its claim, then the next retry takes it over. created_at is the claim
+time: it is set when a request claims the key, so for a row without a
+response it is when the lease started.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def _is_expired(record, now):
+    if record.response_status is None:
+        # claimed but never answered: its request is gone once the lease runs out
+        return record.created_at < now - settings.IDEMPOTENCY_KEY_LEASE
+    return record.created_at < now - settings.IDEMPOTENCY_KEY_TTL
+
+
+def _claim(user, key, endpoint):
+    """Return (record, created); an expired record or abandoned claim for the same key is taken over"""
+    record = IdempotencyKey.objects.filter(user=user, key=key).first()
+
+    if record is None:
+        try:
+            return IdempotencyKey.objects.create(user=user, key=key, endpoint=endpoint), True
+        except IntegrityError:
+            # a concurrent request with the same key got there first
+            return IdempotencyKey.objects.get(user=user, key=key), False
+
+    now = timezone.now()
+    if _is_expired(record, now):
+        taken_over = IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at).update(
+            endpoint=endpoint, response_status=None, response_body=None, created_at=now,
+        )
+        if taken_over:
+            return IdempotencyKey.objects.get(pk=record.pk), True
+        return IdempotencyKey.objects.get(pk=record.pk), False
+
+    return record, False
+
+
+def _still_claimed(record):
+    # a request that outlived its lease leaves the key to the retry that took it over
+    return IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at)
+
+
+def idempotent(method):
+    """Decorator for an APIView handler that honours the Idempotency-Key header"""
+
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}, status=status.HTTP_400_BAD_REQUEST)
+
+        record, created = _claim(request.user, key, request.path)
+
+        if not created:
+            if record.endpoint != request.path:
+                return Response({'error': f'{HEADER} was already used for a different endpoint'}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            if record.response_status is None:
+                return Response({'error': 'A request with this key is still being processed'}, status=status.HTTP_409_CONFLICT)
+            return Response(record.response_body, status=record.response_status, headers={'Idempotent-Replayed': 'true'})
+
+        try:
+            response = method(self, request, *args, **kwargs)
+        except Exception:
+            _still_claimed(record).delete()
+            raise
+
+        if status.is_success(response.status_code):
+            _still_claimed(record).update(response_status=response.status_code, response_body=response.data)
+        else:
+            _still_claimed(record).delete()
+
+        return response
+
+    return wrapper
+
+
+def prune_expired_keys():
+    """Delete stored responses past their TTL, returns the number deleted"""
+    cutoff = timezone.now() - settings.IDEMPOTENCY_KEY_TTL
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from stationery.models import ActivePrintOuts
+from stationery.print_jobs import build_print_jobs, PrintJobError
+
+
+class Command(BaseCommand):
+    help = "Build missing or out-of-date print-ready PDFs for active printouts (e.g. orders placed before a restart)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Rebuild every job, even up-to-date ones")
+
+    def handle(self, *args, **options):
+        built = failed = 0
+        for printout in ActivePrintOuts.objects.select_related('user').order_by('order_time').iterator():
+            try:
+                build_print_jobs(printout, force=options['force'])
+                built += 1
+            except PrintJobError as e:
+                failed += 1
+                self.stderr.write(f"Printout {printout.order_id}: {e}")
+        self.stdout.write(self.style.SUCCESS(f"Print jobs ready for {built} printouts, {failed} failed"))
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from stationery.blobs import collect_garbage, import_existing_files, legacy_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Move printout files stored before deduplication into the blob tree, then delete "
+        "stored blobs that no printout references any more"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-minutes', type=int, default=60,
+                            help="Leave blobs and files younger than this alone (default 60)")
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be imported or deleted")
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f"Would import {legacy_files().count()} printout files into the blob tree")
+        else:
+            self.stdout.write(f"Imported {import_existing_files()} files into the blob tree")
+
+        blobs_deleted, files_deleted = collect_garbage(
+            timedelta(minutes=options['grace_minutes']),
+            dry_run=options['dry_run'],
+        )
+        prefix = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{prefix} {blobs_deleted} unreferenced blobs and {files_deleted} stray files"))
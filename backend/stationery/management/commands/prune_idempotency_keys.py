@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from stationery.idempotency import prune_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Delete stored Idempotency-Key responses older than settings.IDEMPOTENCY_KEY_TTL"
+
+    def handle(self, *args, **options):
+        deleted = prune_expired_keys()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys"))
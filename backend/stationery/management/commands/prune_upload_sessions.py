@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from stationery.uploads import prune_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete chunked uploads not attached to a printout within settings.CHUNKED_UPLOAD_TTL"
+
+    def handle(self, *args, **options):
+        deleted = prune_stale_uploads()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} stale upload sessions"))
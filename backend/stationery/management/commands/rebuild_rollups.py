@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from stationery.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the sales rollup table from the past orders and past printouts tables"
+
+    def handle(self, *args, **options):
+        buckets = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {buckets} rollup buckets"))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from stationery import print_spool
+
+
+class Command(BaseCommand):
+    help = (
+        "Send print batches to the printers in settings.PRINT_SPOOL_PRINTERS and track them until printed. "
+        "Run one worker per site."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-seconds', type=float, default=2.0)
+        parser.add_argument('--once', action='store_true', help="Poll the printers once and exit")
+        parser.add_argument('--no-auto-batch', action='store_true',
+                            help="Only send batches staff created, don't take new ones off the queue")
+
+    def handle(self, *args, **options):
+        auto_batch = not options['no_auto_batch']
+        if options['once']:
+            sent = print_spool.poll(auto_batch=auto_batch)
+            self.stdout.write(self.style.SUCCESS(f"Sent {sent} batches"))
+            return
+
+        for part, uri in settings.PRINT_SPOOL_PRINTERS.items():
+            self.stdout.write(f"{part}: {uri}")
+        try:
+            print_spool.run(options['poll_seconds'], auto_batch=auto_batch)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Print worker stopped"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from stationery.report_jobs import claimable, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run report jobs left pending (e.g. queued just before a server restart), "
+        "and jobs whose worker died while running them (RUNNING longer than settings.REPORT_JOB_TIMEOUT)"
+    )
+
+    def handle(self, *args, **options):
+        job_ids = list(claimable().values_list('pk', flat=True))
+        for job_id in job_ids:
+            run_job(job_id)
+        self.stdout.write(self.style.SUCCESS(f"Processed {len(job_ids)} pending or stale report jobs"))
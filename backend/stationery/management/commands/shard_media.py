@@ -0,0 +1,122 @@
+import filecmp
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from stationery.blobs import BLOB_DIR
+from stationery.models import Items, PrintOut, PrintoutFile, TempFileStorage, UploadSession
+from stationery.utils import shard_path
+
+
+# (model, file field, field whose date the file is sharded under, or None for the file's mtime)
+FILE_FIELDS = (
+    (Items, 'display_image', None),
+    (PrintOut, 'file', 'order_time'),
+    (PrintoutFile, 'file', 'uploaded_at'),
+    (UploadSession, 'file', 'created_at'),
+    (TempFileStorage, 'file', None),
+)
+
+SHARDED = re.compile(r'/\d{4}/\d{2}/\d{2}/[0-9a-f]{2}/[^/]+$')
+
+
+def _is_sharded(name):
+    return bool(SHARDED.search(name)) or name.startswith(BLOB_DIR + '/')
+
+
+def _is_referenced(name):
+    return any(model._base_manager.filter(**{field: name}).exists() for model, field, _ in FILE_FIELDS)
+
+
+def _mtime(path):
+    return datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc)
+
+
+def _link(source, destination):
+    """
+    Hard link (or copy) source to destination. False if destination is
+    already another file; the same file left by an interrupted run is fine.
+    """
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    try:
+        os.link(source, destination)
+    except FileExistsError:
+        return os.path.samefile(source, destination) or filecmp.cmp(source, destination, shallow=False)
+    except OSError:
+        shutil.copy2(source, destination)
+    return True
+
+
+class Command(BaseCommand):
+    help = (
+        "Move media files from the old flat directories into the date/hash sharded layout, "
+        "rewriting their FileField paths in batches while the site stays up"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the files that would move")
+
+    def handle(self, *args, **options):
+        for model, field, date_field in FILE_FIELDS:
+            moved, missing = self.shard_field(model, field, date_field, options)
+            verb = "Would move" if options['dry_run'] else "Moved"
+            self.stdout.write(f"{model.__name__}.{field}: {verb.lower()} {moved} files, {missing} missing on disk")
+
+        self.stdout.write(self.style.SUCCESS("Done"))
+
+    def shard_field(self, model, field, date_field, options):
+        storage = model._meta.get_field(field).storage
+        moved = missing = 0
+        last_pk = None
+
+        while True:
+            rows = model._base_manager.exclude(**{field: ''}).order_by('pk')
+            if last_pk is not None:
+                rows = rows.filter(pk__gt=last_pk)
+            batch = list(rows.values_list('pk', field, *([date_field] if date_field else []))[:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+
+            replaced = []
+            with transaction.atomic():
+                for pk, old_name, *date in batch:
+                    if _is_sharded(old_name):
+                        continue
+                    if not storage.exists(old_name):
+                        missing += 1
+                        continue
+                    if options['dry_run']:
+                        moved += 1
+                        continue
+
+                    old_path = storage.path(old_name)
+                    when = date[0] if date and date[0] else _mtime(old_path)
+                    new_name = shard_path(os.path.dirname(old_name), os.path.basename(old_name), date=when)
+
+                    # the old file stays readable until the row points at the new one
+                    if not _link(old_path, storage.path(new_name)):
+                        self.stderr.write(f"{model.__name__} {pk}: {new_name} is already another file, left at {old_name}")
+                        continue
+                    if model._base_manager.filter(pk=pk, **{field: old_name}).update(**{field: new_name}):
+                        moved += 1
+                        replaced.append(old_name)
+                    elif not _is_referenced(new_name):
+                        # the row changed since the batch was read; don't leave the link behind
+                        storage.delete(new_name)
+
+            for old_name in replaced:
+                if not _is_referenced(old_name):
+                    storage.delete(old_name)
+
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        return moved, missing
@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-19 12:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stationery', '0012_remove_activeprintouts_black_and_white_pages_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('ORDER_CREATED', 'Order created'), ('ORDER_COMPLETED', 'Order completed'), ('PRINTOUT_CREATED', 'Printout created'), ('PRINTOUT_COMPLETED', 'Printout completed')], max_length=20)),
+                ('order_id', models.CharField(max_length=7)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(db_column='user', null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Order Events',
+                'db_table': 'stationery_order_events',
+            },
+        ),
+    ]
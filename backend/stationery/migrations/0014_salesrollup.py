@@ -0,0 +1,42 @@
+# Generated by Django 5.0 on 2026-10-19 12:45
+
+from django.db import migrations, models
+
+
+def populate_rollups(apps, schema_editor):
+    from stationery.rollups import rebuild_rollups
+    rebuild_rollups(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stationery', '0013_orderevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('kind', models.CharField(choices=[('ORDER', 'Order'), ('PRINTOUT', 'Printout')], max_length=8)),
+                ('item', models.CharField(blank=True, max_length=25)),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('black_and_white_pages', models.PositiveIntegerField(default=0)),
+                ('coloured_pages', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'verbose_name_plural': 'Sales Rollups',
+                'db_table': 'stationery_sales_rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='salesrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'hour', 'kind', 'item'), name='unique_sales_rollup_bucket'),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0 on 2026-10-19 12:47
+
+import django.db.models.deletion
+import stationery.utils
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stationery', '0014_salesrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ORDER', 'Orders'), ('PRINTOUT', 'Printouts')], max_length=8)),
+                ('export_format', models.CharField(choices=[('html', 'HTML'), ('csv', 'CSV'), ('xlsx', 'Excel')], default='html', max_length=4)),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=7)),
+                ('cacheable', models.BooleanField(default=False)),
+                ('artifact', models.FileField(blank=True, storage=stationery.utils.reports_storage, upload_to='reports')),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(db_column='requested_by', null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Report Jobs',
+                'db_table': 'stationery_report_jobs',
+                'indexes': [models.Index(fields=['kind', 'export_format', 'start', 'end'], name='report_job_range_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.0 on 2026-10-19 12:50
+
+import django.db.models.deletion
+import django.utils.timezone
+import stationery.utils
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    One table each for orders and printouts, with a status, replacing the
+    active/past table pairs. This adds the new tables;
+    0016_unified_order_status_merge copies the rows over and
+    0016_unified_order_status_drop removes the old tables. Each is its own
+    migration, so on PostgreSQL the data copy is committed before the
+    tables it touched are altered.
+    """
+
+    dependencies = [
+        ('stationery', '0015_reportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Order',
+            fields=[
+                ('order_id', models.AutoField(primary_key=True, serialize=False)),
+                ('quantity', models.PositiveIntegerField()),
+                ('cost', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('custom_message', models.TextField(blank=True)),
+                ('order_time', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('status', models.CharField(choices=[('ACTIVE', 'Active'), ('COMPLETED', 'Completed')], default='ACTIVE', max_length=9)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('item', models.ForeignKey(db_column='item', max_length=25, null=True, on_delete=django.db.models.deletion.SET_NULL, to='stationery.items')),
+                ('user', models.ForeignKey(db_column='user', max_length=50, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Orders',
+                'db_table': 'stationery_orders',
+            },
+        ),
+        migrations.CreateModel(
+            name='PrintOut',
+            fields=[
+                ('order_id', models.AutoField(primary_key=True, serialize=False)),
+                ('cost', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('custom_message', models.TextField(blank=True)),
+                ('order_time', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('file', models.FileField(upload_to=stationery.utils.printout_rename)),
+                ('status', models.CharField(choices=[('ACTIVE', 'Active'), ('COMPLETED', 'Completed')], default='ACTIVE', max_length=9)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(db_column='user', max_length=50, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Print-Outs',
+                'db_table': 'stationery_printouts',
+            },
+        ),
+        migrations.AddField(
+            model_name='printoutfile',
+            name='printout',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='files', to='stationery.printout'),
+        ),
+    ]
@@ -0,0 +1,112 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Drop the active/past tables now that their rows are in the unified ones"""
+
+    dependencies = [
+        ('stationery', '0016_unified_order_status_merge'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='activeprintouts',
+            name='user',
+        ),
+        migrations.RemoveField(
+            model_name='printoutfile',
+            name='printout_active',
+        ),
+        migrations.RemoveField(
+            model_name='pastorders',
+            name='item',
+        ),
+        migrations.RemoveField(
+            model_name='pastorders',
+            name='user',
+        ),
+        migrations.RemoveField(
+            model_name='pastprintouts',
+            name='user',
+        ),
+        migrations.RemoveField(
+            model_name='printoutfile',
+            name='printout_past',
+        ),
+        migrations.DeleteModel(
+            name='ActiveOrders',
+        ),
+        migrations.DeleteModel(
+            name='ActivePrintOuts',
+        ),
+        migrations.DeleteModel(
+            name='PastOrders',
+        ),
+        migrations.DeleteModel(
+            name='PastPrintOuts',
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status', 'ACTIVE')), fields=['order_time'], name='orders_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['order_time'], name='orders_order_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='printout',
+            index=models.Index(condition=models.Q(('status', 'ACTIVE')), fields=['order_time'], name='printouts_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='printout',
+            index=models.Index(fields=['order_time'], name='printouts_order_time_idx'),
+        ),
+        migrations.CreateModel(
+            name='ActiveOrders',
+            fields=[
+            ],
+            options={
+                'verbose_name_plural': 'Active Orders',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('stationery.order',),
+        ),
+        migrations.CreateModel(
+            name='ActivePrintOuts',
+            fields=[
+            ],
+            options={
+                'verbose_name_plural': 'Active Print-Outs',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('stationery.printout',),
+        ),
+        migrations.CreateModel(
+            name='PastOrders',
+            fields=[
+            ],
+            options={
+                'verbose_name_plural': 'Past Orders',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('stationery.order',),
+        ),
+        migrations.CreateModel(
+            name='PastPrintOuts',
+            fields=[
+            ],
+            options={
+                'verbose_name_plural': 'Past Print-Outs',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('stationery.printout',),
+        ),
+    ]
@@ -0,0 +1,81 @@
+from django.core.management.color import no_style
+from django.db import migrations
+
+
+def _merge(connection, active_model, past_model, unified_model, fields):
+    """
+    Copy active and past rows into the unified table. Active rows keep their id.
+    Past rows take their old order_id back as the id (they were copied from
+    an active row with that id). A past row whose order_id isn't a number or
+    is also an active row's id is renumbered: it gets a fresh id after all
+    the others. Returns {past row pk: unified order_id}.
+    """
+    common = ['user_id', 'cost', 'custom_message', 'order_time'] + fields
+
+    taken = set()
+    rows = []
+    for active in active_model.objects.all().iterator():
+        taken.add(active.order_id)
+        rows.append(unified_model(order_id=active.order_id, status='ACTIVE',
+                                  **{f: getattr(active, f) for f in common}))
+
+    past_ids = {}
+    leftovers = []
+    for past in past_model.objects.all().iterator():
+        values = {f: getattr(past, f) for f in common}
+        order_id = int(past.order_id) if str(past.order_id).isdigit() else None
+        if order_id is None or order_id in taken:
+            leftovers.append((past.pk, values))
+            continue
+        taken.add(order_id)
+        past_ids[past.pk] = order_id
+        rows.append(unified_model(order_id=order_id, status='COMPLETED', completed_at=past.order_time, **values))
+
+    unified_model.objects.bulk_create(rows, batch_size=1000)
+
+    # explicit ids were inserted, move the sequence past them before handing
+    # out fresh ones (no-op on SQLite)
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [unified_model]):
+            cursor.execute(sql)
+
+    for past_pk, values in leftovers:
+        row = unified_model.objects.create(status='COMPLETED', completed_at=values['order_time'], **values)
+        past_ids[past_pk] = row.order_id
+
+    return past_ids
+
+
+def merge_order_tables(apps, schema_editor):
+    connection = schema_editor.connection
+    _merge(connection, apps.get_model('stationery', 'ActiveOrders'), apps.get_model('stationery', 'PastOrders'),
+           apps.get_model('stationery', 'Order'), ['item_id', 'quantity'])
+
+    PrintOut = apps.get_model('stationery', 'PrintOut')
+    past_ids = _merge(connection, apps.get_model('stationery', 'ActivePrintOuts'), apps.get_model('stationery', 'PastPrintOuts'), PrintOut, ['file'])
+
+    PrintoutFile = apps.get_model('stationery', 'PrintoutFile')
+    for printout_file in PrintoutFile.objects.all().iterator():
+        if printout_file.printout_active_id:
+            printout_file.printout_id = printout_file.printout_active_id
+        elif printout_file.printout_past_id:
+            printout_file.printout_id = past_ids.get(printout_file.printout_past_id)
+        printout_file.save(update_fields=['printout'])
+
+
+class Migration(migrations.Migration):
+    """
+    Copy active and past orders and printouts into the unified tables and
+    point PrintoutFile rows at them.
+
+    Completed orders and printouts whose old id is also used by an active
+    one are renumbered, so staff will see them under a new id.
+    """
+
+    dependencies = [
+        ('stationery', '0016_unified_order_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_order_tables, elidable=False),
+    ]
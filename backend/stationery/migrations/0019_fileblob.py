@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-19 12:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Files uploaded before this stay where they are, with no blob, until
+    `manage.py collect_file_blobs` moves them into the blob tree.
+    """
+
+    dependencies = [
+        ('stationery', '0018_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('file', models.FileField(max_length=255, upload_to='')),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'File Blobs',
+                'db_table': 'stationery_file_blobs',
+            },
+        ),
+        migrations.AddField(
+            model_name='printoutfile',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='printout_files', to='stationery.fileblob'),
+        ),
+    ]
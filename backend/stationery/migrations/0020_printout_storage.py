@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-19 12:58
+
+import stationery.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stationery', '0019_fileblob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='printout',
+            name='file',
+            field=models.FileField(storage=stationery.utils.printout_storage, upload_to=stationery.utils.printout_rename),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-19 13:06
+
+import django.db.models.deletion
+import django.utils.timezone
+import stationery.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stationery', '0020_printout_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrintJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('part', models.CharField(choices=[('COLOUR', 'Colour'), ('MONO', 'Black & white')], max_length=6)),
+                ('duplex', models.BooleanField(default=False)),
+                ('file', models.FileField(storage=stationery.utils.printout_storage, upload_to=stationery.utils.print_job_path)),
+                ('page_count', models.PositiveIntegerField(default=0)),
+                ('sheet_count', models.PositiveIntegerField(default=0)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('printout', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='print_jobs', to='stationery.printout')),
+            ],
+            options={
+                'verbose_name_plural': 'Print Jobs',
+                'db_table': 'stationery_print_jobs',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='printjob',
+            constraint=models.UniqueConstraint(fields=('printout', 'part'), name='unique_print_job_part'),
+        ),
+    ]
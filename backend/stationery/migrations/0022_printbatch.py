@@ -0,0 +1,42 @@
+# Generated by Django 5.0 on 2026-10-19 13:09
+
+import django.db.models.deletion
+import django.utils.timezone
+import stationery.utils
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stationery', '0021_printjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrintBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('part', models.CharField(choices=[('COLOUR', 'Colour'), ('MONO', 'Black & white')], max_length=6)),
+                ('duplex', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('PRINTED', 'Printed')], default='QUEUED', max_length=7)),
+                ('file', models.FileField(blank=True, upload_to=stationery.utils.print_batch_path)),
+                ('page_count', models.PositiveIntegerField(default=0)),
+                ('sheet_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('printed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(db_column='created_by', null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Print Batches',
+                'db_table': 'stationery_print_batches',
+            },
+        ),
+        migrations.AddField(
+            model_name='printjob',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='stationery.printbatch'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-19 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stationery', '0022_printbatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='printbatch',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='printbatch',
+            name='printer',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='printbatch',
+            name='printer_job_id',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='printbatch',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='printbatch',
+            name='status',
+            field=models.CharField(choices=[('QUEUED', 'Queued'), ('PRINTING', 'Sent to the printer'), ('PRINTED', 'Printed'), ('FAILED', 'Failed')], default='QUEUED', max_length=8),
+        ),
+    ]
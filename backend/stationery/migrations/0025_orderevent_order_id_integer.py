@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stationery', '0024_reportjob_started_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orderevent',
+            name='order_id',
+            field=models.IntegerField(),
+        ),
+    ]
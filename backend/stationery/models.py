@@ -1,6 +1,9 @@
+import uuid
+
 from django.db import models
 from . import utils
 from django.utils.html import mark_safe
+from django.utils import timezone
 from authentication.models import User
 
 
@@ -26,8 +29,26 @@ class Items(models.Model):
 
 
 
-# Model for active orders
-class ActiveOrders(models.Model):
+class OrderStatus(models.TextChoices):
+    ACTIVE = "ACTIVE", 'Active'
+    COMPLETED = "COMPLETED", 'Completed'
+
+
+class ActiveManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(status=OrderStatus.ACTIVE)
+
+
+class CompletedManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(status=OrderStatus.COMPLETED)
+
+
+# Model for all stationery orders, active and completed.
+# Completing an order is a single UPDATE of `status`; the row (and its id) never moves.
+class Order(models.Model):
+
+    Status = OrderStatus
 
     order_id = models.AutoField(primary_key=True)   #auto generated auto incrementing
 
@@ -37,96 +58,122 @@ class ActiveOrders(models.Model):
     quantity = models.PositiveIntegerField()
     cost = models.DecimalField(max_digits=6, decimal_places=2)
     custom_message = models.TextField(blank=True)
-    order_time = models.DateTimeField(auto_now_add=True)
+    order_time = models.DateTimeField(default=timezone.now, editable=False)
+
+    status = models.CharField(max_length=9, choices=OrderStatus.choices, default=OrderStatus.ACTIVE)
+    completed_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return str(self.order_id)
 
     class Meta:
-        db_table = 'stationery_active_orders'  
-        verbose_name_plural = "Active Orders"
+        db_table = 'stationery_orders'
+        verbose_name_plural = "Orders"
+        indexes = [
+            # the active queue is small and hot, keep it in its own (partial) index
+            models.Index(fields=['order_time'], condition=models.Q(status='ACTIVE'), name='orders_active_idx'),
+            models.Index(fields=['order_time'], name='orders_order_time_idx'),
+        ]
 
-# Model for completed (past) orders
-class PastOrders(models.Model):
+# Active orders (status = ACTIVE)
+class ActiveOrders(Order):
 
-    order_id = models.CharField(max_length=7, unique=True, db_index=True)  
+    objects = ActiveManager()
 
-    user = models.ForeignKey(User, max_length=50, on_delete=models.SET_NULL, null=True, db_column='user') 
+    class Meta:
+        proxy = True
+        verbose_name_plural = "Active Orders"
 
-    item = models.ForeignKey(Items, max_length=25, on_delete=models.SET_NULL, null=True, db_column='item')
-    quantity = models.PositiveIntegerField()
-    cost = models.DecimalField(max_digits=6, decimal_places=2)
-    custom_message = models.TextField(blank=True)
-    order_time = models.DateTimeField()
+# Completed (past) orders (status = COMPLETED)
+class PastOrders(Order):
 
-    def __str__(self):
-        return self.order_id
+    objects = CompletedManager()
 
     class Meta:
-        db_table = 'stationery_past_orders'  
+        proxy = True
         verbose_name_plural = "Past Orders"
 
 
-# Model for active printouts
-class ActivePrintOuts(models.Model):
-    
+# Model for all printout orders, active and completed
+class PrintOut(models.Model):
+
+    Status = OrderStatus
+
     order_id = models.AutoField(primary_key=True)
     
     user = models.ForeignKey(User, max_length=50, on_delete=models.SET_NULL, null=True, db_column='user')
     
     cost = models.DecimalField(max_digits=6, decimal_places=2)
     custom_message = models.TextField(blank=True)
-    order_time = models.DateTimeField(auto_now_add=True)
+    order_time = models.DateTimeField(default=timezone.now, editable=False)
+
+    file = models.FileField(upload_to=utils.printout_rename, storage=utils.printout_storage)
 
-    file = models.FileField(upload_to=utils.printout_rename)
+    status = models.CharField(max_length=9, choices=OrderStatus.choices, default=OrderStatus.ACTIVE)
+    completed_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return str(self.order_id)
 
     class Meta:
-        db_table = 'stationery_active_printouts'  
+        db_table = 'stationery_printouts'
+        verbose_name_plural = "Print-Outs"
+        indexes = [
+            models.Index(fields=['order_time'], condition=models.Q(status='ACTIVE'), name='printouts_active_idx'),
+            models.Index(fields=['order_time'], name='printouts_order_time_idx'),
+        ]
+
+# Active printouts (status = ACTIVE)
+class ActivePrintOuts(PrintOut):
+
+    objects = ActiveManager()
+
+    class Meta:
+        proxy = True
         verbose_name_plural = "Active Print-Outs"
         
-# Model for completed (past) printouts
-class PastPrintOuts(models.Model):
+# Completed (past) printouts (status = COMPLETED)
+class PastPrintOuts(PrintOut):
 
-    order_id = models.CharField(max_length=7, unique=True, db_index=True)
+    objects = CompletedManager()
 
-    user = models.ForeignKey(User, max_length=50, on_delete=models.SET_NULL, null=True, db_column='user')   
+    class Meta:
+        proxy = True
+        verbose_name_plural = "Past Print-Outs"
 
-    cost = models.DecimalField(max_digits=6, decimal_places=2)
-    custom_message = models.TextField(blank=True)
-    order_time = models.DateTimeField()
+# One stored copy of a file's contents, shared by every PrintoutFile with the
+# same SHA-256. ref_count is the number of PrintoutFiles pointing at it;
+# `manage.py collect_file_blobs` deletes blobs nothing references any more.
+class FileBlob(models.Model):
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    file = models.FileField(max_length=255)   # stationery/blobs/ab/cd/<sha256>.<ext>
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
 
-    file = models.FileField(upload_to=utils.printout_rename)
-    
     def __str__(self):
-        return self.order_id
+        return f"{self.sha256} ({self.ref_count} refs)"
 
     class Meta:
-        db_table = 'stationery_past_printouts'  
-        verbose_name_plural = "Past Print-Outs"
+        db_table = 'stationery_file_blobs'
+        verbose_name_plural = "File Blobs"
+
 
 class PrintoutFile(models.Model):
     """
     Allows multiple files to be attached to a single printout order.
-    Links to either active or past printout.
+    `file` points at the shared blob's copy when `blob` is set.
     """
-    printout_active = models.ForeignKey(
-        ActivePrintOuts, 
-        related_name='files', 
+    printout = models.ForeignKey(
+        PrintOut,
+        related_name='files',
         on_delete=models.CASCADE,
-        null=True, 
-        blank=True
-    )
-    printout_past = models.ForeignKey(
-        PastPrintOuts, 
-        related_name='files', 
-        on_delete=models.CASCADE,
-        null=True, 
+        null=True,
         blank=True
     )
     file = models.FileField(upload_to=utils.printout_file_rename)
+    blob = models.ForeignKey(FileBlob, related_name='printout_files', on_delete=models.PROTECT, null=True, blank=True)
     file_name = models.CharField(max_length=255, blank=True)  # Original filename
     uploaded_at = models.DateTimeField(auto_now_add=True)
     file_size = models.BigIntegerField(default=0)  # Size in bytes
@@ -137,16 +184,233 @@ class PrintoutFile(models.Model):
     print_on_one_side = models.BooleanField(null=True, blank=True)
     
     def __str__(self):
-        if self.printout_active:
-            return f"File for Active Printout {self.printout_active.order_id}"
-        elif self.printout_past:
-            return f"File for Past Printout {self.printout_past.order_id}"
+        if self.printout_id:
+            return f"File for Printout {self.printout_id}"
         return f"PrintoutFile {self.id}"
     
     class Meta:
         db_table = 'stationery_printout_files'
         verbose_name_plural = "Printout Files"
 
+# Print-ready PDF for one part of a printout: the requested pages of every
+# file in order, behind a separator sheet with the order ID. Colour and
+# mono pages go to different printers, so each is its own part.
+# Rebuilt whenever `fingerprint` no longer matches the order's files.
+class PrintJob(models.Model):
+
+    class Part(models.TextChoices):
+        COLOUR = "COLOUR", 'Colour'
+        MONO = "MONO", 'Black & white'
+
+    printout = models.ForeignKey(PrintOut, related_name='print_jobs', on_delete=models.CASCADE)
+    part = models.CharField(max_length=6, choices=Part.choices)
+    duplex = models.BooleanField(default=False)
+    file = models.FileField(upload_to=utils.print_job_path, storage=utils.printout_storage)
+    page_count = models.PositiveIntegerField(default=0)     # PDF pages, separator and blank backs included
+    sheet_count = models.PositiveIntegerField(default=0)    # sheets of paper
+    fingerprint = models.CharField(max_length=64)
+    built_at = models.DateTimeField(default=timezone.now)
+    # the batch it was sent to the printer in, if any
+    batch = models.ForeignKey('PrintBatch', related_name='jobs', on_delete=models.SET_NULL, null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.part} job for Printout {self.printout_id}"
+
+    class Meta:
+        db_table = 'stationery_print_jobs'
+        verbose_name_plural = "Print Jobs"
+        constraints = [
+            models.UniqueConstraint(fields=['printout', 'part'], name='unique_print_job_part'),
+        ]
+
+
+# Print jobs of several orders with the same colour mode and sides, merged
+# into one PDF so a printer runs them back to back without a settings
+# change. Each order still starts with its separator sheet.
+class PrintBatch(models.Model):
+
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", 'Queued'
+        PRINTING = "PRINTING", 'Sent to the printer'
+        PRINTED = "PRINTED", 'Printed'
+        FAILED = "FAILED", 'Failed'
+
+    part = models.CharField(max_length=6, choices=PrintJob.Part.choices)
+    duplex = models.BooleanField(default=False)
+    status = models.CharField(max_length=8, choices=Status.choices, default=Status.QUEUED)
+    file = models.FileField(upload_to=utils.print_batch_path, blank=True)
+    page_count = models.PositiveIntegerField(default=0)
+    sheet_count = models.PositiveIntegerField(default=0)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, db_column='created_by')
+    created_at = models.DateTimeField(default=timezone.now)
+    # set by the print worker (see stationery/print_spool.py)
+    printer = models.CharField(max_length=50, blank=True)
+    printer_job_id = models.CharField(max_length=50, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    printed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.part} {'two' if self.duplex else 'one'}-sided batch {self.pk} ({self.status})"
+
+    class Meta:
+        db_table = 'stationery_print_batches'
+        verbose_name_plural = "Print Batches"
+
 # For temporarily storing the generated first_page 
 class TempFileStorage(models.Model):
-    file = models.FileField(upload_to=utils.temp_file_rename)
\ No newline at end of file
+    file = models.FileField(upload_to=utils.temp_file_rename)
+
+# Append-only log of order changes, read by the admin change feed.
+# seq only ever grows, so clients can ask for "everything after seq N"
+class OrderEvent(models.Model):
+
+    class EventType(models.TextChoices):
+        ORDER_CREATED = "ORDER_CREATED", 'Order created'
+        ORDER_COMPLETED = "ORDER_COMPLETED", 'Order completed'
+        PRINTOUT_CREATED = "PRINTOUT_CREATED", 'Printout created'
+        PRINTOUT_COMPLETED = "PRINTOUT_COMPLETED", 'Printout completed'
+
+    seq = models.BigAutoField(primary_key=True)
+    event_type = models.CharField(max_length=20, choices=EventType.choices)
+    order_id = models.IntegerField()
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, db_column='user')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.seq} {self.event_type} {self.order_id}"
+
+    class Meta:
+        db_table = 'stationery_order_events'
+        verbose_name_plural = "Order Events"
+
+
+# Pre-aggregated sales per (day, hour, kind, item), kept up to date as orders
+# are completed and rebuildable with `manage.py rebuild_rollups`.
+# Dashboard stats and report summaries read from here instead of scanning
+# the completed orders/printouts.
+class SalesRollup(models.Model):
+
+    class Kind(models.TextChoices):
+        ORDER = "ORDER", 'Order'
+        PRINTOUT = "PRINTOUT", 'Printout'
+
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    kind = models.CharField(max_length=8, choices=Kind.choices)
+    item = models.CharField(max_length=25, blank=True)   # item name at order time, blank for printouts
+
+    orders_count = models.PositiveIntegerField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+    black_and_white_pages = models.PositiveIntegerField(default=0)
+    coloured_pages = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.date} {self.hour:02d}:00 {self.kind} {self.item}"
+
+    class Meta:
+        db_table = 'stationery_sales_rollups'
+        verbose_name_plural = "Sales Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'hour', 'kind', 'item'], name='unique_sales_rollup_bucket'),
+        ]
+
+
+# Custom-range report generated off the request thread.
+# Jobs over closed periods are cacheable: the same range and format is
+# served from the stored artifact instead of being generated again.
+class ReportJob(models.Model):
+
+    class Kind(models.TextChoices):
+        ORDER = "ORDER", 'Orders'
+        PRINTOUT = "PRINTOUT", 'Printouts'
+
+    class Format(models.TextChoices):
+        HTML = "html", 'HTML'
+        CSV = "csv", 'CSV'
+        XLSX = "xlsx", 'Excel'
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", 'Pending'
+        RUNNING = "RUNNING", 'Running'
+        DONE = "DONE", 'Done'
+        FAILED = "FAILED", 'Failed'
+
+    kind = models.CharField(max_length=8, choices=Kind.choices)
+    export_format = models.CharField(max_length=4, choices=Format.choices, default=Format.HTML)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    status = models.CharField(max_length=7, choices=Status.choices, default=Status.PENDING)
+    cacheable = models.BooleanField(default=False)
+    artifact = models.FileField(storage=utils.reports_storage, upload_to='reports', blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, db_column='requested_by')
+    created_at = models.DateTimeField(auto_now_add=True)
+    # when the current run claimed the job; a RUNNING job past settings.REPORT_JOB_TIMEOUT is claimed again
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} report {self.start:%Y-%m-%d %H:%M} - {self.end:%Y-%m-%d %H:%M} ({self.status})"
+
+    class Meta:
+        db_table = 'stationery_report_jobs'
+        verbose_name_plural = "Report Jobs"
+        indexes = [
+            models.Index(fields=['kind', 'export_format', 'start', 'end'], name='report_job_range_idx'),
+        ]
+
+
+# Response stored for a client-supplied Idempotency-Key, so a retried
+# submission returns the original result instead of creating a duplicate.
+# Rows older than settings.IDEMPOTENCY_KEY_TTL are pruned by `prune_idempotency_keys`.
+class IdempotencyKey(models.Model):
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user')
+    key = models.CharField(max_length=255)
+    endpoint = models.CharField(max_length=100)
+    # null while the first request with this key is still being processed
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.key} ({self.endpoint})"
+
+    class Meta:
+        db_table = 'stationery_idempotency_keys'
+        verbose_name_plural = "Idempotency Keys"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+
+
+# A large printout file uploaded in chunks over several requests.
+# Chunks are written straight into `file` on the media volume; once
+# finalized (size and checksum verified) the session id can be passed to
+# create-printout in place of a multipart file, which hard-links the file
+# into the blob store.
+class UploadSession(models.Model):
+
+    class Status(models.TextChoices):
+        UPLOADING = "UPLOADING", 'Uploading'
+        COMPLETE = "COMPLETE", 'Complete'
+        ATTACHED = "ATTACHED", 'Attached to a printout'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user')
+    file = models.FileField(upload_to=utils.chunked_upload_path)
+    file_name = models.CharField(max_length=255)   # original filename
+    file_size = models.BigIntegerField()            # expected total size in bytes
+    received = models.BigIntegerField(default=0)    # bytes written so far
+    checksum = models.CharField(max_length=64, blank=True)   # expected SHA-256, hex
+    status = models.CharField(max_length=9, choices=Status.choices, default=Status.UPLOADING)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.file_name} ({self.received}/{self.file_size}, {self.status})"
+
+    class Meta:
+        db_table = 'stationery_upload_sessions'
+        verbose_name_plural = "Upload Sessions"
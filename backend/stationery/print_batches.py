@@ -0,0 +1,170 @@
+"""
+Batching print jobs across orders.
+
+The shop has a colour printer and a mono printer, so the COLOUR and MONO
+parts of orders (see print_jobs) are queued separately. Within a printer's
+queue, jobs are grouped by sides: switching a printer between one- and
+two-sided costs a settings change, and every job sent costs handling time,
+so a few large batches print more sheets per hour than one job per order.
+
+plan_batch() picks the group a printer should run next:
+
+  * a group whose oldest job has waited PRINT_BATCH_MAX_WAIT goes first,
+    so a small group is never starved by a busy one;
+  * otherwise the group with the most sheets, where any group other than
+    the printer's current mode is charged SWITCH_PENALTY_SHEETS;
+
+and takes its jobs oldest first, up to PRINT_BATCH_MAX_SHEETS. The plan is
+a pure function of the queue, so benchmarks/print_batching.py can replay
+historical orders through the same policy.
+"""
+import math
+from collections import namedtuple
+
+import fitz
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OrderStatus, PrintBatch, PrintJob
+
+
+# a printer settings change is worth about this many printed sheets
+SWITCH_PENALTY_SHEETS = 50
+
+# one queued job: `key` identifies it to the caller, `since` is when its order was placed
+Pending = namedtuple('Pending', 'key sheets since')
+
+
+def plan_batch(queues, current_duplex, now, max_sheets, max_wait):
+    """
+    (duplex, [Pending]) to print next from `queues` ({duplex: [Pending] oldest
+    first}), or None when nothing is pending. `current_duplex` is the
+    printer's mode, None if unknown.
+    """
+    groups = {duplex: queue for duplex, queue in queues.items() if queue}
+    if not groups:
+        return None
+
+    overdue = [duplex for duplex, queue in groups.items() if now - queue[0].since >= max_wait]
+    if overdue:
+        duplex = min(overdue, key=lambda d: groups[d][0].since)
+    else:
+        def score(d):
+            sheets = sum(item.sheets for item in groups[d])
+            switch = current_duplex is not None and d != current_duplex
+            return sheets - (SWITCH_PENALTY_SHEETS if switch else 0), -groups[d][0].since.timestamp()
+        duplex = max(groups, key=score)
+
+    batch = []
+    sheets = 0
+    for item in groups[duplex]:
+        if batch and sheets + item.sheets > max_sheets:
+            break
+        batch.append(item)
+        sheets += item.sheets
+    return duplex, batch
+
+
+def pending_queues(part):
+    """{duplex: [Pending]} of the unbatched jobs of active printouts, oldest order first"""
+    queues = {False: [], True: []}
+    jobs = (
+        PrintJob.objects
+        .filter(part=part, batch__isnull=True, printout__status=OrderStatus.ACTIVE)
+        .order_by('printout__order_time', 'pk')
+        .values_list('pk', 'duplex', 'sheet_count', 'printout__order_time')
+    )
+    for pk, duplex, sheet_count, order_time in jobs:
+        queues[duplex].append(Pending(pk, sheet_count, order_time))
+    return queues
+
+
+def current_mode(part):
+    """Sides setting of the batch last sent to this part's printer, None before the first"""
+    return PrintBatch.objects.filter(part=part).order_by('-created_at', '-pk').values_list('duplex', flat=True).first()
+
+
+def next_batch(part, queues=None, now=None):
+    if queues is None:
+        queues = pending_queues(part)
+    return plan_batch(queues, current_mode(part), now or timezone.now(),
+                      settings.PRINT_BATCH_MAX_SHEETS, settings.PRINT_BATCH_MAX_WAIT)
+
+
+def queue_summary(part):
+    """What is waiting for one printer and the batch it should run next"""
+    queues = pending_queues(part)
+    plan = next_batch(part, queues)
+    return {
+        'part': part,
+        'current_duplex': current_mode(part),
+        'groups': [{
+            'duplex': duplex,
+            'jobs': len(queue),
+            'sheets': sum(item.sheets for item in queue),
+            'oldest_order_time': queue[0].since if queue else None,
+        } for duplex, queue in queues.items()],
+        'next_batch': {
+            'duplex': plan[0],
+            'jobs': len(plan[1]),
+            'sheets': sum(item.sheets for item in plan[1]),
+        } if plan else None,
+    }
+
+
+def _merge(jobs):
+    document = fitz.open()
+    for job in jobs:
+        with fitz.open(job.file.path) as source:
+            document.insert_pdf(source)
+    data = document.tobytes(garbage=3, deflate=True)
+    page_count = document.page_count
+    document.close()
+    return data, page_count
+
+
+def create_batch(part, user=None):
+    """Claim the next planned jobs for `part` into a PrintBatch with its merged PDF, or None if nothing is pending"""
+    with transaction.atomic():
+        plan = next_batch(part)
+        if plan is None:
+            return None
+        duplex, items = plan
+        batch = PrintBatch.objects.create(part=part, duplex=duplex, created_by=user)
+        # jobs another request batched in the meantime stay in that batch
+        claimed = PrintJob.objects.filter(pk__in=[item.key for item in items], batch__isnull=True).update(batch=batch)
+        if not claimed:
+            batch.delete()
+            return None
+
+    jobs = list(batch.jobs.order_by('printout__order_time', 'pk'))
+    try:
+        data, page_count = _merge(jobs)
+    except Exception:
+        # give the jobs back to the queue
+        batch.delete()
+        raise
+
+    batch.page_count = page_count
+    batch.sheet_count = math.ceil(page_count / 2) if duplex else page_count
+    batch.file.save(f'batch-{batch.pk}.pdf', ContentFile(data), save=False)
+    batch.save(update_fields=['file', 'page_count', 'sheet_count'])
+    return batch
+
+
+# states a batch can come off the printer from
+PRINTABLE = (PrintBatch.Status.QUEUED, PrintBatch.Status.PRINTING)
+
+
+def mark_printed(batch):
+    """Mark a queued or sent batch printed; False if it was in any other state"""
+    printed_at = timezone.now()
+    updated = PrintBatch.objects.filter(pk=batch.pk, status__in=PRINTABLE).update(
+        status=PrintBatch.Status.PRINTED, printed_at=printed_at,
+    )
+    if updated:
+        batch.status = PrintBatch.Status.PRINTED
+        batch.printed_at = printed_at
+    return bool(updated)
@@ -0,0 +1,259 @@
+"""
+Print-ready job PDFs for printout orders.
+
+Each PrintoutFile says which of its pages are printed in colour
+(coloured_pages) and which in black & white (black_and_white_pages), and
+whether it is printed on one side. build_print_jobs() extracts exactly those
+pages from every file of an order into at most two PDFs, a COLOUR part and a
+MONO part, each opening with a separator sheet showing the order ID.
+
+A part is printed two-sided when any of its files is. One-sided files in
+such a part get a blank back after every page, and every file starts on a
+fresh sheet, so the whole part can go to the printer as one duplex job.
+
+Jobs are built in the background once the order is committed (submit()),
+stored next to the order's own file and served from there. A job is rebuilt
+when its fingerprint no longer matches the order's files.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import PrintJob, PrintOut
+from .word_to_pdf import docx_to_pdf
+
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='print-job')
+
+# bump when the layout of the generated PDFs changes, so cached jobs are rebuilt
+LAYOUT_VERSION = 1
+
+A4 = fitz.paper_rect('a4')
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tif', '.tiff', '.webp'}
+
+PART_PAGES = {
+    PrintJob.Part.COLOUR: 'coloured_pages',
+    PrintJob.Part.MONO: 'black_and_white_pages',
+}
+
+
+class PrintJobError(Exception):
+    pass
+
+
+def page_numbers(page_ranges, page_count):
+    """1-based pages from a string like '1-5,7,9-12', in the order given, dropping pages the file doesn't have"""
+    pages = []
+    for part in (page_ranges or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                start, end = (int(value) for value in part.split('-', 1))
+            else:
+                start = end = int(part)
+        except ValueError:
+            raise PrintJobError(f"Invalid page range '{part}'")
+        if start > end:
+            raise PrintJobError(f"Invalid page range '{part}': start is after end")
+        # clamp before expanding, so '1-2000000000' costs no more than the file's pages
+        pages.extend(range(max(start, 1), min(end, page_count) + 1))
+    return pages
+
+
+def is_two_sided(printout_file):
+    # unset means one-sided, like the student app's default
+    return printout_file.print_on_one_side is False
+
+
+def fingerprint(printout_files):
+    """Hash of everything a job's contents depend on"""
+    spec = [LAYOUT_VERSION] + [
+        [f.pk, f.blob_id or f.file.name, f.coloured_pages, f.black_and_white_pages, f.print_on_one_side]
+        for f in printout_files
+    ]
+    return hashlib.sha256(json.dumps(spec).encode()).hexdigest()
+
+
+def _open_pdf(printout_file):
+    try:
+        return _open_source(printout_file)
+    except (RuntimeError, ValueError, OSError) as e:
+        # fitz.FileDataError for a damaged file, OSError for a missing one
+        raise PrintJobError(f"Can't read {printout_file.file_name or printout_file.file.name}: {e}")
+
+
+def _open_source(printout_file):
+    path = printout_file.file.path
+    ext = os.path.splitext(printout_file.file_name or path)[1].lower() or os.path.splitext(path)[1].lower()
+    if ext == '.pdf':
+        return fitz.open(path)
+    if ext in IMAGE_EXTENSIONS:
+        with fitz.open(path) as image:
+            return fitz.open('pdf', image.convert_to_pdf())
+    if ext == '.docx':
+        pdf_data = docx_to_pdf.convert_docx_to_pdf(path)
+        if not pdf_data:
+            raise PrintJobError(f"Could not convert {printout_file.file_name} to PDF")
+        return fitz.open('pdf', pdf_data)
+    raise PrintJobError(f"Can't print {printout_file.file_name or path}: unsupported file type")
+
+
+def _add_separator(document, printout, part, duplex, sections):
+    page = document.new_page(width=A4.width, height=A4.height)
+    page.draw_rect(fitz.Rect(0, 0, A4.width, 90), color=None, fill=(0, 0, 0))
+    page.insert_text((40, 62), f"ORDER {printout.order_id}", fontsize=40, fontname='hebo', color=(1, 1, 1))
+
+    user = printout.user
+    lines = [
+        f"{part.label} part, {'two-sided' if duplex else 'one-sided'}",
+        f"Student: {user.name} ({user.email})" if user else "Student: -",
+        f"Ordered: {timezone.localtime(printout.order_time):%Y-%m-%d %H:%M}",
+        "",
+    ]
+    for printout_file, page_ranges, pages in sections:
+        sides = 'two-sided' if is_two_sided(printout_file) else 'one-sided'
+        lines.append(f"{printout_file.file_name or os.path.basename(printout_file.file.name)}")
+        lines.append(f"    pages {page_ranges} ({len(pages)} pages, {sides})")
+    if printout.custom_message:
+        lines += ["", "Message:", printout.custom_message]
+
+    page.insert_textbox(fitz.Rect(40, 120, A4.width - 40, A4.height - 40), '\n'.join(lines), fontsize=12, fontname='helv')
+    if duplex:
+        document.new_page(width=A4.width, height=A4.height)
+
+
+def _blank_like(document, source, page_index):
+    rect = source[page_index].rect
+    document.new_page(width=rect.width, height=rect.height)
+
+
+def render_part(printout, part, printout_files, sources):
+    """
+    (pdf bytes, duplex, page count, sheet count) for one part of the order,
+    or None when no file has pages in it. `sources` caches the opened files
+    across parts; the caller closes them.
+    """
+    field = PART_PAGES[part]
+    sections = []
+    for printout_file in printout_files:
+        page_ranges = getattr(printout_file, field)
+        if not (page_ranges or '').strip():
+            continue
+        if printout_file.pk not in sources:
+            sources[printout_file.pk] = _open_pdf(printout_file)
+        source = sources[printout_file.pk]
+        pages = page_numbers(page_ranges, source.page_count)
+        if pages:
+            sections.append((printout_file, page_ranges, pages, source))
+
+    if not sections:
+        return None
+
+    duplex = any(is_two_sided(printout_file) for printout_file, *_ in sections)
+    document = fitz.open()
+    _add_separator(document, printout, part, duplex, [section[:3] for section in sections])
+
+    for printout_file, _, pages, source in sections:
+        one_sided = not is_two_sided(printout_file)
+        for page in pages:
+            document.insert_pdf(source, from_page=page - 1, to_page=page - 1)
+            if duplex and one_sided:
+                _blank_like(document, source, page - 1)
+        if duplex and document.page_count % 2:
+            # the next file starts on a fresh sheet
+            _blank_like(document, source, pages[-1] - 1)
+
+    page_count = document.page_count
+    sheet_count = math.ceil(page_count / 2) if duplex else page_count
+    data = document.tobytes(garbage=3, deflate=True)
+    document.close()
+    return data, duplex, page_count, sheet_count
+
+
+def _is_current(job, current_fingerprint):
+    return job.fingerprint == current_fingerprint and job.file and os.path.exists(job.file.path)
+
+
+def build_print_jobs(printout, force=False):
+    """The order's print jobs, rebuilding any that are missing or out of date"""
+    printout_files = list(printout.files.exclude(file='').order_by('id'))
+    current_fingerprint = fingerprint(printout_files)
+    jobs = {job.part: job for job in printout.print_jobs.all()}
+
+    if not force and jobs and all(_is_current(job, current_fingerprint) for job in jobs.values()):
+        return sorted(jobs.values(), key=lambda job: job.part)
+
+    built = []
+    sources = {}
+    try:
+        for part in PrintJob.Part:
+            built += _build_part(printout, part, printout_files, sources, jobs.get(part), current_fingerprint)
+    finally:
+        for source in sources.values():
+            source.close()
+
+    if not built:
+        raise PrintJobError("No printable pages in this order")
+    return built
+
+
+def _build_part(printout, part, printout_files, sources, job, current_fingerprint):
+    rendered = render_part(printout, part, printout_files, sources)
+    if rendered is None:
+        if job is not None:
+            job.delete()
+        return []
+
+    data, duplex, page_count, sheet_count = rendered
+    file_field = PrintJob._meta.get_field('file')
+    name = file_field.generate_filename(PrintJob(printout=printout, part=part), f'{part.lower()}.pdf')
+    name = file_field.storage.save(name, ContentFile(data))
+    # a concurrent build of the same order writes the same file and row
+    job, _ = PrintJob.objects.update_or_create(printout=printout, part=part, defaults={
+        'duplex': duplex,
+        'file': name,
+        'page_count': page_count,
+        'sheet_count': sheet_count,
+        'fingerprint': current_fingerprint,
+        'built_at': timezone.now(),
+    })
+    return [job]
+
+
+def run(order_id):
+    close_old_connections()
+    try:
+        printout = PrintOut.objects.select_related('user').filter(order_id=order_id).first()
+        if printout is not None:
+            build_print_jobs(printout)
+    except Exception:
+        # downloading the job builds it again and reports the error
+        logger.exception("Building print jobs for printout %s failed", order_id)
+    finally:
+        close_old_connections()
+
+
+def submit(order_id):
+    """Build the order's print jobs in the background once the current transaction commits"""
+    transaction.on_commit(lambda: _executor.submit(run, order_id))
+
+
+@receiver(post_delete, sender=PrintJob)
+def delete_job_file(sender, instance, **kwargs):
+    if instance.file:
+        instance.file.delete(save=False)
@@ -0,0 +1,354 @@
+"""
+Print worker: sends print batches to the shop's printers and tracks them.
+
+`manage.py run_print_worker` calls poll() in a loop. For each part (COLOUR,
+MONO) it asks that part's printer how the batch it is printing is doing
+and records PRINTED or FAILED on the batch. Once the printer is idle it
+sends the oldest QUEUED batch, or takes a new one off the queue with
+print_batches.create_batch. Only one batch per printer is in flight, so
+orders that arrive meanwhile are still scheduled by print_batches rather
+than sitting in the printer's own spool.
+
+Printers are configured in settings.PRINT_SPOOL_PRINTERS by URI:
+
+  ipp://host:631/printers/name   IPP over HTTP: a CUPS queue or any IPP
+  ipps://...                     Everywhere printer (Print-Job and
+                                 Get-Job-Attributes only)
+  fake://name?ppm=40             FakePrinter, which only takes time
+"""
+import itertools
+import logging
+import statistics
+import struct
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import fitz
+import requests
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import OrderStatus, PrintBatch, PrintJob
+from .print_batches import create_batch, mark_printed
+
+
+logger = logging.getLogger(__name__)
+
+# job states reported by printers
+PENDING = 'pending'
+PROCESSING = 'processing'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+SEND_BLOCK_SIZE = 256 * 1024
+
+
+class PrinterError(Exception):
+    pass
+
+
+# --- IPP (RFC 8010 / 8011), just enough to print a PDF and follow the job ---
+
+IPP_VERSION = b'\x02\x00'
+IPP_PRINT_JOB = 0x0002
+IPP_GET_JOB_ATTRIBUTES = 0x0009
+
+TAG_OPERATION = 0x01
+TAG_JOB = 0x02
+TAG_END = 0x03
+TAG_INTEGER = 0x21
+TAG_ENUM = 0x23
+TAG_KEYWORD = 0x44
+TAG_URI = 0x45
+TAG_CHARSET = 0x47
+TAG_LANGUAGE = 0x48
+TAG_MIME_TYPE = 0x49
+TAG_NAME = 0x42
+
+INTEGER_TAGS = {TAG_INTEGER, TAG_ENUM}
+
+# job-state enum values
+IPP_JOB_STATES = {
+    3: PENDING, 4: PENDING,        # pending, pending-held
+    5: PROCESSING, 6: PROCESSING,  # processing, processing-stopped
+    7: FAILED, 8: FAILED,          # canceled, aborted
+    9: COMPLETED,
+}
+
+
+def _attribute(tag, name, value):
+    if tag in INTEGER_TAGS:
+        value = struct.pack('>i', value)
+    else:
+        value = value.encode('utf-8')
+    name = name.encode('ascii')
+    return struct.pack('>BH', tag, len(name)) + name + struct.pack('>H', len(value)) + value
+
+
+def ipp_request(operation, request_id, operation_attributes, job_attributes=()):
+    body = IPP_VERSION + struct.pack('>HI', operation, request_id)
+    body += bytes([TAG_OPERATION]) + b''.join(_attribute(*a) for a in operation_attributes)
+    if job_attributes:
+        body += bytes([TAG_JOB]) + b''.join(_attribute(*a) for a in job_attributes)
+    return body + bytes([TAG_END])
+
+
+def ipp_response(data):
+    """(status code, {name: value}) with every attribute group flattened; first value of each attribute"""
+    if len(data) < 9:
+        raise PrinterError("Truncated IPP response")
+    status_code, = struct.unpack('>H', data[2:4])
+    attributes = {}
+    position = 8
+    name = None
+    while position < len(data):
+        tag = data[position]
+        position += 1
+        if tag == TAG_END:
+            break
+        if tag < 0x10:
+            # start of the next attribute group
+            continue
+        name_length, = struct.unpack('>H', data[position:position + 2])
+        position += 2
+        if name_length:
+            name = data[position:position + name_length].decode('ascii', 'replace')
+        position += name_length
+        value_length, = struct.unpack('>H', data[position:position + 2])
+        position += 2
+        raw = data[position:position + value_length]
+        position += value_length
+        if name_length == 0 or name in attributes:
+            # additional value of a multi-valued attribute
+            continue
+        attributes[name] = struct.unpack('>i', raw)[0] if tag in INTEGER_TAGS and value_length == 4 else raw.decode('utf-8', 'replace')
+    return status_code, attributes
+
+
+class IppPrinter:
+    """A CUPS queue or network printer spoken to over IPP"""
+
+    def __init__(self, uri, timeout=30):
+        self.uri = uri
+        parts = urlsplit(uri)
+        scheme = 'https' if parts.scheme == 'ipps' else 'http'
+        self.url = f"{scheme}://{parts.hostname}:{parts.port or 631}{parts.path}"
+        self.timeout = timeout
+        self._request_ids = itertools.count(1)
+
+    def _post(self, body):
+        try:
+            response = requests.post(self.url, data=body, timeout=self.timeout,
+                                     headers={'Content-Type': 'application/ipp'})
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise PrinterError(f"{self.uri}: {e}")
+        status_code, attributes = ipp_response(response.content)
+        # 0x0000-0x00ff are successful-ok variants
+        if status_code > 0x00ff:
+            raise PrinterError(f"{self.uri}: IPP status 0x{status_code:04x} {attributes.get('status-message', '')}".strip())
+        return attributes
+
+    def submit(self, path, job_name, duplex, colour):
+        header = ipp_request(IPP_PRINT_JOB, next(self._request_ids), [
+            (TAG_CHARSET, 'attributes-charset', 'utf-8'),
+            (TAG_LANGUAGE, 'attributes-natural-language', 'en'),
+            (TAG_URI, 'printer-uri', self.uri),
+            (TAG_NAME, 'requesting-user-name', 'stationery'),
+            (TAG_NAME, 'job-name', job_name),
+            (TAG_MIME_TYPE, 'document-format', 'application/pdf'),
+        ], [
+            (TAG_KEYWORD, 'sides', 'two-sided-long-edge' if duplex else 'one-sided'),
+            (TAG_KEYWORD, 'print-color-mode', 'color' if colour else 'monochrome'),
+        ])
+
+        def body():
+            # the document follows the attributes; sent chunked, never read into memory
+            yield header
+            with open(path, 'rb') as document:
+                yield from iter(lambda: document.read(SEND_BLOCK_SIZE), b'')
+
+        attributes = self._post(body())
+        if 'job-id' not in attributes:
+            raise PrinterError(f"{self.uri}: no job-id in the Print-Job response")
+        return str(attributes['job-id'])
+
+    def job_state(self, job_id):
+        attributes = self._post(ipp_request(IPP_GET_JOB_ATTRIBUTES, next(self._request_ids), [
+            (TAG_CHARSET, 'attributes-charset', 'utf-8'),
+            (TAG_LANGUAGE, 'attributes-natural-language', 'en'),
+            (TAG_URI, 'printer-uri', self.uri),
+            (TAG_INTEGER, 'job-id', int(job_id)),
+            (TAG_KEYWORD, 'requested-attributes', 'job-state'),
+            (TAG_KEYWORD, '', 'job-state-message'),
+        ]))
+        state = IPP_JOB_STATES.get(attributes.get('job-state'), PENDING)
+        return state, attributes.get('job-state-message', '')
+
+
+class FakePrinter:
+    """
+    Prints nothing. Jobs run one after another, each taking `warmup`
+    seconds plus its pages at `ppm` pages per minute, all divided by
+    `speedup` so simulations can run faster than real time.
+    """
+
+    def __init__(self, uri, ppm=40, warmup=8, speedup=1):
+        self.uri = uri
+        self.ppm = ppm
+        self.warmup = warmup
+        self.speedup = speedup
+        self.jobs = {}
+        self._job_ids = itertools.count(1)
+        self._busy_until = 0.0
+
+    def submit(self, path, job_name, duplex, colour):
+        with fitz.open(path) as document:
+            pages = document.page_count
+        seconds = (self.warmup + pages * 60 / self.ppm) / self.speedup
+        start = max(time.monotonic(), self._busy_until)
+        self._busy_until = start + seconds
+        job_id = str(next(self._job_ids))
+        self.jobs[job_id] = (start, self._busy_until, pages)
+        return job_id
+
+    def job_state(self, job_id):
+        if job_id not in self.jobs:
+            return FAILED, 'unknown job'
+        start, end, pages = self.jobs[job_id]
+        now = time.monotonic()
+        if now < start:
+            return PENDING, ''
+        if now < end:
+            return PROCESSING, ''
+        return COMPLETED, ''
+
+
+_printers = {}
+
+# FakePrinter's keyword arguments, which fake:// URIs set as ?ppm=20&speedup=60
+FAKE_PRINTER_OPTIONS = ('ppm', 'warmup', 'speedup')
+
+
+def _fake_printer_options(uri, query):
+    options = {}
+    for key, values in parse_qs(query).items():
+        if key not in FAKE_PRINTER_OPTIONS:
+            raise PrinterError(f"Unknown option {key!r} in printer URI {uri}; "
+                               f"expected {', '.join(FAKE_PRINTER_OPTIONS)}")
+        try:
+            options[key] = float(values[0])
+        except ValueError:
+            raise PrinterError(f"Option {key!r} in printer URI {uri} must be a number")
+        if options[key] < 0 or (options[key] == 0 and key != 'warmup'):
+            raise PrinterError(f"Option {key!r} in printer URI {uri} must be positive")
+    return options
+
+
+def printer_for(uri):
+    """The printer for a URI, one instance per URI so fake printers keep their state"""
+    if uri not in _printers:
+        parts = urlsplit(uri)
+        if parts.scheme == 'fake':
+            _printers[uri] = FakePrinter(uri, **_fake_printer_options(uri, parts.query))
+        elif parts.scheme in ('ipp', 'ipps'):
+            _printers[uri] = IppPrinter(uri)
+        else:
+            raise PrinterError(f"Unsupported printer URI {uri}")
+    return _printers[uri]
+
+
+def _check(batch, printer):
+    try:
+        state, message = printer.job_state(batch.printer_job_id)
+    except PrinterError as e:
+        # printer unreachable: ask again next time
+        logger.warning("Couldn't get the state of batch %s: %s", batch.pk, e)
+        return
+    if state == COMPLETED:
+        mark_printed(batch)
+    elif state == FAILED:
+        batch.status = PrintBatch.Status.FAILED
+        batch.error = message or 'The printer canceled or aborted the job'
+        batch.save(update_fields=['status', 'error'])
+        # its orders go back on the queue for another batch
+        batch.jobs.update(batch=None)
+
+
+def _send(batch, part, printer):
+    claimed = PrintBatch.objects.filter(pk=batch.pk, status=PrintBatch.Status.QUEUED).update(
+        status=PrintBatch.Status.PRINTING, printer=part.lower(), sent_at=timezone.now(), error='',
+    )
+    if not claimed:
+        return False
+    try:
+        job_id = printer.submit(batch.file.path, f'batch-{batch.pk}', batch.duplex, part == 'COLOUR')
+    except PrinterError as e:
+        # stays queued, so it is sent once the printer is back
+        PrintBatch.objects.filter(pk=batch.pk).update(status=PrintBatch.Status.QUEUED, sent_at=None, error=str(e))
+        logger.warning("Couldn't send batch %s: %s", batch.pk, e)
+        return False
+    PrintBatch.objects.filter(pk=batch.pk).update(printer_job_id=job_id)
+    return True
+
+
+def poll(printers=None, auto_batch=True):
+    """One round over every printer; returns the number of batches sent"""
+    printers = printers or settings.PRINT_SPOOL_PRINTERS
+    sent = 0
+    for part, uri in printers.items():
+        printer = printer_for(uri)
+
+        for batch in PrintBatch.objects.filter(part=part, status=PrintBatch.Status.PRINTING).exclude(printer_job_id=''):
+            _check(batch, printer)
+        if PrintBatch.objects.filter(part=part, status=PrintBatch.Status.PRINTING).exists():
+            continue
+
+        batch = PrintBatch.objects.filter(part=part, status=PrintBatch.Status.QUEUED).exclude(file='').order_by('created_at', 'pk').first()
+        if batch is None and auto_batch:
+            batch = create_batch(part)
+        if batch is not None and _send(batch, part, printer):
+            sent += 1
+    return sent
+
+
+def run(poll_seconds=2.0, auto_batch=True, stop=None):
+    """poll() until `stop` (a threading.Event) is set"""
+    # claimed but never sent: the worker stopped mid-send
+    PrintBatch.objects.filter(status=PrintBatch.Status.PRINTING, printer_job_id='').update(status=PrintBatch.Status.QUEUED)
+    while stop is None or not stop.is_set():
+        try:
+            poll(auto_batch=auto_batch)
+        except Exception:
+            logger.exception("Print worker poll failed")
+        if stop is not None:
+            stop.wait(poll_seconds)
+        else:
+            time.sleep(poll_seconds)
+
+
+def spool_stats(since):
+    """Sheets printed per hour and order time-to-print since `since`, and the current queue depth"""
+    printed = PrintBatch.objects.filter(status=PrintBatch.Status.PRINTED, printed_at__gte=since)
+    sheets = printed.aggregate(sheets=Sum('sheet_count'))['sheets'] or 0
+    hours = (timezone.now() - since).total_seconds() / 3600
+
+    minutes = sorted(
+        (printed_at - order_time).total_seconds() / 60
+        for printed_at, order_time in PrintJob.objects.filter(batch__in=printed)
+        .values_list('batch__printed_at', 'printout__order_time')
+    )
+    waiting = PrintJob.objects.filter(batch__isnull=True, printout__status=OrderStatus.ACTIVE)
+
+    return {
+        'batches_printed': printed.count(),
+        'sheets_printed': sheets,
+        'sheets_per_hour': round(sheets / hours, 1) if hours else 0,
+        'time_to_print_minutes_p50': round(statistics.median(minutes), 1) if minutes else None,
+        'time_to_print_minutes_p95': round(minutes[max(int(len(minutes) * 0.95) - 1, 0)], 1) if minutes else None,
+        'queued_jobs': waiting.count(),
+        'queued_sheets': waiting.aggregate(sheets=Sum('sheet_count'))['sheets'] or 0,
+        'batches_waiting': PrintBatch.objects.filter(status=PrintBatch.Status.QUEUED).count(),
+        'batches_printing': PrintBatch.objects.filter(status=PrintBatch.Status.PRINTING).count(),
+    }
@@ -0,0 +1,159 @@
+"""
+Background generation of custom-range reports.
+
+submit() records a ReportJob and hands it to a small in-process thread
+pool once the request's transaction commits. The worker renders the
+report into a stored artifact (see ReportJob.artifact).
+
+A range counts as closed once it ends in the past and no order from it is
+still active. Its rows can't change after that, so a finished job over a
+closed range is reused for every later request of the same range/format.
+
+Jobs still pending when the process exits are picked up again by
+`manage.py run_report_jobs`. A job whose worker died while running stays
+RUNNING; once it has run for REPORT_JOB_TIMEOUT it counts as stale and
+the command, or a visit to its status page, runs it again.
+"""
+import io
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import ActiveOrders, PastOrders, ActivePrintOuts, PastPrintOuts, ReportJob
+from .report_export import write_csv, write_xlsx, ORDER_COLUMNS, PRINTOUT_COLUMNS
+
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='report-job')
+
+REPORT_SOURCES = {
+    ReportJob.Kind.ORDER: (ActiveOrders, PastOrders, ORDER_COLUMNS, 'stationery/orders/report-pdfs.html'),
+    ReportJob.Kind.PRINTOUT: (ActivePrintOuts, PastPrintOuts, PRINTOUT_COLUMNS, 'stationery/printouts/report-pdfs.html'),
+}
+
+
+def is_closed_period(kind, end):
+    if end >= timezone.now():
+        return False
+    active_model = REPORT_SOURCES[kind][0]
+    return not active_model.objects.filter(order_time__lte=end).exists()
+
+
+def submit(kind, start, end, export_format, user=None):
+    """Return a finished cached job for the range if there is one, otherwise queue a new job"""
+    if kind not in ReportJob.Kind.values:
+        raise ValueError(f"Unknown report kind {kind!r}")
+    if export_format not in ReportJob.Format.values:
+        raise ValueError(f"Unknown export format {export_format!r}")
+
+    cacheable = is_closed_period(kind, end)
+
+    if cacheable:
+        existing = (
+            ReportJob.objects
+            .filter(kind=kind, export_format=export_format, start=start, end=end, cacheable=True)
+            .exclude(status=ReportJob.Status.FAILED)
+            .order_by('-created_at')
+            .first()
+        )
+        if existing:
+            return existing
+
+    job = ReportJob.objects.create(
+        kind=kind,
+        export_format=export_format,
+        start=start,
+        end=end,
+        cacheable=cacheable,
+        requested_by=user,
+    )
+    transaction.on_commit(lambda: _executor.submit(run_job, job.pk))
+    return job
+
+
+def _generate(job):
+    _, past_model, columns, template = REPORT_SOURCES[job.kind]
+
+    records = past_model.objects.filter(order_time__gte=job.start, order_time__lte=job.end).select_related('user')
+    if job.kind == ReportJob.Kind.ORDER:
+        records = records.select_related('item')
+
+    start, end = timezone.localtime(job.start), timezone.localtime(job.end)
+    name = f'{job.kind.lower()}s-{start:%Y%m%d%H%M}-{end:%Y%m%d%H%M}-{job.pk}.{job.export_format}'
+
+    if job.export_format == ReportJob.Format.HTML:
+        html = render_to_string(template, {
+            'all_records': records,
+            'report_type': 'CUSTOM REPORT',
+            'start_date': job.start,
+            'end_date': job.end,
+        })
+        job.artifact.save(name, ContentFile(html.encode('utf-8')), save=False)
+        return
+
+    with tempfile.TemporaryFile() as output:
+        if job.export_format == ReportJob.Format.CSV:
+            text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+            write_csv(text, records, columns)
+            text.flush()
+            text.detach()
+        else:
+            write_xlsx(output, records, columns)
+        output.seek(0)
+        job.artifact.save(name, File(output), save=False)
+
+
+def claimable():
+    """Jobs a worker may claim: pending, or running for longer than REPORT_JOB_TIMEOUT"""
+    stale = timezone.now() - settings.REPORT_JOB_TIMEOUT
+    return ReportJob.objects.filter(
+        Q(status=ReportJob.Status.PENDING)
+        | Q(status=ReportJob.Status.RUNNING, started_at__lt=stale)
+        # claimed before started_at was recorded
+        | Q(status=ReportJob.Status.RUNNING, started_at__isnull=True)
+    )
+
+
+def is_stale(job):
+    return job.status == ReportJob.Status.RUNNING and (
+        job.started_at is None or job.started_at < timezone.now() - settings.REPORT_JOB_TIMEOUT
+    )
+
+
+def resubmit_if_stale(job):
+    """Run a job whose worker died again in the background"""
+    if is_stale(job):
+        _executor.submit(run_job, job.pk)
+
+
+def run_job(job_id):
+    close_old_connections()
+    try:
+        # claim the job, so a job is never run twice at once
+        started_at = timezone.now()
+        claimed = claimable().filter(pk=job_id).update(status=ReportJob.Status.RUNNING, started_at=started_at)
+        if not claimed:
+            return
+
+        job = ReportJob.objects.get(pk=job_id)
+        try:
+            _generate(job)
+            job.status = ReportJob.Status.DONE
+        except Exception as e:
+            job.status = ReportJob.Status.FAILED
+            job.error = str(e)
+        # a run that outlived its claim leaves the job to the run that took it over
+        ReportJob.objects.filter(pk=job_id, started_at=started_at).update(
+            status=job.status,
+            error=job.error,
+            artifact=job.artifact.name or '',
+            finished_at=timezone.now(),
+        )
+    finally:
+        close_old_connections()
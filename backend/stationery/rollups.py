@@ -0,0 +1,152 @@
+"""
+Maintenance and querying of the SalesRollup table.
+
+Completion paths call add_orders()/add_printouts() inside the same
+transaction that marks the row completed. rebuild_rollups()
+recomputes everything from the completed rows and is used by the
+`rebuild_rollups` management command and the initial data migration.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import SalesRollup
+from .utils import count_pages_in_range
+
+
+Kind = SalesRollup.Kind
+
+AMOUNT_FIELDS = ('orders_count', 'quantity', 'black_and_white_pages', 'coloured_pages', 'revenue')
+
+
+def _bucket(order_time):
+    local_time = timezone.localtime(order_time)
+    return local_time.date(), local_time.hour
+
+
+def _printout_pages(files):
+    bw_pages = 0
+    coloured_pages = 0
+    for f in files:
+        bw_pages += count_pages_in_range(f.black_and_white_pages)
+        coloured_pages += count_pages_in_range(f.coloured_pages)
+    return bw_pages, coloured_pages
+
+
+def _increment(date, hour, kind, item, **amounts):
+    bucket = SalesRollup.objects.filter(date=date, hour=hour, kind=kind, item=item)
+    updates = {field: F(field) + value for field, value in amounts.items()}
+
+    if bucket.update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            SalesRollup.objects.create(date=date, hour=hour, kind=kind, item=item, **amounts)
+    except IntegrityError:
+        # someone else created the bucket first
+        bucket.update(**updates)
+
+
+def add_orders(past_orders):
+    """Add completed orders to their buckets, one UPDATE per touched bucket"""
+    totals = defaultdict(lambda: dict.fromkeys(AMOUNT_FIELDS, 0))
+    for order in past_orders:
+        date, hour = _bucket(order.order_time)
+        bucket = totals[(date, hour, Kind.ORDER, order.item.item if order.item else '')]
+        bucket['orders_count'] += 1
+        bucket['quantity'] += order.quantity
+        bucket['revenue'] += order.cost
+
+    for (date, hour, kind, item), amounts in totals.items():
+        _increment(date, hour, kind, item, **amounts)
+
+
+def add_printouts(past_printouts, files_by_printout):
+    """
+    Add completed printouts to their buckets.
+    files_by_printout maps a past printout pk to its PrintoutFile rows.
+    """
+    totals = defaultdict(lambda: dict.fromkeys(AMOUNT_FIELDS, 0))
+    for printout in past_printouts:
+        date, hour = _bucket(printout.order_time)
+        bw_pages, coloured_pages = _printout_pages(files_by_printout.get(printout.pk, []))
+        bucket = totals[(date, hour, Kind.PRINTOUT, '')]
+        bucket['orders_count'] += 1
+        bucket['black_and_white_pages'] += bw_pages
+        bucket['coloured_pages'] += coloured_pages
+        bucket['revenue'] += printout.cost
+
+    for (date, hour, kind, item), amounts in totals.items():
+        _increment(date, hour, kind, item, **amounts)
+
+
+def rebuild_rollups(apps=None):
+    """
+    Recompute every rollup bucket from the past tables.
+    Pass the migration `apps` registry when calling from a data migration.
+    """
+    if apps is None:
+        from .models import PastOrders, PastPrintOuts
+        rollup_model = SalesRollup
+    else:
+        PastOrders = apps.get_model('stationery', 'PastOrders')
+        PastPrintOuts = apps.get_model('stationery', 'PastPrintOuts')
+        rollup_model = apps.get_model('stationery', 'SalesRollup')
+
+    totals = defaultdict(lambda: dict.fromkeys(AMOUNT_FIELDS, 0))
+
+    orders = PastOrders.objects.select_related('item').only('order_time', 'quantity', 'cost', 'item__item')
+    for order in orders.iterator(chunk_size=2000):
+        date, hour = _bucket(order.order_time)
+        bucket = totals[(date, hour, Kind.ORDER, order.item.item if order.item else '')]
+        bucket['orders_count'] += 1
+        bucket['quantity'] += order.quantity
+        bucket['revenue'] += order.cost
+
+    printouts = PastPrintOuts.objects.only('order_time', 'cost').prefetch_related('files')
+    for printout in printouts.iterator(chunk_size=2000):
+        date, hour = _bucket(printout.order_time)
+        bw_pages, coloured_pages = _printout_pages(printout.files.all())
+        bucket = totals[(date, hour, Kind.PRINTOUT, '')]
+        bucket['orders_count'] += 1
+        bucket['black_and_white_pages'] += bw_pages
+        bucket['coloured_pages'] += coloured_pages
+        bucket['revenue'] += printout.cost
+
+    with transaction.atomic():
+        rollup_model.objects.all().delete()
+        rollup_model.objects.bulk_create(
+            [
+                rollup_model(date=date, hour=hour, kind=kind, item=item, **amounts)
+                for (date, hour, kind, item), amounts in totals.items()
+            ],
+            batch_size=1000,
+        )
+
+    return len(totals)
+
+
+def completed_count(date):
+    """Number of orders + printouts placed on `date` that have been completed"""
+    return SalesRollup.objects.filter(date=date).aggregate(total=Sum('orders_count'))['total'] or 0
+
+
+def summarise(kind, start_date, end_date):
+    """Totals, per-item and per-day breakdowns for a date range (both inclusive)"""
+    rollups = SalesRollup.objects.filter(kind=kind, date__gte=start_date, date__lte=end_date)
+    sums = {field: Sum(field) for field in AMOUNT_FIELDS}
+
+    totals = rollups.aggregate(**sums)
+    for field in AMOUNT_FIELDS:
+        totals[field] = totals[field] or (Decimal('0') if field == 'revenue' else 0)
+
+    return {
+        'totals': totals,
+        'by_item': list(rollups.values('item').annotate(**sums).order_by('-revenue')),
+        'by_day': list(rollups.values('date').annotate(**sums).order_by('date')),
+        'by_hour': list(rollups.values('hour').annotate(**sums).order_by('hour')),
+    }
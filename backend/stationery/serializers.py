@@ -11,18 +11,32 @@ class ActiveOrdersSerializer(serializers.ModelSerializer):
     class Meta:
         model = ActiveOrders
         fields = '__all__'
+        read_only_fields = ('status', 'completed_at')
 
 class PastOrdersSerializer(serializers.ModelSerializer):
+    # past orders used to live in their own table with a separate `id` and a
+    # string order_id; keep that shape for existing clients
+    id = serializers.IntegerField(source='pk', read_only=True)
+    order_id = serializers.CharField(read_only=True)
+
     class Meta:
         model = PastOrders
         fields = '__all__'
+        read_only_fields = ('status', 'completed_at')
 
 class ActivePrintoutsSerializer(serializers.ModelSerializer):
     class Meta:
         model = ActivePrintOuts
         fields = '__all__'
+        read_only_fields = ('status', 'completed_at')
+        # not sent when the files come from chunked uploads
+        extra_kwargs = {'file': {'required': False}}
 
 class PastPrintoutsSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='pk', read_only=True)
+    order_id = serializers.CharField(read_only=True)
+
     class Meta:
         model = PastPrintOuts
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        read_only_fields = ('status', 'completed_at')
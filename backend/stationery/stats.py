@@ -0,0 +1,61 @@
+"""
+Dashboard statistics, computed in SQL and cached for a few seconds.
+
+The cache entry is dropped whenever an order or printout is created or
+completed (see events.record_event), so the TTL only bounds staleness for
+changes made outside those paths, e.g. through the Django admin.
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import ActiveOrders, ActivePrintOuts
+from .rollups import completed_count
+
+
+DASHBOARD_STATS_CACHE_KEY = 'stationery:dashboard-stats'
+DASHBOARD_STATS_TTL = 10  # seconds
+
+
+def _active_totals(model, today):
+    today_filter = Q(order_time__date=today)
+    return model.objects.aggregate(
+        active=Count('pk'),
+        today=Count('pk', filter=today_filter),
+        revenue_today=Sum('cost', filter=today_filter),
+    )
+
+
+def compute_dashboard_stats():
+    today = timezone.localdate()
+
+    orders = _active_totals(ActiveOrders, today)
+    printouts = _active_totals(ActivePrintOuts, today)
+
+    revenue = (orders['revenue_today'] or Decimal('0')) + (printouts['revenue_today'] or Decimal('0'))
+
+    return {
+        'new_orders_count': orders['today'] + printouts['today'],
+        # a JSON number, as before (a Decimal is rendered as a string)
+        'total_revenue_today': float(revenue.quantize(Decimal('0.01'))),
+        'completed_orders_count': completed_count(today),
+        'active_orders_count': orders['active'],
+        'active_printouts_count': printouts['active'],
+        'total_active_count': orders['active'] + printouts['active'],
+    }
+
+
+def get_dashboard_stats():
+    # keyed by date so the counters reset at midnight even inside the TTL
+    key = f'{DASHBOARD_STATS_CACHE_KEY}:{timezone.localdate().isoformat()}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats()
+        cache.set(key, stats, DASHBOARD_STATS_TTL)
+    return stats
+
+
+def invalidate_dashboard_stats():
+    cache.delete(f'{DASHBOARD_STATS_CACHE_KEY}:{timezone.localdate().isoformat()}')
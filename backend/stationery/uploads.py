@@ -0,0 +1,169 @@
+"""
+Resumable chunked uploads for large printout files.
+
+A client starts a session with the file's name, size and (optionally)
+SHA-256, then PUTs the bytes in chunks at increasing offsets. Each chunk
+is streamed from the request straight into the session's file on the
+media volume in small blocks, so memory per upload is bounded by
+READ_BLOCK_SIZE whatever the chunk or file size. After a dropped
+connection the client asks the session how much was received and
+continues from there. Finalizing verifies the size and checksum, after
+which the session can be attached to a printout by create-printout, which
+links the file into the blob store (see blobs.py) instead of copying it.
+"""
+import hashlib
+import re
+import uuid
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from .models import UploadSession
+
+
+READ_BLOCK_SIZE = 64 * 1024
+
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class UploadError(Exception):
+    """A rejected upload request, with the HTTP status to answer it with"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _clean_checksum(checksum):
+    checksum = (checksum or '').strip().lower()
+    if checksum and not SHA256_PATTERN.match(checksum):
+        raise UploadError('checksum must be a hex SHA-256 digest')
+    return checksum
+
+
+def start_upload(user, file_name, file_size, checksum=''):
+    if not file_name:
+        raise UploadError('file_name is required')
+    try:
+        file_size = int(file_size)
+    except (TypeError, ValueError):
+        raise UploadError('file_size must be an integer')
+    if not 0 < file_size <= settings.CHUNKED_UPLOAD_MAX_FILE_SIZE:
+        raise UploadError(f'file_size must be between 1 and {settings.CHUNKED_UPLOAD_MAX_FILE_SIZE} bytes')
+
+    session = UploadSession(
+        user=user,
+        file_name=file_name[:255],
+        file_size=file_size,
+        checksum=_clean_checksum(checksum),
+    )
+    # creates the (empty) file at its final location and saves the session
+    session.file.save(file_name, ContentFile(b''))
+    return session
+
+
+def write_chunk(session, offset, stream, length):
+    """
+    Copy `length` bytes from `stream` into the file at `offset`, which must be
+    where the previous chunk ended. Returns the new received byte count; a
+    chunk cut short by a dropped connection still counts what arrived.
+    """
+    if session.status != UploadSession.Status.UPLOADING:
+        raise UploadError('Upload is already finalized', status_code=409)
+    if offset != session.received:
+        raise UploadError(f'Expected a chunk at offset {session.received}', status_code=409)
+    if not 0 < length <= settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+        raise UploadError(f'Chunks must be between 1 and {settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE} bytes')
+    if offset + length > session.file_size:
+        raise UploadError('Chunk goes past the declared file_size')
+
+    remaining = length
+    with open(session.file.path, 'r+b') as destination:
+        destination.seek(offset)
+        while remaining:
+            block = stream.read(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            destination.write(block)
+            remaining -= len(block)
+
+    received = offset + length - remaining
+    # only move forward from the offset this chunk was written at
+    updated = UploadSession.objects.filter(
+        pk=session.pk, received=offset, status=UploadSession.Status.UPLOADING,
+    ).update(received=received)
+    if not updated:
+        raise UploadError('Another chunk was written at the same offset', status_code=409)
+
+    session.received = received
+    return received
+
+
+def finalize_upload(session, checksum=''):
+    """Check the size and SHA-256 of a fully received upload and mark it complete"""
+    if session.status == UploadSession.Status.COMPLETE:
+        return session
+    if session.status != UploadSession.Status.UPLOADING:
+        raise UploadError('Upload is already attached to a printout', status_code=409)
+    if session.received != session.file_size:
+        raise UploadError(f'Upload is incomplete ({session.received} of {session.file_size} bytes)', status_code=409)
+
+    expected = _clean_checksum(checksum) or session.checksum
+    if not expected:
+        raise UploadError('checksum is required')
+
+    digest = hashlib.sha256()
+    with open(session.file.path, 'r+b') as uploaded:
+        # drop anything past file_size left by an interrupted write
+        uploaded.truncate(session.file_size)
+        for block in iter(lambda: uploaded.read(READ_BLOCK_SIZE), b''):
+            digest.update(block)
+
+    if digest.hexdigest() != expected:
+        # the bytes can't be trusted, start the upload over
+        UploadSession.objects.filter(pk=session.pk).update(received=0)
+        session.received = 0
+        raise UploadError('Checksum mismatch, upload the file again')
+
+    session.checksum = expected
+    session.status = UploadSession.Status.COMPLETE
+    session.save(update_fields=['checksum', 'status'])
+    return session
+
+
+@transaction.atomic
+def attach_uploads(user, upload_ids):
+    """Claim the user's finalized uploads for a printout, returned in the given order"""
+    try:
+        upload_ids = [str(uuid.UUID(str(upload_id))) for upload_id in upload_ids]
+    except ValueError:
+        raise UploadError('upload_ids must be upload session ids')
+
+    sessions = UploadSession.objects.select_for_update().filter(
+        pk__in=upload_ids, user=user, status=UploadSession.Status.COMPLETE,
+    )
+    by_id = {str(session.pk): session for session in sessions}
+
+    if len(set(upload_ids)) != len(upload_ids):
+        raise UploadError('upload_ids contains the same upload twice')
+    missing = [upload_id for upload_id in upload_ids if upload_id not in by_id]
+    if missing:
+        raise UploadError(f'Uploads not found or not finalized: {", ".join(missing)}')
+
+    UploadSession.objects.filter(pk__in=upload_ids).update(status=UploadSession.Status.ATTACHED)
+    return [by_id[upload_id] for upload_id in upload_ids]
+
+
+def prune_stale_uploads():
+    """Delete uploads never attached to a printout within CHUNKED_UPLOAD_TTL, with their files"""
+    cutoff = timezone.now() - settings.CHUNKED_UPLOAD_TTL
+    stale = UploadSession.objects.filter(created_at__lt=cutoff).exclude(status=UploadSession.Status.ATTACHED)
+
+    deleted = 0
+    for session in stale.iterator():
+        session.file.delete(save=False)
+        session.delete()
+        deleted += 1
+    return deleted
@@ -10,12 +10,16 @@ urlpatterns = [
     path('active-printouts/', views.GetActivePrintouts.as_view(), name='get_active_printouts'),
     path('past-printouts/', views.GetPastPrintouts.as_view(), name='get_past_printouts'),
     
+    # live updates (server-sent events, served by core.asgi):
+    path('events/stream/', views.order_event_stream, name='order_event_stream'),
+    
     # admin get views:
     path('admin/all-active-orders/', views.AdminGetAllActiveOrders.as_view(), name='admin_all_active_orders'),
     path('admin/all-past-orders/', views.AdminGetAllPastOrders.as_view(), name='admin_all_past_orders'),
     path('admin/all-active-printouts/', views.AdminGetAllActivePrintouts.as_view(), name='admin_all_active_printouts'),
     path('admin/all-past-printouts/', views.AdminGetAllPastPrintouts.as_view(), name='admin_all_past_printouts'),
     path('admin/dashboard-stats/', views.AdminDashboardStats.as_view(), name='admin_dashboard_stats'),
+    path('admin/changes/', views.AdminGetChanges.as_view(), name='admin_changes'),
     
     # admin inventory management:
     path('admin/items/', views.AdminCreateItem.as_view(), name='admin_create_item'),
@@ -24,16 +28,30 @@ urlpatterns = [
     path('admin/items/<int:item_id>/toggle-stock/', views.AdminUpdateItemStock.as_view(), name='admin_toggle_stock'),
     
     # admin order management:
+    path('admin/orders/bulk-complete/', views.AdminBulkCompleteOrders.as_view(), name='admin_bulk_complete_orders'),
+    path('admin/printouts/bundle/', views.PrintoutBatchBundleDownload.as_view(), name='admin_download_printouts_bundle'),
+    path('admin/printouts/bulk-complete/', views.AdminBulkCompletePrintouts.as_view(), name='admin_bulk_complete_printouts'),
     path('admin/orders/<int:order_id>/', views.AdminGetOrderDetails.as_view(), name='admin_order_details'),
     path('admin/orders/<int:order_id>/complete/', views.AdminCompleteOrder.as_view(), name='admin_complete_order'),
     path('admin/printouts/<int:order_id>/', views.AdminGetPrintoutDetails.as_view(), name='admin_printout_details'),
     path('admin/printouts/<int:order_id>/complete/', views.AdminCompletePrintout.as_view(), name='admin_complete_printout'),
     path('admin/printouts/<int:order_id>/download/', views.SecureFileDownload.as_view(), name='admin_download_file'),
+    path('admin/printouts/<int:order_id>/bundle/', views.PrintoutBundleDownload.as_view(), name='admin_download_printout_bundle'),
+    path('admin/printouts/<int:order_id>/print-jobs/', views.AdminGetPrintJobs.as_view(), name='admin_print_jobs'),
+    path('admin/printouts/<int:order_id>/print-jobs/<str:part>/download/', views.PrintJobDownload.as_view(), name='admin_download_print_job'),
+    path('admin/print-queue/', views.AdminPrintQueue.as_view(), name='admin_print_queue'),
+    path('admin/print-queue/batches/', views.AdminCreatePrintBatch.as_view(), name='admin_create_print_batch'),
+    path('admin/print-batches/<int:batch_id>/download/', views.PrintBatchDownload.as_view(), name='admin_download_print_batch'),
+    path('admin/print-batches/<int:batch_id>/printed/', views.AdminMarkBatchPrinted.as_view(), name='admin_mark_print_batch_printed'),
     path('admin/printout-files/<int:file_id>/download/', views.PrintoutFileDownload.as_view(), name='admin_download_printout_file'),
     
     # post views:
     path('create-order/', views.CreateOrder.as_view(), name='create_order'),
     path('create-printout/', views.CreatePrintout.as_view(), name='create_printout'),
+    # chunked uploads for large printout files:
+    path('uploads/', views.StartUpload.as_view(), name='start_upload'),
+    path('uploads/<uuid:upload_id>/', views.UploadChunk.as_view(), name='upload_chunk'),
+    path('uploads/<uuid:upload_id>/finalize/', views.FinalizeUpload.as_view(), name='finalize_upload'),
     path('calculate-cost/', views.CostCalculationView.as_view(), name='calculate_cost'),
     path('generate-firstpage/', views.FirstPageGenerationView.as_view(), name='generate_firstpage'),
     path('img-to-pdf/', views.ImageToPdfAPIView.as_view(), name='img_to_pdf'),
@@ -47,4 +65,7 @@ urlpatterns = [
     # admin panel 'report-generation of Printouts' related views :
     path('printout-reports/<str:duration>/', admin_utils.generate_printout_report, name='generate_printout_report'),
     path('generate_custom_printout_report/', admin_utils.generate_custom_printout_report, name='generate_custom_printout_report'),
+    # admin panel background report jobs :
+    path('report-jobs/<int:job_id>/', admin_utils.report_job_status, name='report_job_status'),
+    path('report-jobs/<int:job_id>/download/', admin_utils.download_report_job, name='download_report_job'),
 ]
\ No newline at end of file
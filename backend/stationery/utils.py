@@ -1,35 +1,125 @@
+import hashlib
 import os
+import re
+import tempfile
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+
+def shard_path(directory, filename, date=None, key=None):
+    """
+    directory/YYYY/MM/DD/<2 hex>/filename: one directory per day, split 256
+    ways by a hash of `key` (the filename by default), so no directory keeps
+    growing as files accumulate. Same arguments, same path.
+    """
+    date = date or timezone.now()
+    prefix = hashlib.md5(str(filename if key is None else key).encode()).hexdigest()[:2]
+    return os.path.join(directory, date.strftime('%Y/%m/%d'), prefix, filename)
+
+
+# a directory shard_path made, or one of its date parents: .../YYYY[/MM[/DD[/xx]]]
+SHARD_DIR = re.compile(r'/(\d{4})(?:/(\d{2})(?:/(\d{2})(?:/[0-9a-f]{2})?)?)?$')
+
+
+def prune_shard_dirs(storage, directory):
+    """
+    Remove the storage's `directory` and its parents while they are empty
+    shard_path directories. Today's stay, as new files are being saved
+    into them.
+    """
+    today = timezone.now().strftime('%Y/%m/%d')
+    while True:
+        match = SHARD_DIR.search(directory)
+        if not match or today.startswith('/'.join(part for part in match.groups() if part)):
+            return
+        try:
+            os.rmdir(storage.path(directory))
+        except OSError:
+            # not empty (or already gone)
+            return
+        directory = os.path.dirname(directory)
+
+
+class ShardedFileSystemStorage(FileSystemStorage):
+    """FileSystemStorage that also removes the shard directories a delete leaves empty"""
+
+    def delete(self, name):
+        super().delete(name)
+        if name:
+            prune_shard_dirs(self, os.path.dirname(str(name).replace('\\', '/')))
+
 
 def upload_display_image(instance, filename):
-    return os.path.join('stationery/display-images', filename)
+    return shard_path('stationery/display-images', filename)
 
 
 def printout_rename(instance, filename):
-    if instance.pk:
-        ext = filename.split('.')[-1]
-        new_name = '{}.{}'.format(instance.order_id, ext) 
+    """
+    <order_id>.<ext> once the printout has an id, a random name before that,
+    sharded by order date. Saved through ReplacingFileSystemStorage, so an
+    older file with the same name is swapped out atomically instead of being
+    looked up and deleted.
+    """
+    ext = os.path.splitext(filename)[1]
+    name = f'{instance.pk}{ext}' if instance.pk else f'{uuid.uuid4().hex}{ext}'
+    return shard_path('stationery/print-outs', name, date=instance.order_time)
 
-        # when we move the record from active table to past table, then we first delete already present file like this
-        for each_file in os.listdir(os.path.join('media/stationery/print-outs')):
-            if (each_file == new_name):
-                os.remove(os.path.join('media/stationery/print-outs', new_name))
 
-        return os.path.join('stationery/print-outs', new_name)
-    else:
-        return filename
+class ReplacingFileSystemStorage(ShardedFileSystemStorage):
+    """
+    Saves under exactly the name it is given, replacing any existing file.
+    The content is written to a temporary file in the same directory and
+    renamed over the target, so readers never see a partial file and
+    concurrent saves of the same name can't interleave. No directory
+    listing or exists() check is needed to pick the name.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    temp.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return str(name).replace('\\', '/')
+
+
+def printout_storage():
+    return ReplacingFileSystemStorage()
+
+
+def print_job_path(instance, filename):
+    """<order_id>-<part>.pdf beside the order's own file; a rebuild replaces it"""
+    name = f'{instance.printout_id}-{instance.part.lower()}.pdf'
+    return shard_path('stationery/print-jobs', name, date=instance.printout.order_time)
+
+
+def print_batch_path(instance, filename):
+    return shard_path('stationery/print-jobs/batches', f'batch-{instance.pk}.pdf', date=instance.created_at)
 
 
 def printout_file_rename(instance, filename):
     """Rename files for PrintoutFile model - supports multiple files per printout"""
-    import uuid
     from datetime import datetime
     
     # Get the printout order_id
-    order_id = None
-    if instance.printout_active:
-        order_id = instance.printout_active.order_id
-    elif instance.printout_past:
-        order_id = instance.printout_past.order_id
+    order_id = instance.printout_id
     
     if order_id:
         ext = filename.split('.')[-1]
@@ -37,10 +127,46 @@ def printout_file_rename(instance, filename):
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         unique_id = str(uuid.uuid4())[:8]
         new_name = f'{order_id}_{timestamp}_{unique_id}.{ext}'
-        return os.path.join('stationery/print-outs', new_name)
+        return shard_path('stationery/print-outs', new_name)
     else:
-        return os.path.join('stationery/print-outs', filename)
+        return shard_path('stationery/print-outs', filename)
     
     
+def chunked_upload_path(instance, filename):
+    """Chunked uploads are written in place, named after their session id"""
+    ext = filename.split('.')[-1]
+    return shard_path('stationery/print-outs/uploads', f'{instance.pk}.{ext}', date=instance.created_at)
+
+
 def temp_file_rename(instance, filename):
-    return os.path.join('stationery/temp-files', filename)
\ No newline at end of file
+    return shard_path('stationery/temp-files', filename)
+
+def count_pages_in_range(page_range_str):
+    """Count total pages from a range string like '1-5,10-15' """
+    if not page_range_str or page_range_str.strip() == '':
+        return 0
+    
+    total = 0
+    parts = page_range_str.split(',')
+    for part in parts:
+        part = part.strip()
+        if '-' in part:
+            try:
+                start, end = part.split('-')
+                total += int(end) - int(start) + 1
+            except:
+                pass
+        else:
+            try:
+                int(part)
+                total += 1
+            except:
+                pass
+    return total
+
+
+def reports_storage():
+    """Generated report artifacts live outside MEDIA_ROOT so they are never publicly served"""
+    from django.conf import settings
+    from django.core.files.storage import FileSystemStorage
+    return FileSystemStorage(location=settings.REPORTS_ROOT)
@@ -10,6 +10,13 @@ from .student_views import (
     CreatePrintout,
 )
 
+# Chunked uploads
+from .upload_views import (
+    StartUpload,
+    UploadChunk,
+    FinalizeUpload,
+)
+
 # Utility views
 from .utility_views import (
     CostCalculationView,
@@ -18,6 +25,9 @@ from .utility_views import (
     ModPdfView,
 )
 
+# Live event stream (ASGI only)
+from .event_stream import order_event_stream
+
 from .admin import (
     AdminGetAllActiveOrders,
     AdminGetAllActivePrintouts,
@@ -26,14 +36,25 @@ from .admin import (
     AdminDashboardStats,
     AdminGetOrderDetails,
     AdminGetPrintoutDetails,
+    AdminGetChanges,
     AdminUpdateItemStock,
     AdminUpdateItem,
     AdminCreateItem,
     AdminDeleteItem,
     AdminCompleteOrder,
     AdminCompletePrintout,
+    AdminBulkCompleteOrders,
+    AdminBulkCompletePrintouts,
     SecureFileDownload,
     PrintoutFileDownload,
+    PrintoutBundleDownload,
+    PrintoutBatchBundleDownload,
+    AdminGetPrintJobs,
+    PrintJobDownload,
+    AdminPrintQueue,
+    AdminCreatePrintBatch,
+    PrintBatchDownload,
+    AdminMarkBatchPrinted,
 )
 
 __all__ = [
@@ -46,12 +67,20 @@ __all__ = [
     'CreateOrder',
     'CreatePrintout',
     
+    # Chunked uploads
+    'StartUpload',
+    'UploadChunk',
+    'FinalizeUpload',
+    
     # Utility views
     'CostCalculationView',
     'FirstPageGenerationView',
     'ImageToPdfAPIView',
     "ModPdfView",
     
+    # Live event stream
+    'order_event_stream',
+    
     # Admin dashboard views
     'AdminGetAllActiveOrders',
     'AdminGetAllActivePrintouts',
@@ -60,6 +89,7 @@ __all__ = [
     'AdminDashboardStats',
     'AdminGetOrderDetails',
     'AdminGetPrintoutDetails',
+    'AdminGetChanges',
     
     # Admin inventory views
     'AdminUpdateItemStock',
@@ -70,8 +100,18 @@ __all__ = [
     # Admin order management views
     'AdminCompleteOrder',
     'AdminCompletePrintout',
+    'AdminBulkCompleteOrders',
+    'AdminBulkCompletePrintouts',
     
     # Admin file access
     'SecureFileDownload',
     'PrintoutFileDownload',
+    'PrintoutBundleDownload',
+    'PrintoutBatchBundleDownload',
+    'AdminGetPrintJobs',
+    'PrintJobDownload',
+    'AdminPrintQueue',
+    'AdminCreatePrintBatch',
+    'PrintBatchDownload',
+    'AdminMarkBatchPrinted',
 ]
@@ -10,6 +10,9 @@ from .dashboard import (
     AdminGetOrderDetails,
     AdminGetPrintoutDetails,
 )
+from .changes import (
+    AdminGetChanges,
+)
 from .inventory import (
     AdminUpdateItemStock,
     AdminUpdateItem,
@@ -19,10 +22,22 @@ from .inventory import (
 from .order_management import (
     AdminCompleteOrder,
     AdminCompletePrintout,
+    AdminBulkCompleteOrders,
+    AdminBulkCompletePrintouts,
 )
 from .file_access import (
     SecureFileDownload,
     PrintoutFileDownload,
+    PrintoutBundleDownload,
+    PrintoutBatchBundleDownload,
+    AdminGetPrintJobs,
+    PrintJobDownload,
+)
+from .print_queue import (
+    AdminPrintQueue,
+    AdminCreatePrintBatch,
+    PrintBatchDownload,
+    AdminMarkBatchPrinted,
 )
 
 __all__ = [
@@ -33,6 +48,7 @@ __all__ = [
     'AdminDashboardStats',
     'AdminGetOrderDetails',
     'AdminGetPrintoutDetails',
+    'AdminGetChanges',
     
     'AdminUpdateItemStock',
     'AdminUpdateItem',
@@ -41,7 +57,17 @@ __all__ = [
     
     'AdminCompleteOrder',
     'AdminCompletePrintout',
+    'AdminBulkCompleteOrders',
+    'AdminBulkCompletePrintouts',
     
     'SecureFileDownload',
     'PrintoutFileDownload',
+    'PrintoutBundleDownload',
+    'PrintoutBatchBundleDownload',
+    'AdminGetPrintJobs',
+    'PrintJobDownload',
+    'AdminPrintQueue',
+    'AdminCreatePrintBatch',
+    'PrintBatchDownload',
+    'AdminMarkBatchPrinted',
 ]
@@ -0,0 +1,76 @@
+"""
+Admin change feed - lets the dashboard apply deltas instead of refetching
+the full active queues.
+"""
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from ...models import ActiveOrders, ActivePrintOuts, OrderEvent
+from ...permissions import IsAdminOrStaff
+from .dashboard import _order_row, _printout_row_builder
+
+
+MAX_EVENTS = 500
+
+
+class AdminGetChanges(APIView):
+    """
+    Get order/printout events with seq greater than ?since=<seq>.
+
+    Created events carry the full row (same shape as the all-active feeds)
+    while the order is still active; completed events only carry the id.
+    Clients keep the returned last_seq and pass it back as `since` on the
+    next poll. If has_more is true, poll again straight away. Without
+    `since` there are no events, only the current last_seq: fetch it before
+    loading the full queues and poll from there.
+    """
+    permission_classes = (IsAdminOrStaff, )
+
+    def get(self, request):
+        if 'since' not in request.query_params:
+            last_seq = OrderEvent.objects.order_by('-seq').values_list('seq', flat=True).first() or 0
+            return Response({'events': [], 'last_seq': last_seq, 'has_more': False}, status=status.HTTP_200_OK)
+        try:
+            since = int(request.query_params['since'])
+        except ValueError:
+            return Response({'error': "'since' must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # events become visible in seq order (see events.py), so nothing below `since` can still appear
+        events = list(OrderEvent.objects.filter(seq__gt=since).order_by('seq')[:MAX_EVENTS + 1])
+        has_more = len(events) > MAX_EVENTS
+        events = events[:MAX_EVENTS]
+
+        # One query per table for the rows of newly created orders
+        created_order_ids = [e.order_id for e in events if e.event_type == OrderEvent.EventType.ORDER_CREATED]
+        created_printout_ids = [e.order_id for e in events if e.event_type == OrderEvent.EventType.PRINTOUT_CREATED]
+
+        orders = ActiveOrders.objects.select_related('user', 'item').in_bulk(created_order_ids)
+        printouts = ActivePrintOuts.objects.select_related('user').prefetch_related('files').in_bulk(created_printout_ids)
+        build_printout_row = _printout_row_builder(request)
+
+        data = []
+        for event in events:
+            row = None
+            if event.event_type == OrderEvent.EventType.ORDER_CREATED:
+                order = orders.get(event.order_id)
+                row = _order_row(order) if order else None
+            elif event.event_type == OrderEvent.EventType.PRINTOUT_CREATED:
+                printout = printouts.get(event.order_id)
+                row = build_printout_row(printout) if printout else None
+
+            data.append({
+                'seq': event.seq,
+                'event_type': event.event_type,
+                'order_id': event.order_id,
+                'created_at': event.created_at,
+                'data': row,
+            })
+
+        last_seq = events[-1].seq if events else since
+
+        return Response({
+            'events': data,
+            'last_seq': last_seq,
+            'has_more': has_more,
+        }, status=status.HTTP_200_OK)
@@ -2,46 +2,44 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from ...models import ActiveOrders, PastOrders, ActivePrintOuts, PastPrintOuts, PrintoutFile
+from ...models import Order, PrintOut, ActiveOrders, PastOrders, ActivePrintOuts, PastPrintOuts
 from ...permissions import IsAdminOrStaff
+from ...feeds import feed_response, parse_fields
+from ...stats import get_dashboard_stats
+from ...utils import count_pages_in_range
 
 
-class AdminGetAllActiveOrders(APIView):
-    """Get all active orders from all users"""
-    permission_classes = (IsAdminOrStaff, )
-    
-    def get(self, request):
-        all_orders = ActiveOrders.objects.select_related('user', 'item').all()
-        
-        data = []
-        for order in all_orders:
-            data.append({
-                'order_id': order.order_id,
-                'user_id': order.user.id if order.user else None,
-                'user_name': order.user.name if order.user else 'Unknown',
-                'user_email': order.user.email if order.user else 'N/A',
-                'item_id': order.item.id if order.item else None,
-                'item_name': order.item.item if order.item else 'Unknown',
-                'quantity': order.quantity,
-                'cost': str(order.cost),
-                'custom_message': order.custom_message,
-                'order_time': order.order_time,
-            })
-        
-        return Response(data, status=status.HTTP_200_OK)
+ORDER_FIELDS = (
+    'order_id', 'user_id', 'user_name', 'user_email', 'item_id', 'item_name',
+    'quantity', 'cost', 'custom_message', 'order_time',
+)
 
+PRINTOUT_FIELDS = (
+    'order_id', 'user_id', 'user_name', 'user_email', 'cost',
+    'custom_message', 'order_time', 'file', 'files',
+)
 
-class AdminGetAllActivePrintouts(APIView):
-    """Get all active printouts from all users"""
-    permission_classes = (IsAdminOrStaff, )
-    
-    def get(self, request):
-        all_printouts = ActivePrintOuts.objects.select_related('user').prefetch_related('files').all()
-        
-        data = []
-        for printout in all_printouts:
-            # Get all files for this printout
-            files_data = []
+
+def _order_row(order):
+    return {
+        'order_id': order.order_id,
+        'user_id': order.user.id if order.user else None,
+        'user_name': order.user.name if order.user else 'Unknown',
+        'user_email': order.user.email if order.user else 'N/A',
+        'item_id': order.item.id if order.item else None,
+        'item_name': order.item.item if order.item else 'Unknown',
+        'quantity': order.quantity,
+        'cost': str(order.cost),
+        'custom_message': order.custom_message,
+        'order_time': order.order_time,
+    }
+
+
+def _printout_row_builder(request, include_files=True):
+    def build(printout):
+        # Get all files for this printout
+        files_data = []
+        if include_files:
             for file_obj in printout.files.all():
                 files_data.append({
                     'file_id': file_obj.id,
@@ -52,118 +50,82 @@ class AdminGetAllActivePrintouts(APIView):
                     'print_on_one_side': file_obj.print_on_one_side,
                     'file_size': file_obj.file_size,
                 })
-            
-            data.append({
-                'order_id': printout.order_id,
-                'user_id': printout.user.id if printout.user else None,
-                'user_name': printout.user.name if printout.user else 'Unknown',
-                'user_email': printout.user.email if printout.user else 'N/A',
-                'cost': str(printout.cost),
-                'custom_message': printout.custom_message,
-                'order_time': printout.order_time,
-                'file': request.build_absolute_uri(printout.file.url) if printout.file else None,
-                'files': files_data,
-            })
-        
-        return Response(data, status=status.HTTP_200_OK)
+
+        return {
+            'order_id': printout.order_id,
+            'user_id': printout.user.id if printout.user else None,
+            'user_name': printout.user.name if printout.user else 'Unknown',
+            'user_email': printout.user.email if printout.user else 'N/A',
+            'cost': str(printout.cost),
+            'custom_message': printout.custom_message,
+            'order_time': printout.order_time,
+            'file': request.build_absolute_uri(printout.file.url) if printout.file else None,
+            'files': files_data,
+        }
+    return build
+
+
+def _printout_feed(request, model):
+    try:
+        fields = parse_fields(request.query_params, PRINTOUT_FIELDS)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    # Skip the files prefetch entirely when the client did not ask for them
+    include_files = fields is None or 'files' in fields
+
+    queryset = model.objects.select_related('user')
+    if include_files:
+        queryset = queryset.prefetch_related('files')
+
+    return feed_response(
+        request,
+        queryset,
+        _printout_row_builder(request, include_files),
+        PRINTOUT_FIELDS,
+        item_filter=False,
+    )
+
+
+class AdminGetAllActiveOrders(APIView):
+    """Get active orders from all users (filterable, paginated or streamed, see feeds.feed_response)"""
+    permission_classes = (IsAdminOrStaff, )
+    
+    def get(self, request):
+        all_orders = ActiveOrders.objects.select_related('user', 'item')
+        return feed_response(request, all_orders, _order_row, ORDER_FIELDS)
+
+
+class AdminGetAllActivePrintouts(APIView):
+    """Get active printouts from all users (filterable, paginated or streamed, see feeds.feed_response)"""
+    permission_classes = (IsAdminOrStaff, )
+    
+    def get(self, request):
+        return _printout_feed(request, ActivePrintOuts)
 
 
 class AdminGetAllPastOrders(APIView):
-    """Get all past orders from all users"""
+    """Get past orders from all users (filterable, paginated or streamed, see feeds.feed_response)"""
     permission_classes = (IsAdminOrStaff, )
     
     def get(self, request):
-        all_orders = PastOrders.objects.select_related('user', 'item').all()
-        
-        data = []
-        for order in all_orders:
-            data.append({
-                'order_id': order.order_id,
-                'user_id': order.user.id if order.user else None,
-                'user_name': order.user.name if order.user else 'Unknown',
-                'user_email': order.user.email if order.user else 'N/A',
-                'item_id': order.item.id if order.item else None,
-                'item_name': order.item.item if order.item else 'Unknown',
-                'quantity': order.quantity,
-                'cost': str(order.cost),
-                'custom_message': order.custom_message,
-                'order_time': order.order_time,
-            })
-        
-        return Response(data, status=status.HTTP_200_OK)
+        all_orders = PastOrders.objects.select_related('user', 'item')
+        return feed_response(request, all_orders, _order_row, ORDER_FIELDS)
 
 
 class AdminGetAllPastPrintouts(APIView):
-    """Get all past printouts from all users"""
+    """Get past printouts from all users (filterable, paginated or streamed, see feeds.feed_response)"""
     permission_classes = (IsAdminOrStaff, )
     
     def get(self, request):
-        all_printouts = PastPrintOuts.objects.select_related('user').prefetch_related('files').all()
-        
-        data = []
-        for printout in all_printouts:
-            # Get all files for this printout
-            files_data = []
-            for file_obj in printout.files.all():
-                files_data.append({
-                    'file_id': file_obj.id,
-                    'file_name': file_obj.file_name,
-                    'file_url': request.build_absolute_uri(file_obj.file.url) if file_obj.file else None,
-                    'coloured_pages': file_obj.coloured_pages,
-                    'black_and_white_pages': file_obj.black_and_white_pages,
-                    'print_on_one_side': file_obj.print_on_one_side,
-                    'file_size': file_obj.file_size,
-                })
-            
-            data.append({
-                'order_id': printout.order_id,
-                'user_id': printout.user.id if printout.user else None,
-                'user_name': printout.user.name if printout.user else 'Unknown',
-                'user_email': printout.user.email if printout.user else 'N/A',
-                'cost': str(printout.cost),
-                'custom_message': printout.custom_message,
-                'order_time': printout.order_time,
-                'file': request.build_absolute_uri(printout.file.url) if printout.file else None,
-                'files': files_data,
-            })
-        
-        return Response(data, status=status.HTTP_200_OK)
+        return _printout_feed(request, PastPrintOuts)
 
 
 class AdminDashboardStats(APIView):
-    """Get dashboard statistics"""
+    """Get dashboard statistics (aggregated in SQL, briefly cached - see stats.py)"""
     permission_classes = (IsAdminOrStaff, )
     
     def get(self, request):
-        from django.utils import timezone
-        
-        today = timezone.now().date()
-        
-        orders_today = ActiveOrders.objects.filter(order_time__date=today)
-        printouts_today = ActivePrintOuts.objects.filter(order_time__date=today)
-        
-        total_orders_today = orders_today.count() + printouts_today.count()
-        total_revenue_today = (
-            sum(float(o.cost) for o in orders_today) + 
-            sum(float(p.cost) for p in printouts_today)
-        )
-        
-        completed_orders_today = (
-            PastOrders.objects.filter(order_time__date=today).count() +
-            PastPrintOuts.objects.filter(order_time__date=today).count()
-        )
-        
-        active_orders_count = ActiveOrders.objects.count()
-        active_printouts_count = ActivePrintOuts.objects.count()
-        
-        return Response({
-            'new_orders_count': total_orders_today,
-            'total_revenue_today': round(total_revenue_today, 2),
-            'completed_orders_count': completed_orders_today,
-            'active_orders_count': active_orders_count,
-            'active_printouts_count': active_printouts_count,
-            'total_active_count': active_orders_count + active_printouts_count,
-        }, status=status.HTTP_200_OK)
+        return Response(get_dashboard_stats(), status=status.HTTP_200_OK)
 
 
 class AdminGetOrderDetails(APIView):
@@ -171,17 +133,11 @@ class AdminGetOrderDetails(APIView):
     permission_classes = (IsAdminOrStaff, )
     
     def get(self, request, order_id):
-        # Try to find in active orders first
         try:
-            order = ActiveOrders.objects.select_related('user', 'item').get(order_id=order_id)
-            is_completed = False
-        except ActiveOrders.DoesNotExist:
-            # Try past orders
-            try:
-                order = PastOrders.objects.select_related('user', 'item').get(order_id=order_id)
-                is_completed = True
-            except PastOrders.DoesNotExist:
-                return Response({'error': 'Order not found'}, status=status.HTTP_404_NOT_FOUND)
+            order = Order.objects.select_related('user', 'item').get(order_id=order_id)
+        except Order.DoesNotExist:
+            return Response({'error': 'Order not found'}, status=status.HTTP_404_NOT_FOUND)
+        is_completed = order.status == Order.Status.COMPLETED
         
         data = {
             'order_id': order.order_id,
@@ -207,40 +163,11 @@ class AdminGetPrintoutDetails(APIView):
     permission_classes = (IsAdminOrStaff, )
     
     def get(self, request, order_id):
-        # Try to find in active printouts first
         try:
-            printout = ActivePrintOuts.objects.select_related('user').prefetch_related('files').get(order_id=order_id)
-            is_completed = False
-        except ActivePrintOuts.DoesNotExist:
-            # Try past printouts
-            try:
-                printout = PastPrintOuts.objects.select_related('user').prefetch_related('files').get(order_id=order_id)
-                is_completed = True
-            except PastPrintOuts.DoesNotExist:
-                return Response({'error': 'Printout not found'}, status=status.HTTP_404_NOT_FOUND)
-        
-        def count_pages_in_range(page_range_str):
-            """Count total pages from a range string like '1-5,10-15' """
-            if not page_range_str or page_range_str.strip() == '':
-                return 0
-            
-            total = 0
-            parts = page_range_str.split(',')
-            for part in parts:
-                part = part.strip()
-                if '-' in part:
-                    try:
-                        start, end = part.split('-')
-                        total += int(end) - int(start) + 1
-                    except:
-                        pass
-                else:
-                    try:
-                        int(part)
-                        total += 1
-                    except:
-                        pass
-            return total
+            printout = PrintOut.objects.select_related('user').prefetch_related('files').get(order_id=order_id)
+        except PrintOut.DoesNotExist:
+            return Response({'error': 'Printout not found'}, status=status.HTTP_404_NOT_FOUND)
+        is_completed = printout.status == PrintOut.Status.COMPLETED
         
         # Get all files for this printout
         files_list = []
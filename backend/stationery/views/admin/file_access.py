@@ -1,12 +1,18 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import FileResponse, Http404
-from django.shortcuts import get_object_or_404
+from django.urls import reverse
 import os
 
-from ...models import ActivePrintOuts, PastPrintOuts, PrintoutFile
+from ...blobs import sha256_from_name
+from ...file_serving import serve_file
+from ...models import PrintJob, PrintOut, PrintoutFile
 from ...permissions import IsAdminOrStaff
+from ...print_jobs import build_print_jobs, PrintJobError
+from ...zip_bundle import bundle_entries, zip_response
+
+
+MAX_BUNDLE_ORDERS = 500
 
 
 class SecureFileDownload(APIView):
@@ -17,19 +23,14 @@ class SecureFileDownload(APIView):
     permission_classes = (IsAdminOrStaff, )
     
     def get(self, request, order_id):
-        printout = None
-        
         try:
-            printout = ActivePrintOuts.objects.get(order_id=order_id)
-        except ActivePrintOuts.DoesNotExist:
-            try:
-                printout = PastPrintOuts.objects.get(order_id=str(order_id))
-            except PastPrintOuts.DoesNotExist:
-                return Response({
-                    'error': 'Printout not found',
-                    'order_id': order_id,
-                    'detail': f'No printout found with order_id={order_id} in active or past printouts'
-                }, status=status.HTTP_404_NOT_FOUND)
+            printout = PrintOut.objects.get(order_id=order_id)
+        except PrintOut.DoesNotExist:
+            return Response({
+                'error': 'Printout not found',
+                'order_id': order_id,
+                'detail': f'No printout found with order_id={order_id}'
+            }, status=status.HTTP_404_NOT_FOUND)
         
         if not printout.file:
             return Response({
@@ -53,9 +54,9 @@ class SecureFileDownload(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
         
         try:
-            response = FileResponse(open(file_path, 'rb'))
-            response['Content-Disposition'] = f'attachment; filename="{os.path.basename(file_path)}"'
-            return response
+            # stored files are named by content hash, name the download after the order
+            return serve_file(request, file_path, f'{order_id}{os.path.splitext(file_path)[1]}',
+                              etag=sha256_from_name(printout.file.name))
         except Exception as e:
             return Response({
                 'error': 'Error serving file',
@@ -71,10 +72,7 @@ class PrintoutFileDownload(APIView):
     
     def get(self, request, file_id):
         try:
-            printout_file = PrintoutFile.objects.select_related(
-                'printout_active', 
-                'printout_past'
-            ).get(id=file_id)
+            printout_file = PrintoutFile.objects.get(id=file_id)
         except PrintoutFile.DoesNotExist:
             return Response({
                 'error': 'File not found',
@@ -104,12 +102,129 @@ class PrintoutFileDownload(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
         
         try:
-            response = FileResponse(open(file_path, 'rb'))
-            filename = printout_file.file_name or os.path.basename(file_path)
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+            return serve_file(request, file_path, printout_file.file_name or os.path.basename(file_path),
+                              etag=printout_file.blob_id)
         except Exception as e:
             return Response({
                 'error': 'Error serving file',
                 'detail': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class PrintoutBundleDownload(APIView):
+    """
+    All files of one printout as a single ZIP, streamed as it is built.
+    """
+    permission_classes = (IsAdminOrStaff, )
+
+    def get(self, request, order_id):
+        if not PrintOut.objects.filter(order_id=order_id).exists():
+            return Response({
+                'error': 'Printout not found',
+                'order_id': order_id,
+                'detail': f'No printout found with order_id={order_id}'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        entries = bundle_entries([order_id])
+        if not entries:
+            return Response({
+                'error': 'No files found on server for this order',
+                'order_id': order_id
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return zip_response(entries, f'printout-{order_id}.zip')
+
+
+class PrintoutBatchBundleDownload(APIView):
+    """
+    Files of several printouts as one streamed ZIP, one folder per order.
+    Expected query: ?order_ids=12,13,17
+    """
+    permission_classes = (IsAdminOrStaff, )
+
+    def get(self, request):
+        try:
+            order_ids = [int(order_id) for order_id in request.query_params.get('order_ids', '').split(',') if order_id.strip()]
+        except ValueError:
+            return Response({'error': 'order_ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if not order_ids:
+            return Response({'error': 'order_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(order_ids) > MAX_BUNDLE_ORDERS:
+            return Response({'error': f'At most {MAX_BUNDLE_ORDERS} orders per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+        entries = bundle_entries(list(dict.fromkeys(order_ids)))
+        if not entries:
+            return Response({'error': 'No files found on server for these orders'}, status=status.HTTP_404_NOT_FOUND)
+
+        return zip_response(entries, f'printouts-{len(order_ids)}-orders.zip')
+
+
+class AdminGetPrintJobs(APIView):
+    """
+    Print-ready PDFs of a printout: a colour part and a mono part, each with
+    exactly the requested pages behind a separator sheet. Built now if the
+    background build hasn't finished or the order's files have changed.
+    """
+    permission_classes = (IsAdminOrStaff, )
+
+    def get(self, request, order_id):
+        printout = PrintOut.objects.select_related('user').filter(order_id=order_id).first()
+        if printout is None:
+            return Response({
+                'error': 'Printout not found',
+                'order_id': order_id,
+                'detail': f'No printout found with order_id={order_id}'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            jobs = build_print_jobs(printout)
+        except PrintJobError as e:
+            return Response({'error': str(e), 'order_id': order_id}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        return Response({
+            'order_id': order_id,
+            'print_jobs': [{
+                'part': job.part,
+                'duplex': job.duplex,
+                'page_count': job.page_count,
+                'sheet_count': job.sheet_count,
+                'built_at': job.built_at,
+                'batch_id': job.batch_id,
+                'print_status': job.batch.status if job.batch_id else None,
+                'download_url': reverse('admin_download_print_job', args=[order_id, job.part.lower()]),
+            } for job in jobs],
+        })
+
+
+class PrintJobDownload(APIView):
+    """
+    Download one part ('colour' or 'mono') of a printout's print-ready PDF.
+    """
+    permission_classes = (IsAdminOrStaff, )
+
+    def get(self, request, order_id, part):
+        part = part.upper()
+        if part not in PrintJob.Part.values:
+            return Response({'error': 'Unknown part, use one of: colour, mono'}, status=status.HTTP_404_NOT_FOUND)
+
+        printout = PrintOut.objects.select_related('user').filter(order_id=order_id).first()
+        if printout is None:
+            return Response({
+                'error': 'Printout not found',
+                'order_id': order_id,
+                'detail': f'No printout found with order_id={order_id}'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            jobs = build_print_jobs(printout)
+        except PrintJobError as e:
+            return Response({'error': str(e), 'order_id': order_id}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        job = next((job for job in jobs if job.part == part), None)
+        if job is None:
+            return Response({
+                'error': f'This order has no {PrintJob.Part(part).label.lower()} pages',
+                'order_id': order_id
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return serve_file(request, job.file.path, f'{order_id}-{part.lower()}.pdf', etag=job.fingerprint)
@@ -5,69 +5,91 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from ...models import ActiveOrders, PastOrders, ActivePrintOuts, PastPrintOuts
+from ...completion import complete_orders, complete_printouts, COMPLETED, NOT_FOUND
 from ...permissions import IsAdminOrStaff
 
 
+MAX_BULK_COMPLETE = 500
+
+
+def _bulk_complete(request, complete):
+    # Expected format: {'order_ids': [12, 13, 17]}
+    order_ids = request.data.get('order_ids')
+
+    if not isinstance(order_ids, list) or not order_ids:
+        return Response({'error': 'order_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(order_ids) > MAX_BULK_COMPLETE:
+        return Response({'error': f'At most {MAX_BULK_COMPLETE} orders per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        order_ids = [int(order_id) for order_id in order_ids]
+    except (TypeError, ValueError):
+        return Response({'error': 'order_ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results = complete(order_ids)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return Response({
+        'completed_count': sum(1 for result in results.values() if result == COMPLETED),
+        'results': [{'order_id': order_id, 'result': result} for order_id, result in results.items()],
+    }, status=status.HTTP_200_OK)
+
+
 class AdminCompleteOrder(APIView):
     """Mark an active order as completed (move to past orders) """
     permission_classes = (IsAdminOrStaff, )
-    
+
     def post(self, request, order_id):
         try:
-            active_order = ActiveOrders.objects.get(order_id=order_id)
-            
-            past_order = PastOrders(
-                order_id=str(order_id),
-                user=active_order.user,
-                item=active_order.item,
-                quantity=active_order.quantity,
-                cost=active_order.cost,
-                custom_message=active_order.custom_message,
-                order_time=active_order.order_time
-            )
-            past_order.save()
-            
-            active_order.delete()
-            
-            return Response({
-                'message': 'Order marked as completed',
-                'order_id': order_id
-            }, status=status.HTTP_200_OK)
-        except ActiveOrders.DoesNotExist:
-            return Response({'error': 'Order not found'}, status=status.HTTP_404_NOT_FOUND)
+            result = complete_orders([order_id])[order_id]
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        if result == NOT_FOUND:
+            return Response({'error': 'Order not found'}, status=status.HTTP_404_NOT_FOUND)
+        if result != COMPLETED:
+            return Response({'error': 'Order already completed'}, status=status.HTTP_409_CONFLICT)
+
+        return Response({
+            'message': 'Order marked as completed',
+            'order_id': order_id
+        }, status=status.HTTP_200_OK)
+
 
 class AdminCompletePrintout(APIView):
     """Mark an active printout as completed (move to past printouts) """
     permission_classes = (IsAdminOrStaff, )
-    
+
     def post(self, request, order_id):
         try:
-            active_printout = ActivePrintOuts.objects.get(order_id=order_id)
-            
-            past_printout = PastPrintOuts(
-                order_id=str(order_id),
-                user=active_printout.user,
-                coloured_pages=active_printout.coloured_pages,
-                black_and_white_pages=active_printout.black_and_white_pages,
-                print_on_one_side=active_printout.print_on_one_side,
-                cost=active_printout.cost,
-                custom_message=active_printout.custom_message,
-                order_time=active_printout.order_time,
-                file=active_printout.file
-            )
-            past_printout.save()
-            
-            active_printout.delete()
-            
-            return Response({
-                'message': 'Printout marked as completed',
-                'order_id': order_id
-            }, status=status.HTTP_200_OK)
-        except ActivePrintOuts.DoesNotExist:
-            return Response({'error': 'Printout not found'}, status=status.HTTP_404_NOT_FOUND)
+            result = complete_printouts([order_id])[order_id]
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        if result == NOT_FOUND:
+            return Response({'error': 'Printout not found'}, status=status.HTTP_404_NOT_FOUND)
+        if result != COMPLETED:
+            return Response({'error': 'Printout already completed'}, status=status.HTTP_409_CONFLICT)
+
+        return Response({
+            'message': 'Printout marked as completed',
+            'order_id': order_id
+        }, status=status.HTTP_200_OK)
+
+
+class AdminBulkCompleteOrders(APIView):
+    """Complete many active orders in one transaction, with a result per order ID """
+    permission_classes = (IsAdminOrStaff, )
+
+    def post(self, request):
+        return _bulk_complete(request, complete_orders)
+
+
+class AdminBulkCompletePrintouts(APIView):
+    """Complete many active printouts in one transaction, with a result per order ID """
+    permission_classes = (IsAdminOrStaff, )
+
+    def post(self, request):
+        return _bulk_complete(request, complete_printouts)
@@ -0,0 +1,122 @@
+"""
+Admin print queue - batches of print jobs across orders, per printer
+"""
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from ...file_serving import serve_file
+from ...models import PrintBatch, PrintJob
+from ...permissions import IsAdminOrStaff
+from ...print_batches import create_batch, mark_printed, queue_summary
+from ...print_spool import spool_stats
+
+
+# throughput stats cover at most a year
+MAX_STATS_HOURS = 24 * 366
+
+
+def _batch_row(batch):
+    return {
+        'batch_id': batch.pk,
+        'part': batch.part,
+        'duplex': batch.duplex,
+        'status': batch.status,
+        'page_count': batch.page_count,
+        'sheet_count': batch.sheet_count,
+        'order_ids': [job.printout_id for job in batch.jobs.all()],
+        'created_at': batch.created_at,
+        'printer_job_id': batch.printer_job_id,
+        'sent_at': batch.sent_at,
+        'printed_at': batch.printed_at,
+        'error': batch.error,
+        'download_url': reverse('admin_download_print_batch', args=[batch.pk]),
+    }
+
+
+class AdminPrintQueue(APIView):
+    """
+    Pending print jobs per printer (colour / mono), grouped by sides, with
+    the batch each printer should run next, the batches not yet printed,
+    and print worker throughput over the last ?hours= (default 24).
+    """
+    permission_classes = (IsAdminOrStaff, )
+
+    def get(self, request):
+        try:
+            hours = float(request.query_params.get('hours', 24))
+        except ValueError:
+            hours = None
+        # also rejects nan and inf, which float() accepts
+        if hours is None or not 0 < hours <= MAX_STATS_HOURS:
+            return Response({'error': f'hours must be a number above 0 and at most {MAX_STATS_HOURS}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        since = timezone.now() - timedelta(hours=hours)
+
+        unfinished = (
+            PrintBatch.objects
+            .filter(status__in=[PrintBatch.Status.QUEUED, PrintBatch.Status.PRINTING])
+            .prefetch_related('jobs')
+            .order_by('created_at')
+        )
+        return Response({
+            'printers': [queue_summary(part) for part in PrintJob.Part.values],
+            'queued_batches': [_batch_row(batch) for batch in unfinished],
+            'stats': spool_stats(since),
+        })
+
+
+class AdminCreatePrintBatch(APIView):
+    """
+    Take the next planned batch for a printer off the queue and merge its jobs.
+    Expected format: {'part': 'COLOUR'} or {'part': 'MONO'}
+    """
+    permission_classes = (IsAdminOrStaff, )
+
+    def post(self, request):
+        part = str(request.data.get('part', '')).upper()
+        if part not in PrintJob.Part.values:
+            return Response({'error': 'part must be COLOUR or MONO'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            batch = create_batch(part, request.user)
+        except Exception as e:
+            return Response({'error': 'Error building batch', 'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        if batch is None:
+            return Response({'error': f'No pending {part.lower()} print jobs'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(_batch_row(batch), status=status.HTTP_201_CREATED)
+
+
+class PrintBatchDownload(APIView):
+    """
+    Download the merged PDF of a print batch.
+    """
+    permission_classes = (IsAdminOrStaff, )
+
+    def get(self, request, batch_id):
+        batch = PrintBatch.objects.filter(pk=batch_id).first()
+        if batch is None or not batch.file:
+            return Response({'error': 'Print batch not found', 'batch_id': batch_id}, status=status.HTTP_404_NOT_FOUND)
+        return serve_file(request, batch.file.path, f'batch-{batch_id}-{batch.part.lower()}.pdf')
+
+
+class AdminMarkBatchPrinted(APIView):
+    """
+    Record that a queued or sent batch has come off the printer; 409 for
+    batches already printed or failed.
+    """
+    permission_classes = (IsAdminOrStaff, )
+
+    def post(self, request, batch_id):
+        batch = PrintBatch.objects.filter(pk=batch_id).first()
+        if batch is None:
+            return Response({'error': 'Print batch not found', 'batch_id': batch_id}, status=status.HTTP_404_NOT_FOUND)
+        if not mark_printed(batch):
+            batch.refresh_from_db(fields=['status'])
+            return Response({'error': f'Print batch is {batch.get_status_display().lower()}', 'batch_id': batch_id},
+                            status=status.HTTP_409_CONFLICT)
+        return Response(_batch_row(batch))
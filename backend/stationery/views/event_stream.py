@@ -0,0 +1,127 @@
+"""
+Server-sent events stream for order and printout status changes.
+
+Served by the ASGI app in core/asgi.py, which runs as its own process next
+to the WSGI workers. A WSGI server would hold a worker for the whole
+connection and send nothing: Django collects an async iterator into a list
+before handing it to WSGI, and this one never ends. Under WSGI the view
+answers 501 instead.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.http import StreamingHttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from ..broker import broker, latest_seq
+from ..events import event_payload
+from ..models import OrderEvent
+
+
+HEARTBEAT_SECONDS = 15
+REPLAY_PAGE_SIZE = 500
+
+
+def _authenticate(request):
+    """
+    Resolve the user from the usual Bearer header, or from ?token= since
+    the browser EventSource API can't set headers.
+    """
+    auth = JWTAuthentication()
+    try:
+        raw_token = request.GET.get('token')
+        if raw_token:
+            return auth.get_user(auth.get_validated_token(raw_token))
+        result = auth.authenticate(request)
+        return result[0] if result else None
+    except AuthenticationFailed:
+        return None
+
+
+def _can_see(user, payload):
+    # Staff see everything, students only their own orders
+    if user.role in ['ADMIN', 'STAFF']:
+        return True
+    return payload['user_id'] == user.id
+
+
+def _replay_page(user, after):
+    events = OrderEvent.objects.filter(seq__gt=after).order_by('seq')
+    if user.role not in ['ADMIN', 'STAFF']:
+        events = events.filter(user=user)
+    return [event_payload(e) for e in events[:REPLAY_PAGE_SIZE]]
+
+
+def _format(payload):
+    name = payload['event_type'].lower().replace('_', '-')
+    return f"id: {payload['seq']}\nevent: {name}\ndata: {json.dumps(payload)}\n\n"
+
+
+async def _stream(user, last_event_id):
+    subscription = await broker.subscribe()
+    try:
+        # Subscribe before replaying so nothing committed in between is lost.
+        # The broker delivers in seq order, so live events up to the last one
+        # sent are the replay's
+        last_sent = last_event_id
+        while True:
+            page = await sync_to_async(_replay_page)(user, last_sent)
+            for payload in page:
+                last_sent = payload['seq']
+                yield _format(payload)
+            if len(page) < REPLAY_PAGE_SIZE:
+                break
+        # the broker does the reading from here on; don't hold a connection
+        # for as long as the client stays
+        await sync_to_async(lambda: connection.close())()
+
+        while not subscription.overflowed:
+            try:
+                payload = await asyncio.wait_for(subscription.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': heartbeat\n\n'
+                continue
+
+            if payload['seq'] <= last_sent or not _can_see(user, payload):
+                continue
+            last_sent = payload['seq']
+            yield _format(payload)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@require_GET
+async def order_event_stream(request):
+    """
+    Push order-created, order-completed, printout-created and printout-completed
+    events. Reconnecting clients send Last-Event-ID (or ?last_event_id=) and get
+    the missed events replayed from the OrderEvent table first, all of them, in
+    pages. New events arrive in seq order within about broker.POLL_SECONDS,
+    whichever process recorded them.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'The event stream is served by the ASGI app (core.asgi)'}, status=501)
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    raw_last_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    if raw_last_id:
+        try:
+            last_event_id = int(raw_last_id)
+        except ValueError:
+            return JsonResponse({'error': 'Invalid Last-Event-ID'}, status=400)
+    else:
+        # fresh connection: only new events from here on
+        last_event_id = await sync_to_async(latest_seq)()
+
+    response = StreamingHttpResponse(_stream(user, last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
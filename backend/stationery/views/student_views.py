@@ -5,8 +5,15 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import transaction
 
+from ..cart import create_orders, CartError
+from ..events import record_event, EventType
+from ..idempotency import idempotent
 from ..models import ActiveOrders, PastOrders, ActivePrintOuts, PastPrintOuts, Items, PrintoutFile
+from ..blobs import stage_upload, stage_path, store_blob, discard
+from ..uploads import attach_uploads, UploadError
+from .. import print_jobs
 from ..serializers import (
     ActiveOrdersSerializer, 
     PastOrdersSerializer, 
@@ -85,9 +92,10 @@ class GetPastPrintouts(APIView):
 
 
 class CreateOrder(APIView):
-    """Create single or multiple orders at once"""
+    """Create single or multiple orders at once, all or nothing"""
     permission_classes = (IsAuthenticated, )
 
+    @idempotent
     def post(self, request):
         # Expected format:
         # {
@@ -97,46 +105,41 @@ class CreateOrder(APIView):
         #   ]
         # } 
 
-        orders = request.data.get('orders')
-
-        for order in orders:
-            data = {
-                'user': request.user.pk,
-                'item': Items.objects.filter(item=order['item']).first().pk,
-                'quantity': int(order['quantity']),
-                'cost': float(order['cost']),
-                'custom_message': order['custom_message'],
-            }
-
-            serializer = ActiveOrdersSerializer(data=data)
+        try:
+            order_ids = create_orders(request.user, request.data.get('orders'))
+        except CartError as e:
+            return Response(
+                {'message': 'Order Creation Failed', 'errors': e.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-            if serializer.is_valid():
-                serializer.save()
-            else:
-                return Response(
-                    {'message': 'Order Creation Failed'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
         return Response(
-            {'message': 'Orders Created Successfully'}, 
+            {'message': 'Orders Created Successfully', 'order_ids': order_ids},
             status=status.HTTP_200_OK
         )
 
 
 class CreatePrintout(APIView):
-    """Create printout orders with file uploads"""
+    """Create printout orders with file uploads, or with finalized chunked uploads (upload_ids)"""
     permission_classes = (IsAuthenticated, )
 
+    @idempotent
     def post(self, request):
-        # Get the files array, b&w pages array, and coloured pages array
+        # Get the files array (or chunked upload ids), b&w pages array, and coloured pages array
         files = request.FILES.getlist('files')
+        upload_ids = request.data.getlist('upload_ids')
         black_and_white_pages = request.data.getlist('pages')
         coloured_pages = request.data.getlist('colouredpages')
         costs = request.data.getlist('costs')
         print_on_one_side_list = request.data.getlist('print_on_one_side_list')
         custom_messages = request.data.getlist('custom_messages')
 
+        if bool(files) == bool(upload_ids):
+            return Response(
+                {'error': 'Send either files or upload_ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         try:
             # Calculate total cost for the parent printout order
             total_cost = sum(float(cost) for cost in costs)
@@ -146,31 +149,51 @@ class CreatePrintout(APIView):
                 'user': request.user.pk,
                 'cost': total_cost,
                 'custom_message': custom_messages[0] if custom_messages else '',
-                'file': files[0],  # Keep the first file for legacy compatibility
             }
 
             serializer = ActivePrintoutsSerializer(data=parent_data)
 
             if serializer.is_valid():
-                parent_printout = serializer.save()
-                
-                # Now create PrintoutFile objects for each file with their individual specs
-                n = len(files)
-                for i in range(n):
-                    file = files[i]
-                    black_and_white_page = black_and_white_pages[i]
-                    coloured_page = coloured_pages[i]
-                    print_on_one_side = print_on_one_side_list[i]
-                    
-                    PrintoutFile.objects.create(
-                        printout_active=parent_printout,
-                        file=file,
-                        file_name=file.name,
-                        file_size=file.size,
-                        coloured_pages=coloured_page,
-                        black_and_white_pages=black_and_white_page,
-                        print_on_one_side=print_on_one_side,
-                    )
+                # hash and copy the uploads before taking any locks
+                staged = [stage_upload(file) for file in files]
+                try:
+                    with transaction.atomic():
+                        if upload_ids:
+                            uploads = attach_uploads(request.user, upload_ids)
+                            staged = [stage_path(upload.file.path, upload.file_name, upload.checksum) for upload in uploads]
+                            # the session copies aren't needed once the blobs exist
+                            transaction.on_commit(lambda: [upload.file.delete(save=False) for upload in uploads])
+
+                        # one stored copy per distinct file content
+                        blobs = [store_blob(item) for item in staged]
+                        # Keep the first file on the parent for legacy compatibility
+                        parent_printout = serializer.save(file=blobs[0].file.name)
+                        
+                        # Now create PrintoutFile objects for each file with their individual specs
+                        n = len(blobs)
+                        for i in range(n):
+                            black_and_white_page = black_and_white_pages[i]
+                            coloured_page = coloured_pages[i]
+                            print_on_one_side = print_on_one_side_list[i]
+                            
+                            PrintoutFile.objects.create(
+                                printout=parent_printout,
+                                file=blobs[i].file.name,
+                                blob=blobs[i],
+                                file_name=staged[i].file_name,
+                                file_size=blobs[i].size,
+                                coloured_pages=coloured_page,
+                                black_and_white_pages=black_and_white_page,
+                                print_on_one_side=print_on_one_side,
+                            )
+
+                        # prepare the print-ready PDFs before staff open the order
+                        print_jobs.submit(parent_printout.order_id)
+                        # last, see events.py
+                        record_event(EventType.PRINTOUT_CREATED, parent_printout.order_id, request.user)
+                finally:
+                    for item in staged:
+                        discard(item)
                 
                 return Response(
                     {'message': 'Printout Orders Created Successfully'}, 
@@ -185,5 +208,7 @@ class CreatePrintout(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
+        except UploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
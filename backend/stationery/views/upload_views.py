@@ -0,0 +1,86 @@
+"""
+Resumable chunked upload endpoints for large printout files
+"""
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+
+from ..models import UploadSession
+from ..uploads import start_upload, write_chunk, finalize_upload, UploadError
+
+
+def _session_data(session):
+    return {
+        'upload_id': str(session.pk),
+        'file_name': session.file_name,
+        'file_size': session.file_size,
+        'received': session.received,
+        'status': session.status,
+        'max_chunk_size': settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE,
+    }
+
+
+class StartUpload(APIView):
+    """Start a chunked upload session"""
+    permission_classes = (IsAuthenticated, )
+
+    def post(self, request):
+        # Expected format: {'file_name': 'thesis.pdf', 'file_size': 209715200, 'checksum': '<sha256 hex, optional>'}
+        try:
+            session = start_upload(
+                request.user,
+                request.data.get('file_name'),
+                request.data.get('file_size'),
+                request.data.get('checksum'),
+            )
+        except UploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+
+        return Response(_session_data(session), status=status.HTTP_201_CREATED)
+
+
+class UploadChunk(APIView):
+    """
+    GET: how much of the upload has been received, to resume after a failure.
+    PUT: the raw bytes of the next chunk, with its position in the Upload-Offset header.
+    """
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request, upload_id):
+        session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+        return Response(_session_data(session), status=status.HTTP_200_OK)
+
+    def put(self, request, upload_id):
+        session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length') or 0)
+        except ValueError:
+            return Response({'error': 'Upload-Offset header must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # read the body as a stream, never through request.data
+        try:
+            write_chunk(session, offset, request.stream, length)
+        except UploadError as e:
+            return Response({'error': str(e), 'received': session.received}, status=e.status_code)
+
+        return Response(_session_data(session), status=status.HTTP_200_OK)
+
+
+class FinalizeUpload(APIView):
+    """Verify a fully received upload so it can be attached to a printout"""
+    permission_classes = (IsAuthenticated, )
+
+    def post(self, request, upload_id):
+        session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+
+        try:
+            finalize_upload(session, request.data.get('checksum'))
+        except UploadError as e:
+            return Response({'error': str(e), 'received': session.received}, status=e.status_code)
+
+        return Response(_session_data(session), status=status.HTTP_200_OK)
@@ -18,6 +18,7 @@ from ..generate_firstpage import firstpage
 from ..pdf_watermark import watermark
 from ..img_to_pdf import img_to_pdf
 from ..word_to_pdf import docx_to_pdf
+from ..utils import shard_path
 import fitz
 
 
@@ -64,7 +65,7 @@ class CostCalculationView(APIView):
                 coloured_page = coloured_pages[i]
 
                 # Save the file temporarily
-                temp_file = default_storage.save('temp_files/' + file.name, ContentFile(file.read()))
+                temp_file = default_storage.save(shard_path('temp_files', file.name), ContentFile(file.read()))
 
                 # Full path to the temporarily saved file
                 temp_path = default_storage.path(temp_file)
@@ -92,7 +93,7 @@ class CostCalculationView(APIView):
                     
                     if pdf_data:
                         # Save the converted PDF temporarily
-                        temp_pdf_file = default_storage.save('temp_files/converted.pdf', ContentFile(pdf_data))
+                        temp_pdf_file = default_storage.save(shard_path('temp_files', 'converted.pdf'), ContentFile(pdf_data))
                         
                         # Full path to the temporarily saved PDF file
                         temp_pdf_path = default_storage.path(temp_pdf_file)
@@ -219,7 +220,7 @@ class ModPdfView(APIView):
       - file (File): the uploaded PDF
       - pages (str): page ranges like '1-3,5' or a JSON array string
 
-    Saves temporary output as 'temp_files/<orig>-mod.pdf', returns the PDF,
+    Saves temporary output as 'temp_files/YYYY/MM/DD/<xx>/<orig>-mod.pdf' (see shard_path), returns the PDF,
     and deletes the temp files after building the response.
     """
     parser_classes = [MultiPartParser]
@@ -247,12 +248,12 @@ class ModPdfView(APIView):
             return Response({'error': 'No valid pages parsed from pages parameter.'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Save uploaded file temporarily
-        input_temp_name = default_storage.save('temp_files/' + uploaded.name, ContentFile(uploaded.read()))
+        input_temp_name = default_storage.save(shard_path('temp_files', uploaded.name), ContentFile(uploaded.read()))
         input_path = default_storage.path(input_temp_name)
 
         base, ext = os.path.splitext(uploaded.name)
         out_name = f"{base}-mod.pdf"
-        out_temp_name = os.path.join('temp_files', out_name)
+        out_temp_name = shard_path('temp_files', out_name)
 
         try:
             src = fitz.open(input_path)
@@ -0,0 +1,117 @@
+"""
+ZIP archives of printout files, streamed to the client as they are built.
+
+zipfile writes to a sink that only remembers what it was given since the
+last drain, so nothing is spooled to a temporary file and memory stays at
+about one read block. The sink has no seek(), which makes zipfile put each
+entry's CRC and sizes in a data descriptor after its bytes instead of
+going back to patch the local header.
+
+PDFs, images and Office files are already compressed and are stored as-is;
+anything else is deflated.
+"""
+import os
+import zipfile
+
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+from .models import PrintOut, PrintoutFile
+
+
+READ_BLOCK_SIZE = 256 * 1024
+
+STORED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.docx', '.pptx', '.xlsx', '.zip'}
+
+
+class _ZipSink:
+    """Write-only, unseekable file object for zipfile that hands back what was written"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _unique(name, used):
+    stem, ext = os.path.splitext(name)
+    candidate, n = name, 1
+    while candidate in used:
+        n += 1
+        candidate = f'{stem} ({n}){ext}'
+    used.add(candidate)
+    return candidate
+
+
+def bundle_entries(order_ids):
+    """
+    (archive name, path) for every file of the given printouts that is on
+    disk, named <order_id>/<original file name>, in order_ids order.
+    """
+    files = {}
+    for printout_file in PrintoutFile.objects.filter(printout_id__in=order_ids).exclude(file='').order_by('id'):
+        files.setdefault(printout_file.printout_id, []).append(
+            (printout_file.file_name or printout_file.file.name, printout_file.file.path)
+        )
+
+    # printouts from before PrintoutFile only have their own file
+    legacy = [order_id for order_id in order_ids if order_id not in files]
+    if legacy:
+        for printout in PrintOut.objects.filter(order_id__in=legacy).exclude(file=''):
+            ext = os.path.splitext(printout.file.name)[1]
+            files[printout.order_id] = [(f'{printout.order_id}{ext}', printout.file.path)]
+
+    entries = []
+    used = set()
+    for order_id in order_ids:
+        for file_name, path in files.get(order_id, ()):
+            if not os.path.exists(path):
+                continue
+            # the upload's own name, without any directories it claims
+            name = os.path.basename(file_name.replace('\\', '/')) or os.path.basename(path)
+            entries.append((_unique(f'{order_id}/{name}', used), path))
+    return entries
+
+
+def stream_zip(entries):
+    """Yield the bytes of a ZIP archive of (archive name, path) entries"""
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', allowZip64=True) as archive:
+        for name, path in entries:
+            info = zipfile.ZipInfo.from_file(path, name)
+            if os.path.splitext(name)[1].lower() in STORED_EXTENSIONS:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+            with open(path, 'rb') as source, \
+                    archive.open(info, 'w', force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as destination:
+                for block in iter(lambda: source.read(READ_BLOCK_SIZE), b''):
+                    destination.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+    # the central directory
+    yield sink.drain()
+
+
+def zip_response(entries, filename):
+    response = StreamingHttpResponse(stream_zip(entries), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Cache-Control'] = 'private, no-store'
+    return response